@@ -0,0 +1,513 @@
+# -*- coding: utf-8 -*-
+"""Searches binning and exposure settings of the six limb CCDs for synchronized settings with short Exposure Interval Times (TEXPIMS).
+A part of the Operational Planning Tool.
+"""
+
+import copy, importlib, itertools, logging, time
+from numpy import (
+    arange,
+    array,
+    asarray,
+    column_stack,
+    concatenate,
+    full,
+    lexsort,
+    minimum,
+    ones,
+    unravel_index,
+    where,
+)
+
+from OPT import _Globals, _Library
+
+OPT_Config_File = importlib.import_module(_Globals.Config_File)
+Logger = logging.getLogger(OPT_Config_File.Logger_name())
+
+
+"The binning settings which may be searched by *CCDSync_Optimizer*, TEXPMS may also be searched"
+Binning_settings = ("NCBIN", "NCBINFPGA", "NRBIN", "NROW", "NCOL")
+
+"Binning settings searched when no search space is given. The Exposure Times (TEXPMS) of the CCD macro are kept"
+Default_SearchSpace = {
+    "NCBIN": [1, 2, 4, 5, 8, 10, 20, 25, 40, 50, 80, 100, 200],
+    "NCBINFPGA": [0, 1, 2],
+    "NRBIN": [1, 2, 3, 4, 5, 6, 8, 10],
+}
+
+"Estimated time [ms] to transfer one pixel through the CRB, the same as in *_Library._SyncArgCalculator*"
+TransfertimePerPixel = 0.01
+
+"Maximum number of settings evaluated at once"
+Chunk = 2 ** 20
+
+
+def CCDSync_Optimizer(CCDMacroSelect, SearchSpace, Objective, Groups):
+    """The core function of the *CCDSync_Optimizer* program.
+
+    The CCDs in each group of *Groups* are given the same settings. For each group, all combinations of the candidate values in *SearchSpace* are formed,
+    and combinations which are invalid for the CCD macro CMD (see *Commands.TC_pafCCDMain*) are removed. If NCOL or NROW is not searched, they are derived
+    from the binning so that the same part of the CCD as in the CCD macro is read out. \n
+    The combinations of a group are then pruned by removing the ones which have both longer Readout Times, longer estimated Transfer Times and fewer pixels
+    than another combination, as TEXPIMS never decreases when a Readout Time or a Transfer Time increases. \n
+
+    For each combination of Exposure Times (TEXPMS) of the groups, TEXPIMS of all combinations of the pruned settings are calculated at once with *_Library.SyncArgCalculator_Vectorized*
+    and only the ones with the most pixels for a given TEXPIMS are kept. The settings which are Pareto-optimal regarding the *Objective*, the number of pixels
+    and the sum of the Exposure Times are finally recalculated with *_Library._SyncArgCalculator*.
+
+    Arguments:
+        CCDMacroSelect (str): The CCD macro of the *Configuration File* (see *CCD_macro_settings*) which settings are used as a starting point.
+        SearchSpace (dict): Lists of candidate values of the settings "TEXPMS", "NCBIN", "NCBINFPGA", "NRBIN", "NROW" and "NCOL" for all groups.
+            A CCDSEL may also be used as a key to a dictionary of candidate values only used for the group which contains that CCD. Settings not in *SearchSpace* are taken from the CCD macro.
+        Objective (str): Either 'TEXPIMS' to minimize the Exposure Interval Time, or 'ImageRate' to maximize the number of images per second.
+        Groups (tuple of tuple of int): The CCDSEL of the CCDs of each group of CCDs which share the same settings.
+
+    Returns:
+        (list): The Pareto-optimal configurations, sorted by the *Objective*. Each is a dictionary containing:
+
+            **CCD_settings** (*dict of dict of int*): The settings of all CCDs, in the same format as *CCD_macro_settings*. \n
+            **CCDSEL** (*int*): CCDSEL argument for the CCD Synchronize CMD. \n
+            **NCCD** (*int*): NCCD argument for the CCD Synchronize CMD. \n
+            **TEXPIOFS** (*list of int*): TEXPIOFS argument for the CCD Synchronize CMD. \n
+            **TEXPIMS** (*int*): The Exposure Interval Time [ms]. \n
+            **ImageRate** (*float*): Number of images per second of all synchronized CCDs. \n
+            **Pixels** (*int*): Number of pixels per image summed over all synchronized CCDs. \n
+            **ExposureTime** (*int*): The sum of TEXPMS [ms] of all synchronized CCDs.
+
+    """
+
+    _Library.SetupLogger(
+        OPT_Config_File.Logger_name(),
+        _Library.ConfigFile_Logger_settings(OPT_Config_File),
+    )
+
+    StartTime = time.time()
+
+    if Objective not in ("TEXPIMS", "ImageRate"):
+        Logger.error("Invalid Objective: " + str(Objective))
+        raise ValueError
+
+    if sorted(itertools.chain(*Groups)) != sorted(_Library.SyncArg_CCDSELs):
+        Logger.error(
+            "Invalid Groups, each of the CCDs "
+            + str(_Library.SyncArg_CCDSELs)
+            + " must be in exactly one group"
+        )
+        raise ValueError
+
+    if SearchSpace is None:
+        SearchSpace = Default_SearchSpace
+
+    Timeline_settings = OPT_Config_File.Timeline_settings()
+    ExtraOffset = Timeline_settings["CCDSYNC_ExtraOffset"]
+    ExtraIntervalTime = Timeline_settings["CCDSYNC_ExtraIntervalTime"]
+
+    CCD_settings = OPT_Config_File.CCD_macro_settings(CCDMacroSelect)
+
+    Logger.info("CCD macro: " + str(CCDMacroSelect))
+    Logger.info("Objective: " + str(Objective))
+
+    "Index of the group of each CCD, in the order of SyncArg_CCDSELs"
+    Group_of_CCD = [
+        [CCDSEL in CCDSELs for CCDSELs in Groups].index(True)
+        for CCDSEL in _Library.SyncArg_CCDSELs
+    ]
+
+    Candidates = []
+    TEXPMS_options = []
+    for CCDSELs in Groups:
+        Group_candidates, TEXPMS_values = _group_candidates(
+            CCD_settings, CCDSELs, SearchSpace
+        )
+        Logger.info(
+            "CCDs "
+            + str(CCDSELs)
+            + ": "
+            + str(len(Group_candidates["NCOL"]))
+            + " pruned binning settings, TEXPMS: "
+            + str(TEXPMS_values)
+        )
+        if len(Group_candidates["NCOL"]) == 0 or len(TEXPMS_values) == 0:
+            Logger.error("No valid settings in the search space for CCDs " + str(CCDSELs))
+            raise ValueError
+        Candidates.append(Group_candidates)
+        TEXPMS_options.append(TEXPMS_values)
+
+    "Search all Exposure Times, keeping the settings with the most pixels for each TEXPIMS"
+    Found = []
+    NumberOfEvaluations = 0
+    for TEXPMS_groups in itertools.product(*TEXPMS_options):
+
+        TEXPMS = [TEXPMS_groups[Group_of_CCD[x]] for x in range(len(Group_of_CCD))]
+        Active = array(TEXPMS) != 0
+        if Active.sum() < 2:
+            continue
+
+        "The binning of CCDs which are not exposed does not matter"
+        Counts = [
+            len(Group_candidates["NCOL"]) if ExpTime != 0 else 1
+            for Group_candidates, ExpTime in zip(Candidates, TEXPMS_groups)
+        ]
+        NumberOfSettings = 1
+        for Count in Counts:
+            NumberOfSettings *= Count
+
+        for start in range(0, NumberOfSettings, Chunk):
+
+            Indices = unravel_index(
+                arange(start, min(start + Chunk, NumberOfSettings)), Counts
+            )
+            ReadOutTimes = array(
+                [
+                    Candidates[Group_of_CCD[x]]["ReadOutTime"][CCDSEL][
+                        Indices[Group_of_CCD[x]]
+                    ]
+                    for x, CCDSEL in enumerate(_Library.SyncArg_CCDSELs)
+                ]
+            )
+            TransferTimes = array(
+                [
+                    Candidates[Group_of_CCD[x]]["TransferTime"][Indices[Group_of_CCD[x]]]
+                    for x in range(len(Group_of_CCD))
+                ]
+            )
+            Pixels = sum(
+                Candidates[Group_of_CCD[x]]["Pixels"][Indices[Group_of_CCD[x]]]
+                for x in range(len(Group_of_CCD))
+                if Active[x]
+            )
+            NumberOfEvaluations += len(Pixels)
+
+            TEXPIOFS, TEXPIMS = _Library.SyncArgCalculator_Vectorized(
+                TEXPMS, ReadOutTimes, TransferTimes, ExtraOffset, ExtraIntervalTime
+            )
+
+            "Remove settings which are invalid for the CCD Synchronize CMD or the CCD macro CMD"
+            Valid = (TEXPIOFS.max(axis=0) <= 12000) & (
+                (array(TEXPMS)[:, None] + ReadOutTimes < TEXPIMS)[Active].all(axis=0)
+            )
+            Valid = where(Valid)[0]
+
+            Kept = Valid[_nondominated_2D(TEXPIMS[Valid], -Pixels[Valid])]
+            Found.append(
+                (
+                    full((len(Kept), len(Groups)), TEXPMS_groups),
+                    column_stack([Index[Kept] for Index in Indices]),
+                    TEXPIMS[Kept],
+                    Pixels[Kept],
+                    full(len(Kept), Active.sum()),
+                    full(len(Kept), sum(TEXPMS)),
+                )
+            )
+
+    Logger.info("Number of evaluated settings: " + str(NumberOfEvaluations))
+
+    if len(Found) == 0:
+        Logger.error("No valid synchronized settings found")
+        raise ValueError
+
+    Found_TEXPMS = concatenate([Result[0] for Result in Found])
+    Found_Indices = concatenate([Result[1] for Result in Found])
+    Found_TEXPIMS = concatenate([Result[2] for Result in Found])
+    Found_Pixels = concatenate([Result[3] for Result in Found])
+    Found_NCCD = concatenate([Result[4] for Result in Found])
+    Found_ExposureTime = concatenate([Result[5] for Result in Found])
+
+    Pareto = where(
+        _nondominated(
+            column_stack(
+                (
+                    _objective_cost(Objective, Found_TEXPIMS, Found_NCCD),
+                    -Found_Pixels,
+                    -Found_ExposureTime,
+                )
+            )
+        )
+    )[0]
+
+    "Recalculate the Pareto-optimal settings exactly"
+    Configurations = []
+    for index in Pareto:
+        Settings = _configuration(
+            CCD_settings, Groups, Candidates, Found_TEXPMS[index], Found_Indices[index]
+        )
+        Configuration = _evaluate_configuration(
+            Settings, ExtraOffset, ExtraIntervalTime
+        )
+        if Configuration is not None:
+            Configurations.append(Configuration)
+
+    Pareto = where(
+        _nondominated(
+            [
+                (
+                    _objective_cost(
+                        Objective, Configuration["TEXPIMS"], Configuration["NCCD"]
+                    ),
+                    -Configuration["Pixels"],
+                    -Configuration["ExposureTime"],
+                )
+                for Configuration in Configurations
+            ]
+        )
+    )[0]
+    Configurations = [Configurations[index] for index in Pareto]
+
+    Configurations.sort(
+        key=lambda Configuration: (
+            _objective_cost(Objective, Configuration["TEXPIMS"], Configuration["NCCD"]),
+            -Configuration["Pixels"],
+            -Configuration["ExposureTime"],
+        )
+    )
+
+    Logger.info("Number of Pareto-optimal configurations: " + str(len(Configurations)))
+    if len(Configurations) != 0:
+        Logger.info(
+            "Best configuration: TEXPIMS = "
+            + str(Configurations[0]["TEXPIMS"])
+            + " ms, ImageRate = "
+            + str(round(Configurations[0]["ImageRate"], 3))
+            + " images/s, Pixels = "
+            + str(Configurations[0]["Pixels"])
+        )
+    Logger.info("Time of the search: " + str(round(time.time() - StartTime, 2)) + " s")
+
+    return Configurations
+
+
+def _group_candidates(CCD_settings, CCDSELs, SearchSpace):
+    """Returns the valid and pruned binning settings, and the Exposure Times, to be searched for a group of CCDs.
+
+    The CCD macro settings of the first CCD in the group are used for settings which are not searched.
+
+    Arguments:
+        CCD_settings (dict of dict of int): Settings of the CCD macro.
+        CCDSELs (tuple of int): The CCDSEL of the CCDs in the group.
+        SearchSpace (dict): See *CCDSync_Optimizer*.
+
+    Returns:
+        (tuple): tuple containing:
+
+            - **Candidates** (*dict*): Arrays of the binning settings (see *Binning_settings*) and arrays of the "ReadOutTime" of each CCD (dict with CCDSEL as keys), the "TransferTime" and the number of "Pixels" of each setting.
+            - **TEXPMS_values** (*list of int*): Sorted Exposure Times [ms] to be searched.
+
+    """
+
+    Base = CCD_settings[CCDSELs[0]]
+
+    Space = {
+        name: values
+        for name, values in SearchSpace.items()
+        if name in Binning_settings + ("TEXPMS",)
+    }
+    for CCDSEL in CCDSELs:
+        Space.update(SearchSpace.get(CCDSEL, {}))
+
+    TEXPMS_values = sorted(
+        set(int(ExpTime) for ExpTime in Space.get("TEXPMS", [Base["TEXPMS"]]))
+    )
+    TEXPMS_values = [ExpTime for ExpTime in TEXPMS_values if 0 <= ExpTime <= 32000]
+
+    Combinations = list(
+        itertools.product(*[Space.get(name, [Base[name]]) for name in Binning_settings])
+    )
+    Candidates = {
+        name: array([Combination[x] for Combination in Combinations], dtype=int)
+        for x, name in enumerate(Binning_settings)
+    }
+
+    "Read out the same part of the CCD as the CCD macro, if NCOL and NROW are not searched"
+    if "NCOL" not in Space:
+        Candidates["NCOL"] = (
+            (Base["NCOL"] + 1)
+            * Base["NCBIN"]
+            * 2 ** Base["NCBINFPGA"]
+            // (Candidates["NCBIN"] * 2 ** Candidates["NCBINFPGA"])
+            - 1
+        )
+    if "NROW" not in Space:
+        Candidates["NROW"] = Base["NROW"] * Base["NRBIN"] // Candidates["NRBIN"]
+
+    NRSKIP = max(CCD_settings[CCDSEL]["NRSKIP"] for CCDSEL in CCDSELs)
+    NCSKIP = max(CCD_settings[CCDSEL]["NCSKIP"] for CCDSEL in CCDSELs)
+
+    "The same limits as in the CCD macro CMD"
+    Valid = (
+        (1 <= Candidates["NRBIN"])
+        & (Candidates["NRBIN"] <= 63)
+        & (1 <= Candidates["NROW"])
+        & (Candidates["NROW"] <= 511)
+        & (1 <= Candidates["NCBIN"])
+        & (Candidates["NCBIN"] <= 255)
+        & (1 <= Candidates["NCOL"])
+        & (Candidates["NCOL"] <= 2047)
+        & (0 <= Candidates["NCBINFPGA"])
+        & (Candidates["NCBINFPGA"] <= 7)
+        & (Candidates["NROW"] * Candidates["NRBIN"] + NRSKIP <= 511)
+        & (
+            (Candidates["NCOL"] + 1)
+            * Candidates["NCBIN"]
+            * 2 ** Candidates["NCBINFPGA"].clip(0, 7)
+            + NCSKIP
+            <= 2048
+        )
+    )
+    Candidates = {name: values[Valid] for name, values in Candidates.items()}
+
+    ReadOutTimes = {}
+    for CCDSEL in CCDSELs:
+        T_readout, T_delay, T_Extra = _Library.calculate_time_per_row(
+            NCOL=Candidates["NCOL"],
+            NCBIN=Candidates["NCBIN"],
+            NCBINFPGA=Candidates["NCBINFPGA"],
+            NRSKIP=full(len(Candidates["NCOL"]), CCD_settings[CCDSEL]["NRSKIP"]),
+            NROW=Candidates["NROW"],
+            NRBIN=Candidates["NRBIN"],
+            NFLUSH=full(len(Candidates["NCOL"]), CCD_settings[CCDSEL]["NFLUSH"]),
+        )
+        ReadOutTimes[CCDSEL] = T_readout + T_delay + T_Extra
+
+    TransferTimes = Candidates["NCOL"] * Candidates["NROW"] * TransfertimePerPixel
+    Pixels = (Candidates["NCOL"] + 1) * Candidates["NROW"]
+
+    "Prune settings which have longer Readout and Transfer Times, and fewer pixels, than other settings"
+    Pruned = _nondominated(
+        column_stack(
+            [ReadOutTimes[CCDSEL] for CCDSEL in CCDSELs] + [TransferTimes, -Pixels]
+        )
+    )
+
+    Candidates = {name: values[Pruned] for name, values in Candidates.items()}
+    Candidates["ReadOutTime"] = {
+        CCDSEL: ReadOutTime[Pruned] for CCDSEL, ReadOutTime in ReadOutTimes.items()
+    }
+    Candidates["TransferTime"] = TransferTimes[Pruned]
+    Candidates["Pixels"] = Pixels[Pruned]
+
+    return Candidates, TEXPMS_values
+
+
+def _nondominated(Costs):
+    """Returns a mask of the points which are Pareto-optimal when all costs are minimized. Of several equal points only the first one is kept.
+
+    Arguments:
+        Costs (array): Costs of each point (number of points x number of costs).
+
+    Returns:
+        (array of bool): True for the Pareto-optimal points.
+
+    """
+
+    Costs = asarray(Costs, dtype=float)
+    NumberOfPoints = len(Costs)
+    Mask = ones(NumberOfPoints, dtype=bool)
+    if NumberOfPoints == 0:
+        return Mask
+
+    Rows = max(1, 2 ** 22 // NumberOfPoints)
+    for start in range(0, NumberOfPoints, Rows):
+
+        Points = Costs[start : start + Rows]
+        NotWorse = (Costs[None, :, :] <= Points[:, None, :]).all(axis=2)
+        Better = (Costs[None, :, :] < Points[:, None, :]).any(axis=2)
+        Earlier = arange(NumberOfPoints)[None, :] < arange(start, start + len(Points))[:, None]
+
+        Dominated = (NotWorse & Better).any(axis=1)
+        Duplicate = (NotWorse & ~Better & Earlier).any(axis=1)
+        Mask[start : start + len(Points)] = ~(Dominated | Duplicate)
+
+    return Mask
+
+
+def _nondominated_2D(Cost1, Cost2):
+    """Returns the indices of the points which are Pareto-optimal when two costs are minimized. Of several equal points only one is kept.
+
+    Arguments:
+        Cost1 (array): The first cost of each point.
+        Cost2 (array): The second cost of each point.
+
+    Returns:
+        (array of int): Indices of the Pareto-optimal points, sorted by *Cost1*.
+
+    """
+
+    Order = lexsort((Cost2, Cost1))
+    Cost2_sorted = Cost2[Order]
+
+    Kept = ones(len(Order), dtype=bool)
+    Kept[1:] = Cost2_sorted[1:] < minimum.accumulate(Cost2_sorted)[:-1]
+
+    return Order[Kept]
+
+
+def _objective_cost(Objective, TEXPIMS, NCCD):
+    "Returns the cost to minimize for the *Objective*"
+
+    if Objective == "ImageRate":
+        return -NCCD * 1000 / TEXPIMS
+    else:
+        return TEXPIMS
+
+
+def _configuration(CCD_settings, Groups, Candidates, TEXPMS_groups, Indices):
+    """Returns a copy of the CCD macro settings with the searched settings of each group.
+
+    CCDs with TEXPMS equal to zero keep the binning of the CCD macro.
+
+    """
+
+    Settings = copy.deepcopy(CCD_settings)
+    for Group_candidates, CCDSELs, ExpTime, index in zip(
+        Candidates, Groups, TEXPMS_groups, Indices
+    ):
+        for CCDSEL in CCDSELs:
+            Settings[CCDSEL]["TEXPMS"] = int(ExpTime)
+            if ExpTime == 0:
+                continue
+            for name in Binning_settings:
+                Settings[CCDSEL][name] = int(Group_candidates[name][index])
+
+    return Settings
+
+
+def _evaluate_configuration(Settings, ExtraOffset, ExtraIntervalTime):
+    """Calculates the arguments of the CCD Synchronize CMD for the settings with *_Library._SyncArgCalculator*.
+
+    Returns:
+        (dict): The configuration (see *CCDSync_Optimizer*), or None if the settings are invalid for the CCD Synchronize CMD or the CCD macro CMD.
+
+    """
+
+    CCDSEL, NCCD, TEXPIOFS, TEXPIMS = _Library._SyncArgCalculator(
+        Settings, ExtraOffset, ExtraIntervalTime
+    )
+
+    Pixels = 0
+    ExposureTime = 0
+    for CCD in _Library.SyncArg_CCDSELs:
+        if Settings[CCD]["TEXPMS"] == 0:
+            continue
+        T_readout, T_delay, T_Extra = _Library.calculate_time_per_row(
+            *[
+                Settings[CCD][name]
+                for name in ("NCOL", "NCBIN", "NCBINFPGA", "NRSKIP", "NROW", "NRBIN", "NFLUSH")
+            ]
+        )
+        if not Settings[CCD]["TEXPMS"] + T_readout + T_delay + T_Extra < TEXPIMS:
+            return None
+        Pixels += (Settings[CCD]["NCOL"] + 1) * Settings[CCD]["NROW"]
+        ExposureTime += Settings[CCD]["TEXPMS"]
+
+    if not (2 <= NCCD and max(TEXPIOFS) <= 12000):
+        return None
+
+    return {
+        "CCD_settings": Settings,
+        "CCDSEL": CCDSEL,
+        "NCCD": NCCD,
+        "TEXPIOFS": TEXPIOFS,
+        "TEXPIMS": TEXPIMS,
+        "ImageRate": NCCD * 1000 / TEXPIMS,
+        "Pixels": Pixels,
+        "ExposureTime": ExposureTime,
+    }
@@ -0,0 +1,4 @@
+"""
+The *CCDSync_Optimizer* part of the *Operational_Planning_Tool*, which
+purpose is to find binning and exposure settings of the six limb CCDs which give short Exposure Interval Times (TEXPIMS) when synchronized.
+"""
@@ -7,7 +7,7 @@ Checks the values given in the *Configuration File* set by *Set_ConfigFile*.
 """
 
 import importlib, logging, sys, ephem
-from pylab import sign
+from numpy import sign
 from math import ceil as ceil
 
 from OPT import _Globals, _Library
@@ -25,7 +25,10 @@ def CheckConfigFile():
     
     """
 
-    _Library.SetupLogger(OPT_Config_File.Logger_name())
+    _Library.SetupLogger(
+        OPT_Config_File.Logger_name(),
+        _Library.ConfigFile_Logger_settings(OPT_Config_File),
+    )
 
     Timeline_settings = OPT_Config_File.Timeline_settings()
     Operational_Science_Mode_settings = (
@@ -146,6 +149,49 @@ def CheckConfigFile():
     ):
         Logger.error("Timeline_settings['yaw_phase']")
         raise ValueError
+    "Settings added after older Configuration Files were made fall back to the defaults used by OPT"
+    KnotSpacing = Timeline_settings.get("OrbitInterpolation_KnotSpacing", 0)
+    MaxError = Timeline_settings.get("OrbitInterpolation_MaxError", 1)
+    OrbitProduct_Timestep = Timeline_settings.get("OrbitProduct_Timestep", 0)
+    FastTransformations = Timeline_settings.get("FastTransformations", False)
+    if not (0 <= KnotSpacing <= 600 and type(KnotSpacing) == int):
+        Logger.error("Timeline_settings['OrbitInterpolation_KnotSpacing']")
+        raise ValueError
+    if not (0 < MaxError and (type(MaxError) == int or type(MaxError) == float)):
+        Logger.error("Timeline_settings['OrbitInterpolation_MaxError']")
+        raise ValueError
+    if not (
+        0 <= OrbitProduct_Timestep <= 600 and type(OrbitProduct_Timestep) == int
+    ):
+        Logger.error("Timeline_settings['OrbitProduct_Timestep']")
+        raise ValueError
+    if not type(FastTransformations) == bool:
+        Logger.error("Timeline_settings['FastTransformations']")
+        raise ValueError
+
+    Logger_settings = _Library.ConfigFile_Logger_settings(OPT_Config_File)
+    if Logger_settings is None:
+        Logger.warning(
+            "The Configuration File has no Logger_settings, the default synchronous log file without rotation is used"
+        )
+    else:
+        if not type(Logger_settings["Asynchronous"]) == bool:
+            Logger.error("Logger_settings['Asynchronous']")
+            raise TypeError
+        if not (
+            0 <= Logger_settings["MaxBytes"] and type(Logger_settings["MaxBytes"]) == int
+        ):
+            Logger.error("Logger_settings['MaxBytes']")
+            raise ValueError
+        if not (
+            0 <= Logger_settings["BackupCount"]
+            and type(Logger_settings["BackupCount"]) == int
+        ):
+            Logger.error("Logger_settings['BackupCount']")
+            raise ValueError
+        if not type(Logger_settings["Compress"]) == bool:
+            Logger.error("Logger_settings['Compress']")
+            raise TypeError
 
     for key in Operational_Science_Mode_settings.keys():
 
@@ -168,7 +214,11 @@ def CheckConfigFile():
 
         else:
             if key == "timestep":
-                if not (Operational_Science_Mode_settings[key] < 50):
+                "The timestep is the spacing of the grid used to bracket transitions, so it must be positive"
+                if not (
+                    0 < Operational_Science_Mode_settings[key] < 50
+                    and type(Operational_Science_Mode_settings[key]) == int
+                ):
                     Logger.error('Operational_Science_Mode_settings["timestep"]')
                     raise ValueError
             elif key == "lat":
@@ -21,6 +21,30 @@ def Logger_name():
     return Logger_name
 
 
+def Logger_settings():
+    """Returns settings of the handlers of the shared logger, see *_Library.SetupLogger*.
+    
+    **Keys in returned dict:**
+        'Asynchronous': If True, log records are written to the log file and the console by a background thread, so that the simulations do not wait for the writing. (bool) \n
+        'MaxBytes': Size [bytes] of the log file at which it is rotated, meaning that it is renamed with a number appended and a new log file is started. Set to 0 to never rotate the log file. (int) \n
+        'BackupCount': Number of rotated log files which are kept, older ones are deleted. Only applies if *MaxBytes* is larger than 0. (int) \n
+        'Compress': If True, rotated log files are compressed with gzip. Only applies if *MaxBytes* is larger than 0. (bool) \n
+    
+    Returns:
+        (:obj:`dict`): Logger_settings
+    
+    """
+
+    Logger_settings = {
+        "Asynchronous": False,
+        "MaxBytes": 0,
+        "BackupCount": 5,
+        "Compress": True,
+    }
+
+    return Logger_settings
+
+
 def Version():
     """'Returns the version ID of this Configuration File.
     
@@ -146,6 +170,10 @@ def Timeline_settings():
         'pointing_stabilization': The maximum time it takes for an attitude change to stabilize [s]. Used before scheduling certain CMDs in *XML_gen* to make sure that the attitude has been stabilized after running *TC_acfLimbPointingAltitudeOffset*. Impacts the estimated duration of Science Modes in *Timeline_gen*. (int) \n
         'CCDSYNC_ExtraOffset': Extra offset time [ms] that is added to an estimated ReadoutTime when calculating TEXPIOFS for the CCD Synchronize CMD. (int) \n
         'CCDSYNC_ExtraIntervalTime': Extra time [ms] that is added to the calculated Exposure Interval Time (for example when calculating arguments for the CCD Synchronize CMD or nadir TEXPIMS). (int) \n
+        'OrbitInterpolation_KnotSpacing': Time [s] between the points in time where the orbit of MATS is propagated with SGP4 when MATS is simulated. The position and velocity in between are interpolated, which drastically reduces the runtime of simulations with short timesteps. Set to 0 to propagate every timestep with SGP4. (int) \n
+        'OrbitInterpolation_MaxError': Maximum allowed error [m] of the interpolated position compared to propagating with SGP4. The knot spacing is reduced if the estimated error is larger. Only applies if *OrbitInterpolation_KnotSpacing* is larger than 0. (float) \n
+        'OrbitProduct_Timestep': Timestep [s] of the orbit product, a file in the *Output* folder containing MATS simulated during the whole timeline which is written by *Timeline_gen* and reused by *XML_gen* and *Timeline_Plotter* instead of simulating again. Only points in time separated from the start of the timeline by a multiple of this timestep are reused. As Modes start at whole seconds, a timestep of 1 reuses the most simulations, which gives a file of about 250 MB for a timeline of one week. Set to 0 to not use an orbit product. (int) \n
+        'FastTransformations': If True, the transformations between ECI and ECEF in the orbit product (for example of the LP) use an approximation where precession-nutation is held constant for each day, which is much faster and accurate to within 10 m (see *_MATS_coordinates.GCRS2ITRS_matrices_fast*). Intended for fast preview runs. (bool) \n
         
     Returns:
         (:obj:`dict`): Timeline_settings
@@ -173,6 +201,10 @@ def Timeline_settings():
         "CCDSYNC_ExtraOffset": 50,
         "CCDSYNC_ExtraIntervalTime": 200,
         "CCDSYNC_Waittime": 20,
+        "OrbitInterpolation_KnotSpacing": 0,
+        "OrbitInterpolation_MaxError": 1,
+        "OrbitProduct_Timestep": 0,
+        "FastTransformations": False,
     }
 
     return Timeline_settings
@@ -184,7 +216,7 @@ def Operational_Science_Mode_settings():
     **Keys:**
         'lat': Applies only to Mode1! Sets in degrees the latitude (+ and -) that the LP crosses that causes the UV exposure to swith on/off. (int) \n
         'log_timestep': Used only in *XML_gen*. Sets the frequency of data being logged [s] for Mode1-2. Only determines how much of simulated data is logged for debugging purposes. (int) \n
-        'timestep': Sets the timestep [s] of the XML generator simulation of Mode1-2. Will impact accuracy of command generation but also drastically changes the runtime of XML-gen. (int) \n
+        'timestep': Sets the spacing [s] of the grid used by the XML generator to bracket dusk/dawn and LP latitude transitions for Mode1-2, which are then found to within 0.1 s. Transitions of the same kind which are closer in time than the timestep may be missed. Has a large impact on the runtime of XML-gen. (int) \n
         'Choose_Mode5CCDMacro': Applies only to Mode5! Sets the CCD macro to be used by Mode5. Used as input to *CCD_macro_settings* in the ConfigFile (str).
         
     Returns:
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Earth orientation data (IERS) used by the transformations between ECI and ECEF, handled without network access.
+
+By default Astropy downloads the latest IERS-A table whenever the Earth orientation is needed and the table it has is older than 30 days,
+which blocks until a timeout on computers without network access. OPT instead disables the automatic downloads of Astropy when this module is imported,
+which the functions of OPT using Earth orientation data do before calling Astropy, and uses a local IERS-A table, loaded the first time it is needed by *IERS_table*:
+
+    - The IERS-A table in the Astropy download cache, if it has been downloaded with *update_IERS* (*OPT.Update_IERS*).
+    - Otherwise the IERS-A table bundled with Astropy (the astropy-iers-data package).
+
+Predictions of the Earth orientation in IERS-A cover about a year after the last measured values, but get less accurate with the age of the table.
+The age of the data is returned by *IERS_status* and is logged by the programs which use it.
+
+"""
+
+import datetime, warnings
+
+from astropy.utils import iers
+from astropy.utils.data import download_file, is_url_in_cache
+
+"Never download IERS data (or leap seconds) automatically, only with update_IERS"
+iers.conf.auto_download = False
+
+"Age [days] of the IERS data after which it is recommended to run update_IERS"
+MaxAge = 30
+
+"Shared objects, loaded the first time they are needed"
+_IERS_table = None
+_IERS_path = None
+
+
+def IERS_path():
+    """Returns the path of the local IERS-A table used by OPT.
+
+    Returns:
+        (str): Path of the table in the Astropy download cache if it exists, otherwise the path of the table bundled with Astropy.
+
+    """
+
+    with warnings.catch_warnings():
+        "Astropy warns if the download cache does not exist yet"
+        warnings.simplefilter("ignore")
+        if is_url_in_cache(iers.IERS_A_URL):
+            return download_file(iers.IERS_A_URL, cache=True)
+
+    return iers.IERS_A_FILE
+
+
+def IERS_table():
+    """Returns the IERS table shared by OPT and sets it as the Earth orientation table used by Astropy.
+
+    Returns:
+        (:obj:`astropy.utils.iers.IERS_Auto`): The IERS-A table. As automatic downloads are disabled, it is never updated from the network.
+
+    """
+
+    global _IERS_table, _IERS_path
+
+    if _IERS_table == None:
+        _IERS_path = IERS_path()
+        _IERS_table = iers.IERS_Auto.read(file=_IERS_path)
+        iers.earth_orientation_table.set(_IERS_table)
+
+    return _IERS_table
+
+
+def IERS_status():
+    """Returns the source and the age of the IERS data used by OPT.
+
+    The age is the time from the last measured (not predicted) values in the table until now.
+
+    Returns:
+        (dict): Dictionary with the keys *Path*, *LastMeasured* (date as a str) and *Age [days]*.
+
+    """
+
+    table = IERS_table()
+
+    LastMeasured = datetime.date(1858, 11, 17) + datetime.timedelta(
+        days=float(table.meta["predictive_mjd"])
+    )
+    Age = (datetime.datetime.now(datetime.timezone.utc).date() - LastMeasured).days
+
+    return {"Path": _IERS_path, "LastMeasured": str(LastMeasured), "Age [days]": Age}
+
+
+def log_IERS_status(Logger):
+    """Logs the source and the age of the IERS data, with a warning if it is older than *MaxAge*.
+
+    Arguments:
+        Logger (:obj:`logging.Logger`): Logger used to log the status.
+
+    """
+
+    Status = IERS_status()
+    Logger.info("IERS data: %s", Status)
+    if Status["Age [days]"] > MaxAge:
+        Logger.warning(
+            "The IERS data is %s days old. Run OPT.Update_IERS() with network access to refresh it.",
+            Status["Age [days]"],
+        )
+
+
+def update_IERS():
+    """Downloads the latest IERS-A table into the Astropy download cache and uses it from now on. Requires network access.
+
+    Returns:
+        (dict): The status of the new IERS data, see *IERS_status*.
+
+    """
+
+    global _IERS_table
+
+    download_file(
+        iers.IERS_A_URL,
+        cache="update",
+        sources=[iers.IERS_A_URL, iers.IERS_A_URL_MIRROR],
+    )
+    _IERS_table = None
+
+    return IERS_status()
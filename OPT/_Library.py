@@ -2,8 +2,11 @@
 """Functions that are commonly used by the Operational Planning Tool.
 """
 
-import ephem, importlib, time, logging, os, sys, astropy.time
-from pylab import (
+import ephem, importlib, json, time, logging, os, sys
+import atexit, gzip, logging.handlers, queue, shutil
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from numpy import (
     cos,
     sin,
     cross,
@@ -14,16 +17,44 @@ from pylab import (
     arccos,
     pi,
     floor,
+    ceil,
     around,
-    norm,
+    zeros,
+    arange,
+    where,
+    einsum,
+    atleast_1d,
+    broadcast_to,
+    searchsorted,
+    argsort,
+    clip,
+    concatenate,
+    isnan,
+    nan,
+    asarray,
+    ndarray,
+    ndim,
+    savez,
+    full,
+    maximum,
+    rint,
+    ones,
 )
+from numpy.linalg import norm
 from skyfield import api
 
-from OPT import _Globals, _MATS_coordinates
+from OPT import _Globals, _MATS_coordinates, _OrbitInterpolation, _Ephemeris, _MATS_attitude
 
 
-timescale_skyfield = api.load.timescale(builtin=True)
-database_skyfield = api.load("de421.bsp")
+def __getattr__(name):
+    """Loads *timescale_skyfield* and *database_skyfield* from *_Ephemeris* the first time they are used."""
+
+    if name == "timescale_skyfield":
+        return _Ephemeris.timescale()
+    elif name == "database_skyfield":
+        return _Ephemeris.database()
+
+    raise AttributeError("module " + __name__ + " has no attribute " + name)
 
 
 def rot_arbit(angle, u_v):
@@ -141,20 +172,13 @@ def lat_calculator(Satellite_skyfield, date):
     
     Arguments:
         Satellite_skyfield (:obj:`skyfield.sgp4lib.EarthSatellite`): A Skyfield object representing an EarthSatellite defined by a TLE.
-        date (:obj:`datetime.datetime`): The date of the calculation.
+        date (:obj:`ephem.Date` or array): The date, or array of dates, of the calculation.
     
     Returns: 
-        (float): Latitude given in degrees.
+        (float or array): Latitude given in degrees.
     """
 
-    year = date.year
-    month = date.month
-    day = date.day
-    hour = date.hour
-    minute = date.minute
-    second = date.second + date.microsecond / 1000000
-
-    date_skyfield = timescale_skyfield.utc(year, month, day, hour, minute, second)
+    date_skyfield = ephemDate_to_skyfield(date)
 
     satellite_geo = Satellite_skyfield.at(date_skyfield)
     satellite_subpoint = satellite_geo.subpoint()
@@ -163,13 +187,73 @@ def lat_calculator(Satellite_skyfield, date):
     return latitude
 
 
+def ephemDate_to_skyfield(dates):
+    """Converts an ephem.Date, or an array of ephem.Date floats, into a Skyfield Time object.
+    
+    ephem.Date is the number of UTC days since 1899/12/31 12:00 (Dublin Julian Day). The conversion is performed on the whole array at once
+    without creating any datetime objects, by adding the whole days to the day of the month and the fraction of the day as seconds.
+    
+    Arguments:
+        dates (:obj:`ephem.Date` or array): The date, or array of dates, to convert.
+        
+    Returns:
+        (:obj:`skyfield.timelib.Time`): A Skyfield Time object, with the same shape as *dates*.
+        
+    """
+
+    "Days since 1899/12/31 00:00 UTC"
+    days = asarray(dates, dtype=float) + 0.5
+    whole_days = floor(days)
+
+    return _Ephemeris.timescale().utc(
+        1899, 12, 31 + whole_days, 0, 0, (days - whole_days) * 86400
+    )
+
+
+def track_interpolator(dates, TrackDates, TrackValues, MaxGap=20):
+    """Linearly interpolates values of an already simulated track at given dates.
+    
+    The track is searched with *searchsorted* and only dates in between two points of the track separated by at most *MaxGap* seconds are interpolated.
+    
+    Arguments:
+        dates (array): Dates to interpolate at as ephem.Date floats.
+        TrackDates (array): Sorted dates of the track as ephem.Date floats.
+        TrackValues (array): Values of the track at *TrackDates*.
+        MaxGap (float): Maximum time [s] in between two points of the track for an interpolation to be made.
+    
+    Returns:
+        (array): Interpolated values. Equal to NaN where the dates are not covered by the track.
+    
+    """
+
+    dates = atleast_1d(dates)
+    interpolated_values = zeros(dates.shape) + nan
+
+    if len(TrackDates) < 2:
+        return interpolated_values
+
+    index = searchsorted(TrackDates, dates, side="right")
+    index0 = clip(index - 1, 0, len(TrackDates) - 1)
+    index1 = clip(index, 0, len(TrackDates) - 1)
+    gap = TrackDates[index1] - TrackDates[index0]
+
+    covered = (index > 0) & (index < len(TrackDates)) & (gap <= ephem.second * MaxGap)
+
+    weight = (dates[covered] - TrackDates[index0[covered]]) / gap[covered]
+    interpolated_values[covered] = TrackValues[index0[covered]] + weight * (
+        TrackValues[index1[covered]] - TrackValues[index0[covered]]
+    )
+
+    return interpolated_values
+
+
 def scheduler(Occupied_Timeline, date, endDate):
     """ Function that checks if the scheduled time is available.
     
     Changes the date until available or until no time is determined to be available.
     
     Arguments:
-        Occupied_Timeline (dict): A dictionary of currently planned Modes containing lists with their scheduled times ([startDate, endDate]) as ephem.Date class.
+        Occupied_Timeline (dict): A dictionary of currently planned Modes containing lists with their scheduled times ([startDate, endDate]) as ephem.Date class. Preferably an *OccupiedTimeline*, otherwise one is created.
         date (:obj:`ephem.Date`): The scheduled startdate of the current Mode.
         endDate (:obj:`ephem.Date`): The scheduled end-date of the current Mode.
     
@@ -182,36 +266,233 @@ def scheduler(Occupied_Timeline, date, endDate):
         
     """
 
-    iterations = 0
-    restart = True
-    "## Checks if date is available and postpones starting date of mode until available"
-    while restart == True:
-        restart = False
+    if not isinstance(Occupied_Timeline, OccupiedTimeline):
+        Occupied_Timeline = OccupiedTimeline(Occupied_Timeline)
 
-        "Extract the start and end dates of scheduled mode"
-        for busy_dates in Occupied_Timeline.values():
-            if busy_dates == []:
-                continue
+    return Occupied_Timeline.first_available(date, endDate)
+
+
+def _outdating(method):
+    "Wraps a method of list which changes the list in any other way than appending to it, which means that the index of the OccupiedTimeline needs to be rebuilt"
+
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self.Timeline._outdated = True
+        return result
+
+    return wrapper
+
+
+class _OccupiedList(list):
+    """List of the scheduled times of one Mode/CMD in an *OccupiedTimeline*, which keeps the index of the *OccupiedTimeline* updated when changed."""
+
+    def __init__(self, Timeline, key, busy_dates=()):
+        super().__init__(busy_dates)
+        self.Timeline = Timeline
+        self.key = key
+
+    def append(self, busy_date):
+        super().append(busy_date)
+        self.Timeline._add(self, busy_date)
+
+    extend = _outdating(list.extend)
+    insert = _outdating(list.insert)
+    remove = _outdating(list.remove)
+    pop = _outdating(list.pop)
+    clear = _outdating(list.clear)
+    sort = _outdating(list.sort)
+    reverse = _outdating(list.reverse)
+    __setitem__ = _outdating(list.__setitem__)
+    __delitem__ = _outdating(list.__delitem__)
+    __iadd__ = _outdating(list.__iadd__)
+    __imul__ = _outdating(list.__imul__)
+
+
+class OccupiedTimeline(dict):
+    """Dictionary of currently planned Modes/CMDs (Occupied_Timeline) containing lists with their scheduled times ([startDate, endDate]), indexed by the start dates of all scheduled times.
+    
+    Behaves like the dictionary of lists previously used as Occupied_Timeline, which means that Modes are scheduled by appending to the lists as before.
+    All scheduled times are additionally kept in a list sorted by their start dates, together with the longest scheduled duration. 
+    Only scheduled times starting less than the longest duration before a planned date can collide with it, which means that a collision is found with a binary search and a check of the few scheduled times close to the planned date,
+    instead of a check of every scheduled time. Appending to a list inserts the scheduled time into the sorted list, any other change of the lists causes the sorted list to be rebuilt at the next check.
+    
+    Scheduled times that collide are returned in the order of the dictionary and of the lists, which is the same order in which the scheduled times were checked previously.
+    
+    Arguments:
+        Occupied_Timeline (dict): A dictionary of currently planned Modes/CMDs containing lists with their scheduled times ([startDate, endDate]) as ephem.Date class. The lists are copied.
+        
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._ranks = {}
+        self._next_rank = 0
+        self._outdated = False
+        self._busy_dates = []
+        self._start_dates = []
+        self._max_duration = 0
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, busy_dates):
+        if key not in self:
+            self._ranks[key] = self._next_rank
+            self._next_rank += 1
+        super().__setitem__(key, _OccupiedList(self, key, busy_dates))
+        self._outdated = True
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        del self._ranks[key]
+        self._outdated = True
+
+    def update(self, *args, **kwargs):
+        for key, busy_dates in dict(*args, **kwargs).items():
+            self[key] = busy_dates
+
+    def setdefault(self, key, busy_dates=None):
+        if key not in self:
+            self[key] = [] if busy_dates is None else busy_dates
+        return self[key]
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._ranks = {key: self._ranks[key] for key in self}
+        self._outdated = True
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        del self._ranks[result[0]]
+        self._outdated = True
+        return result
+
+    def clear(self):
+        super().clear()
+        self._ranks = {}
+        self._outdated = True
+
+    def _add(self, busy_dates, busy_date):
+        "Insert a scheduled time, newly appended to a list of the dictionary, into the sorted list"
+        if self._outdated or self.get(busy_dates.key) is not busy_dates:
+            return
+
+        key = busy_dates.key
+        entry = (busy_date[0], self._ranks[key], len(busy_dates) - 1, busy_date[1], key)
+        position = bisect_right(self._busy_dates, entry)
+        self._busy_dates.insert(position, entry)
+        self._start_dates.insert(position, busy_date[0])
+        self._max_duration = max(self._max_duration, busy_date[1] - busy_date[0])
+
+    def _rebuild(self):
+        "Rebuild the sorted list from all lists of scheduled times"
+        self._busy_dates = sorted(
+            (busy_date[0], self._ranks[key], index, busy_date[1], key)
+            for key, busy_dates in self.items()
+            for index, busy_date in enumerate(busy_dates)
+        )
+        self._start_dates = [entry[0] for entry in self._busy_dates]
+        self._max_duration = max(
+            [0] + [entry[3] - entry[0] for entry in self._busy_dates]
+        )
+        self._outdated = False
+
+    def collisions(self, date, endDate, Inclusive=False):
+        """Finds the scheduled times that collide with a planned date.
+        
+        Arguments:
+            date (:obj:`ephem.Date`): The planned startdate.
+            endDate (:obj:`ephem.Date`): The planned end-date.
+            Inclusive (bool): If True, scheduled times which only touch the planned date are also counted as collisions.
+            
+        Returns:
+            (list): The colliding scheduled times as tuples (key, [startDate, endDate]), in the order of the dictionary and of the lists.
+        
+        """
+
+        if self._outdated:
+            self._rebuild()
+
+        "Only scheduled times starting at most the longest duration before date can collide. One second margin for rounding"
+        first = bisect_left(
+            self._start_dates, date - self._max_duration - ephem.second
+        )
+        last = bisect_right(self._start_dates, endDate)
+
+        collisions = []
+        for start_date, rank, index, end_date, key in self._busy_dates[first:last]:
+            if Inclusive == True:
+                collides = (
+                    start_date <= date <= end_date
+                    or start_date <= endDate <= end_date
+                    or (date < start_date and endDate > end_date)
+                )
             else:
+                collides = (
+                    start_date <= date < end_date
+                    or start_date < endDate <= end_date
+                    or (date < start_date and endDate > end_date)
+                )
+            if collides:
+                collisions.append((rank, index, key))
+
+        collisions.sort()
+
+        return [(key, self[key][index]) for rank, index, key in collisions]
+
+    def colliding_keys(self, date, endDate, Inclusive=False):
+        """Finds the Modes/CMDs with at least one scheduled time that collides with a planned date.
+        
+        Arguments:
+            date (:obj:`ephem.Date`): The planned startdate.
+            endDate (:obj:`ephem.Date`): The planned end-date.
+            Inclusive (bool): If True, scheduled times which only touch the planned date are also counted as collisions.
+            
+        Returns:
+            (list): Keys of the colliding Modes/CMDs, in the order of the dictionary.
+        
+        """
+
+        keys = []
+        for key, busy_date in self.collisions(date, endDate, Inclusive):
+            if key not in keys:
+                keys.append(key)
 
-                "Extract the start and end date of each instance of a scheduled mode"
-                for busy_date in busy_dates:
+        return keys
+
+    def first_available(self, date, endDate):
+        """Postpones a planned date until it does not collide with any scheduled time.
+        
+        Each time the planned date collides, it is postponed to the end of the first colliding scheduled time, 
+        which gives the first available time of the same duration at or after the planned date.
+        
+        Arguments:
+            date (:obj:`ephem.Date`): The planned startdate.
+            endDate (:obj:`ephem.Date`): The planned end-date.
+            
+        Returns:
+            (tuple): tuple containing:
+                
+                - **date** (*ephem.Date*): The scheduled startdate (potentially changed).
+                - **endDate** (*ephem.Date*): The scheduled end-date (potentially changed).
+                - **iterations** (*int*): The number of times the scheduled date got changed.
+        
+        """
 
-                    "If the planned date collides with any already scheduled ones -> post-pone and restart loop"
-                    if (
-                        busy_date[0] <= date < busy_date[1]
-                        or busy_date[0] < endDate <= busy_date[1]
-                        or (date < busy_date[0] and endDate > busy_date[1])
-                    ):
+        iterations = 0
+        "## Checks if date is available and postpones starting date of mode until available"
+        while True:
+            collisions = self.collisions(date, endDate)
+            if collisions == []:
+                break
 
-                        endDate = ephem.Date(endDate + abs(date - busy_date[1]))
-                        date = ephem.Date(busy_date[1])
+            "If the planned date collides with any already scheduled ones -> post-pone and check again"
+            busy_date = collisions[0][1]
+            endDate = ephem.Date(endDate + abs(date - busy_date[1]))
+            date = ephem.Date(busy_date[1])
 
-                        iterations = iterations + 1
-                        restart = True
-                        break
+            iterations = iterations + 1
 
-    return date, endDate, iterations
+        return date, endDate, iterations
 
 
 def dict_comparator(dict1, dict2, Logger=None):
@@ -255,29 +536,63 @@ def utc_to_onboardTime(utc_date):
     """Function which converts a date in utc into onboard time (GPS) in seconds and rounds to nearest 10th of a second.
     
     Arguments:
-        utc_date (:obj:`ephem.Date`): The date as a ephem.Date object.
+        utc_date (:obj:`ephem.Date` or array): The date as a ephem.Date object, or an array of dates.
         
     Returns:
-        (float): Onboard GPS time in seconds.
+        (float or array): Onboard GPS time in seconds.
         
     """
 
-    utc_TimeObject = astropy.time.Time(utc_date.datetime(), scale="utc")
-    onboardGPSTime = around(utc_TimeObject.gps, 1)
+    "GPS time starts at 1980/1/6 00:00 UTC (TAI - 19 s)"
+    GPS_epoch_JD = 2444244.5
+
+    utc_TimeObject = ephemDate_to_skyfield(utc_date)
+    onboardGPSTime = around(
+        (utc_TimeObject.whole - GPS_epoch_JD) * 86400
+        + utc_TimeObject.tai_fraction * 86400
+        - 19,
+        1,
+    )
 
     return onboardGPSTime
 
 
-def SetupLogger(LoggerName):
+def ConfigFile_Logger_settings(OPT_Config_File):
+    """Returns the *Logger_settings* of a *Configuration File* to be given to *SetupLogger*.
+    
+    Arguments:
+        OPT_Config_File (module): The imported *Configuration File*.
+    
+    Returns:
+        (dict): The settings returned by *Logger_settings* of the *Configuration File*, or None if it has no *Logger_settings* (*Configuration Files* made before it was added).
+    """
+
+    return getattr(OPT_Config_File, "Logger_settings", lambda: None)()
+
+
+def SetupLogger(LoggerName, Logger_settings=None):
     """Removes previous handlers and sets up a logger with both a file handler and a stream handler.
     
+    The file handler optionally rotates the log file when it reaches a certain size, and compresses the rotated log files with gzip. 
+    If *Logger_settings['Asynchronous']* is True, the handlers are instead attached to a *logging.handlers.QueueListener*, which writes the records in a background thread, 
+    and the logger only puts the records in a queue with a *logging.handlers.QueueHandler*. The messages are still formatted when logged, see *LazyMessage*.
+    
     Arguments:
         LoggerName (str): The name of the Logger.
+        Logger_settings (dict): Settings of the handlers, see *Logger_settings* in the *Configuration File*. If None, a synchronous file handler without rotation is used.
     
     Returns:
         None
     """
 
+    if Logger_settings is None:
+        Logger_settings = {
+            "Asynchronous": False,
+            "MaxBytes": 0,
+            "BackupCount": 0,
+            "Compress": False,
+        }
+
     Logger = logging.getLogger(LoggerName)
     name = sys._getframe(1).f_code.co_name
     "######## Try to Create a directory for storage of Logs #######"
@@ -286,24 +601,379 @@ def SetupLogger(LoggerName):
     except:
         pass
 
+    "Stop the writer thread of a previous asynchronous logger, which writes the records left in its queue"
+    StopLogListener(LoggerName)
+
     "Remove all previous handlers of the logger"
     for handler in Logger.handlers[:]:
         Logger.removeHandler(handler)
 
     timestr = time.strftime("%Y%m%d-%H%M%S")
     logstring = os.path.join("Logs_" + name, name + "__" + timestr + ".log")
-    Handler = logging.FileHandler(logstring, mode="a")
+    if Logger_settings["MaxBytes"] > 0:
+        Handler = logging.handlers.RotatingFileHandler(
+            logstring,
+            mode="a",
+            maxBytes=Logger_settings["MaxBytes"],
+            backupCount=Logger_settings["BackupCount"],
+        )
+        if Logger_settings["Compress"]:
+            Handler.namer = _gzip_namer
+            Handler.rotator = _gzip_rotator
+    else:
+        Handler = logging.FileHandler(logstring, mode="a")
     formatter = logging.Formatter(
         "%(levelname)6s : %(message)-80s :: %(module)s :: %(funcName)s"
     )
     Handler.setFormatter(formatter)
-    Logger.addHandler(Handler)
     Logger.setLevel(logging.DEBUG)
 
     streamHandler = logging.StreamHandler()
     streamHandler.setLevel(logging.INFO)
     streamHandler.setFormatter(formatter)
-    Logger.addHandler(streamHandler)
+
+    if Logger_settings["Asynchronous"]:
+        LogQueue = queue.SimpleQueue()
+        Listener = logging.handlers.QueueListener(
+            LogQueue, Handler, streamHandler, respect_handler_level=True
+        )
+        Listener.start()
+        Log_listeners[LoggerName] = Listener
+        Logger.addHandler(logging.handlers.QueueHandler(LogQueue))
+    else:
+        Logger.addHandler(Handler)
+        Logger.addHandler(streamHandler)
+
+
+"The QueueListener of each asynchronous logger set up by *SetupLogger*"
+Log_listeners = {}
+
+
+def StopLogListener(LoggerName):
+    """Stops the background writer thread of a logger set up by *SetupLogger*, after the records in its queue have been written, and closes its handlers.
+    
+    Does nothing if the logger is not asynchronous.
+    
+    Arguments:
+        LoggerName (str): The name of the Logger.
+    
+    Returns:
+        None
+    """
+
+    Listener = Log_listeners.pop(LoggerName, None)
+    if Listener is not None:
+        Listener.stop()
+        for handler in Listener.handlers:
+            handler.close()
+
+
+def StopLogListeners():
+    "Stops the writer threads of all asynchronous loggers. Called when the interpreter exits so that no records are lost."
+
+    for LoggerName in list(Log_listeners):
+        StopLogListener(LoggerName)
+
+
+atexit.register(StopLogListeners)
+
+
+def _gzip_namer(name):
+    "Names a rotated log file, see *SetupLogger*."
+
+    return name + ".gz"
+
+
+def _gzip_rotator(source, dest):
+    "Compresses a rotated log file with gzip and removes the uncompressed file, see *SetupLogger*."
+
+    with open(source, "rb") as file_in, gzip.open(dest, "wb") as file_out:
+        shutil.copyfileobj(file_in, file_out)
+    os.remove(source)
+
+
+def log_enabled(Logger, level=logging.DEBUG):
+    """Returns True if records of a level would be handled by a Logger.
+    
+    Used to skip the calculation of values which are only logged, for example in simulation loops.
+    
+    Arguments:
+        Logger (:obj:`logging.Logger`): The Logger, may be None.
+        level (int): The level of the records.
+        
+    Returns:
+        (bool): True if records of the level are handled by the Logger.
+        
+    """
+
+    return Logger is not None and Logger.isEnabledFor(level)
+
+
+class LazyMessage:
+    """A log message which is only formatted when a record is emitted by a handler.
+    
+    Used in place of a str as the message of a record which is expensive to format, for example *Logger.debug(LazyMessage(format_dict, 'Occupied_Timeline: ', Occupied_Timeline))*. 
+    The message is formatted by calling *function* with *args*, which is never done for records filtered by the level of the Logger.
+    
+    Arguments:
+        function (function): Function returning the message as a str.
+        *args: Arguments given to *function*.
+        
+    """
+
+    __slots__ = ("function", "args")
+
+    def __init__(self, function, *args):
+
+        self.function = function
+        self.args = args
+
+    def __str__(self):
+
+        return self.function(*self.args)
+
+
+def format_dict(prefix, dictionary):
+    """Formats a dictionary with one line for each key, preceded by a prefix. Used with *LazyMessage*.
+    
+    Arguments:
+        prefix (str): Text before the dictionary.
+        dictionary (dict): The dictionary.
+        
+    Returns:
+        (str): The formatted dictionary.
+        
+    """
+
+    return (
+        prefix
+        + "{"
+        + "\n".join("        {}: {}".format(k, v) for k, v in dictionary.items())
+        + "}"
+    )
+
+
+class LogRateLimiter:
+    """Limits the number of records logged from each site of debug logging in simulation loops.
+    
+    A site is identified by a key chosen by the caller, for example the name of the loop. 
+    For sites with a limit, the first *Burst* records are logged and after that only every *Every*:th record. Sites without a limit are not limited.
+    
+    Attributes:
+        limits (dict): The (Burst, Every) limit of each limited site.
+        default_limit (tuple): The (Burst, Every) limit of sites not in *limits*, or None to not limit them.
+        counts (dict): The number of records requested from each site.
+        logged (dict): The number of records logged from each site.
+        
+    """
+
+    def __init__(self):
+
+        self.limits = {}
+        self.default_limit = None
+        self.counts = {}
+        self.logged = {}
+
+    def set_limit(self, site, Burst, Every):
+        """Sets the limit of a site. If *site* is None, the default limit of all sites is set.
+        
+        Arguments:
+            site (str): The site.
+            Burst (int): The number of records which are logged before the site is limited.
+            Every (int): Every *Every*:th record is logged after the first *Burst* records.
+            
+        Returns:
+            None
+            
+        """
+
+        if site is None:
+            self.default_limit = (Burst, Every)
+        else:
+            self.limits[site] = (Burst, Every)
+
+    def __call__(self, site):
+        """Counts a record from a site and returns True if it shall be logged.
+        
+        Arguments:
+            site (str): The site.
+            
+        Returns:
+            (bool): True if the record shall be logged.
+            
+        """
+
+        count = self.counts.get(site, 0) + 1
+        self.counts[site] = count
+
+        limit = self.limits.get(site, self.default_limit)
+        if limit is not None:
+            Burst, Every = limit
+            if count > Burst and (count - Burst) % Every != 0:
+                return False
+
+        self.logged[site] = self.logged.get(site, 0) + 1
+        return True
+
+    def suppressed(self):
+        """Returns the number of records which were not logged from each site.
+        
+        Returns:
+            (dict): The number of suppressed records of each site with suppressed records.
+            
+        """
+
+        return {
+            site: count - self.logged.get(site, 0)
+            for site, count in self.counts.items()
+            if count != self.logged.get(site, 0)
+        }
+
+    def clear(self):
+        "Resets the counts of all sites, but keeps the limits."
+
+        self.counts.clear()
+        self.logged.clear()
+
+
+"Rate limiter shared by all sites of debug logging in the process"
+Log_rate_limiter = LogRateLimiter()
+
+
+def log_debug(Logger, site, msg, *args):
+    """Logs a debug record which is formatted lazily as *msg % args*, if the Logger handles debug records and the rate limit of the site allows it.
+    
+    Arguments:
+        Logger (:obj:`logging.Logger`): The Logger, may be None.
+        site (str): The site of the record, see *LogRateLimiter*. If None, the record is not rate limited.
+        msg (str): The message, with %-style placeholders for *args*.
+        *args: Arguments of the message.
+        
+    Returns:
+        (bool): True if the record was logged.
+        
+    """
+
+    if Logger is None or not Logger.isEnabledFor(logging.DEBUG):
+        return False
+    if site is not None and not Log_rate_limiter(site):
+        return False
+
+    Logger.debug(msg, *args, stacklevel=2)
+    return True
+
+
+class TraceSink:
+    """Sink for numeric traces of simulations, which is cheaper to write and easier to analyze than debug logs.
+    
+    Each record is a name and a set of numeric values. If *path* ends with '.npz' the records are collected and saved as arrays in a binary .npz file (one array for each name and value, named *name/value*) when the sink is closed.
+    Otherwise each record is written as a JSON object on its own line, with the name under the key 'record'.
+    
+    Arguments:
+        path (str): Path of the file.
+        
+    Attributes:
+        records (int): Number of written records.
+        
+    """
+
+    def __init__(self, path):
+
+        self.path = path
+        self.records = 0
+        self.binary = path.endswith(".npz")
+
+        if self.binary:
+            self.columns = {}
+            self.file = None
+        else:
+            self.file = open(path, "w")
+
+    def write(self, name, **values):
+        """Writes a record.
+        
+        Arguments:
+            name (str): Name of the record, for example the name of the simulation loop.
+            **values: Numeric values (scalars or arrays) of the record.
+            
+        Returns:
+            None
+            
+        """
+
+        self.records += 1
+
+        if self.binary:
+            for key, value in values.items():
+                self.columns.setdefault(name + "/" + key, []).append(value)
+        else:
+            record = {"record": name}
+            for key, value in values.items():
+                record[key] = value.tolist() if hasattr(value, "tolist") else value
+            self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        "Writes the collected records of a binary sink and closes the file."
+
+        if self.binary:
+            savez(self.path, **{key: array(value) for key, value in self.columns.items()})
+            self.columns = {}
+        elif not self.file.closed:
+            self.file.close()
+
+
+"The TraceSink used by *trace*, None if numeric traces are not written"
+Trace_sink = None
+
+
+def SetupTraceSink(path):
+    """Starts writing numeric traces with *trace* to a file, see *TraceSink*. A previous sink is closed.
+    
+    Arguments:
+        path (str): Path of the file, ending with '.npz' for a binary file or otherwise written as JSON lines.
+        
+    Returns:
+        (:obj:`TraceSink`): The sink.
+        
+    """
+
+    global Trace_sink
+
+    CloseTraceSink()
+    Trace_sink = TraceSink(path)
+
+    return Trace_sink
+
+
+def CloseTraceSink():
+    """Closes the sink of numeric traces, after which *trace* does nothing.
+    
+    Returns:
+        None
+        
+    """
+
+    global Trace_sink
+
+    if Trace_sink is not None:
+        Trace_sink.close()
+        Trace_sink = None
+
+
+def trace(name, **values):
+    """Writes a record of numeric values to the sink set up by *SetupTraceSink*. Does nothing if no sink is set up.
+    
+    Arguments:
+        name (str): Name of the record.
+        **values: Numeric values (scalars or arrays) of the record.
+        
+    Returns:
+        None
+        
+    """
+
+    if Trace_sink is not None:
+        Trace_sink.write(name, **values)
 
 
 def calculate_time_per_row(NCOL, NCBIN, NCBINFPGA, NRSKIP, NROW, NRBIN, NFLUSH):
@@ -320,6 +990,8 @@ def calculate_time_per_row(NCOL, NCBIN, NCBINFPGA, NRSKIP, NROW, NRBIN, NFLUSH):
     
     Created by Georgi Olentsenko at KTH.
     
+    The arguments may also be arrays (of the same shape), in which case the readout times of all the CCD settings are calculated at once.
+    
     Arguments:
         NCOL (int): Number of columns
         NCBIN (int): Number of columns to bin
@@ -330,24 +1002,31 @@ def calculate_time_per_row(NCOL, NCBIN, NCBINFPGA, NRSKIP, NROW, NRBIN, NFLUSH):
         NFLUSH (int): Number of pre-exposure flushes
     
     Returns:
-        (float): Readout time in ms. 
+        (tuple): tuple containing:
+            
+            - **T_readout** (*float*): Readout time in ms.
+            - **T_delay** (*float*): Exposure start delay in ms.
+            - **T_row_extra** (*float*): Smearing time of each row in ms.
         
     """
 
+    Scalar = all(
+        ndim(argument) == 0
+        for argument in (NCOL, NCBIN, NCBINFPGA, NRSKIP, NROW, NRBIN, NFLUSH)
+    )
+
     # image parameters
-    ncol = int(NCOL) + 1
-    ncolbinC = int(NCBIN)
-    if ncolbinC == 0:
-        ncolbinC = 1
-    ncolbinF = 2 ** int(NCBINFPGA)
+    ncol = asarray(NCOL).astype(int) + 1
+    ncolbinC = asarray(NCBIN).astype(int)
+    ncolbinC = where(ncolbinC == 0, 1, ncolbinC)
+    ncolbinF = 2 ** asarray(NCBINFPGA).astype(int)
 
-    nrow = int(NROW)
-    nrowbin = int(NRBIN)
-    if nrowbin == 0:
-        nrowbin = 1
-    nrowskip = int(NRSKIP)
+    nrow = asarray(NROW).astype(int)
+    nrowbin = asarray(NRBIN).astype(int)
+    nrowbin = where(nrowbin == 0, 1, nrowbin)
+    nrowskip = asarray(NRSKIP).astype(int)
 
-    n_flush = int(NFLUSH)
+    n_flush = asarray(NFLUSH).astype(int)
 
     # timing settings
     full_timing = 0  # TODO <-- meaning?
@@ -384,10 +1063,11 @@ def calculate_time_per_row(NCOL, NCBIN, NCBINFPGA, NRSKIP, NROW, NRBIN, NFLUSH):
         n_pixels_full = 2148
         n_pixels_fast = 0
     else:
-        if ncolbinC < 2:  # no CCD binning
-            n_pixels_full = ncol * ncolbinF
-        else:  # there are two "slow" pixels for one superpixel to be read out
-            n_pixels_full = 2 * ncol * ncolbinF
+        n_pixels_full = where(
+            ncolbinC < 2,
+            ncol * ncolbinF,  # no CCD binning
+            2 * ncol * ncolbinF,  # there are two "slow" pixels for one superpixel to be read out
+        )
         n_pixels_fast = 2148 - n_pixels_full
 
     # time to read out one row
@@ -407,11 +1087,21 @@ def calculate_time_per_row(NCOL, NCBIN, NCBINFPGA, NRSKIP, NROW, NRBIN, NFLUSH):
     # For smearing correction, this is the "extra exposure time" for each of the rows.
     T_row_extra = T_row_read + T_row_shift * nrowbin
 
+    if Scalar:
+        return float(T_readout / 1e6), float(T_delay / 1e6), float(T_row_extra / 1e6)
+
     return T_readout / 1e6, T_delay / 1e6, T_row_extra / 1e6
 
 
-def SyncArgCalculator(CCD_settings, ExtraOffset, ExtraIntervalTime):
-    """Calculates appropriate arguments for the CCD Synchonize CMD.
+"The CCDs synchronized by the CCD Synchronize CMD, in the order of which their settings are compared by *_SyncArgCalculator*"
+SyncArg_CCDSELs = (16, 32, 1, 8, 2, 4)
+
+"The CCD settings which *SyncArgCalculator* depends on"
+SyncArg_settings = ("TEXPMS", "NCOL", "NCBIN", "NCBINFPGA", "NRSKIP", "NROW", "NRBIN", "NFLUSH")
+
+
+def _SyncArgCalculator(CCD_settings, ExtraOffset, ExtraIntervalTime):
+    """Calculates appropriate arguments for the CCD Synchonize CMD. Not cached, see *SyncArgCalculator*.
     
     Does not take into account the nadir CCD as it is not required to synchronize, because interference caused by the nadir CCD is low.
     The CCDs are offset in order of ExposureTime (TEXPMS) with the CCD with the shortest ExposureTime being the leading CCD. \n
@@ -443,88 +1133,21 @@ def SyncArgCalculator(CCD_settings, ExtraOffset, ExtraIntervalTime):
     CCDSEL_2 = CCD_settings[2]
     CCDSEL_4 = CCD_settings[4]
 
-    "Calculate Readout Times for the CCDs"
-    ReadOutTime = []
-
+    "Calculate Readout Times for the CCDs, all at once"
     T_readout, T_delay, T_Extra = calculate_time_per_row(
-        NCOL=CCDSEL_16["NCOL"],
-        NCBIN=CCDSEL_16["NCBIN"],
-        NCBINFPGA=CCDSEL_16["NCBINFPGA"],
-        NRSKIP=CCDSEL_16["NRSKIP"],
-        NROW=CCDSEL_16["NROW"],
-        NRBIN=CCDSEL_16["NRBIN"],
-        NFLUSH=CCDSEL_16["NFLUSH"],
-    )
-    ReadOutTime_16 = T_readout + T_delay + T_Extra
-    ReadOutTime.append(int(ReadOutTime_16))
-
-    T_readout, T_delay, T_Extra = calculate_time_per_row(
-        NCOL=CCDSEL_32["NCOL"],
-        NCBIN=CCDSEL_32["NCBIN"],
-        NCBINFPGA=CCDSEL_32["NCBINFPGA"],
-        NRSKIP=CCDSEL_32["NRSKIP"],
-        NROW=CCDSEL_32["NROW"],
-        NRBIN=CCDSEL_32["NRBIN"],
-        NFLUSH=CCDSEL_32["NFLUSH"],
-    )
-    ReadOutTime_32 = T_readout + T_delay + T_Extra
-    ReadOutTime.append(int(ReadOutTime_32))
-
-    T_readout, T_delay, T_Extra = calculate_time_per_row(
-        NCOL=CCDSEL_1["NCOL"],
-        NCBIN=CCDSEL_1["NCBIN"],
-        NCBINFPGA=CCDSEL_1["NCBINFPGA"],
-        NRSKIP=CCDSEL_1["NRSKIP"],
-        NROW=CCDSEL_1["NROW"],
-        NRBIN=CCDSEL_1["NRBIN"],
-        NFLUSH=CCDSEL_1["NFLUSH"],
-    )
-    ReadOutTime_1 = T_readout + T_delay + T_Extra
-    ReadOutTime.append(int(ReadOutTime_1))
-
-    T_readout, T_delay, T_Extra = calculate_time_per_row(
-        NCOL=CCDSEL_8["NCOL"],
-        NCBIN=CCDSEL_8["NCBIN"],
-        NCBINFPGA=CCDSEL_8["NCBINFPGA"],
-        NRSKIP=CCDSEL_8["NRSKIP"],
-        NROW=CCDSEL_8["NROW"],
-        NRBIN=CCDSEL_8["NRBIN"],
-        NFLUSH=CCDSEL_8["NFLUSH"],
-    )
-    ReadOutTime_8 = T_readout + T_delay + T_Extra
-    ReadOutTime.append(int(ReadOutTime_8))
-
-    T_readout, T_delay, T_Extra = calculate_time_per_row(
-        NCOL=CCDSEL_2["NCOL"],
-        NCBIN=CCDSEL_2["NCBIN"],
-        NCBINFPGA=CCDSEL_2["NCBINFPGA"],
-        NRSKIP=CCDSEL_2["NRSKIP"],
-        NROW=CCDSEL_2["NROW"],
-        NRBIN=CCDSEL_2["NRBIN"],
-        NFLUSH=CCDSEL_2["NFLUSH"],
-    )
-    ReadOutTime_2 = T_readout + T_delay + T_Extra
-    ReadOutTime.append(int(ReadOutTime_2))
-
-    T_readout, T_delay, T_Extra = calculate_time_per_row(
-        NCOL=CCDSEL_4["NCOL"],
-        NCBIN=CCDSEL_4["NCBIN"],
-        NCBINFPGA=CCDSEL_4["NCBINFPGA"],
-        NRSKIP=CCDSEL_4["NRSKIP"],
-        NROW=CCDSEL_4["NROW"],
-        NRBIN=CCDSEL_4["NRBIN"],
-        NFLUSH=CCDSEL_4["NFLUSH"],
+        *[
+            array([CCD_settings[CCDSEL][name] for CCDSEL in SyncArg_CCDSELs])
+            for name in ("NCOL", "NCBIN", "NCBINFPGA", "NRSKIP", "NROW", "NRBIN", "NFLUSH")
+        ]
     )
-    ReadOutTime_4 = T_readout + T_delay + T_Extra
-    ReadOutTime.append(int(ReadOutTime_4))
-
-    """
-    T_readout, T_delay, T_Extra = calculate_time_per_row(NCOL = CCDSEL_64['NCOL'], NCBIN = CCDSEL_64['NCBIN'], NCBINFPGA = CCDSEL_64['NCBINFPGA'], 
-                                                         NRSKIP = CCDSEL_64['NRSKIP'], NROW = CCDSEL_64['NROW'], 
-                                                         NRBIN = CCDSEL_64['NRBIN'], NFLUSH = CCDSEL_64['NFLUSH'])
-    ReadOutTime_64 = T_readout + T_delay + T_Extra
-    ReadOutTime.append(int(ReadOutTime_64))
-    """
+    (
+        ReadOutTime_16,
+        ReadOutTime_32,
+        ReadOutTime_1,
+        ReadOutTime_8,
+        ReadOutTime_2,
+        ReadOutTime_4,
+    ) = (T_readout + T_delay + T_Extra).tolist()
 
     "Sort ExposureTimes of the CCDs"
     ExpTimes = [
@@ -715,6 +1338,211 @@ def SyncArgCalculator(CCD_settings, ExtraOffset, ExtraIntervalTime):
     return CCDSEL, NCCD, TEXPIOFS, TEXPIMS
 
 
+def SyncArgCalculator_Vectorized(
+    TEXPMS, ReadOutTimes, TransferTimes, ExtraOffset, ExtraIntervalTime
+):
+    """Calculates TEXPIOFS and TEXPIMS of the CCD Synchronize CMD for many binning settings at once, in the same way as *_SyncArgCalculator*.
+
+    The Exposure Times are the same for all binning settings, which means that the CCDs are offset in the same order for all of them.
+
+    Arguments:
+        TEXPMS (list of int): Exposure Times [ms] of the CCDs, in the order of *SyncArg_CCDSELs*.
+        ReadOutTimes (array): Readout Times [ms] of the CCDs (6 x number of settings), including the exposure start delay and the smearing time of a row.
+        TransferTimes (array): Estimated Transfer Times [ms] of the CCDs (6 x number of settings).
+        ExtraOffset (int): Extra offset time [ms] that is added to an estimated ReadoutTime.
+        ExtraIntervalTime (int): Extra time [ms] that is added to the calculated Exposure Interval Time.
+
+    Returns:
+        (tuple): tuple containing:
+
+            - **TEXPIOFS** (*array of int*): Offset times [ms] of the CCDs (6 x number of settings), in the order of *SyncArg_CCDSELs*. Equal to -1 for CCDs with TEXPMS equal to zero.
+            - **TEXPIMS** (*array of int*): Minimum Exposure Interval Times [ms] (number of settings).
+
+    """
+
+    ReadOutTimes = asarray(ReadOutTimes, dtype=float)
+    TransferTimes = asarray(TransferTimes, dtype=float)
+    NumberOfSettings = ReadOutTimes.shape[1]
+
+    "Ties between equal ExposureTimes are resolved in the order of SyncArg_CCDSELs, as in _SyncArgCalculator"
+    Order = sorted(range(len(TEXPMS)), key=lambda x: TEXPMS[x])
+
+    TEXPIOFS = full(ReadOutTimes.shape, -1)
+    ExpInterval = full(NumberOfSettings, -float("inf"))
+    TransferTimesCombined = zeros(NumberOfSettings)
+
+    OffsetTime = zeros(NumberOfSettings)
+    previous_ExpTime = 0
+
+    "Calculate offset time in order of ExposureTime"
+    for x in Order:
+
+        ExpTime = TEXPMS[x]
+        OffsetTime = maximum(OffsetTime - (ExpTime - previous_ExpTime), 0)
+
+        if ExpTime == 0:
+            continue
+
+        TEXPIOFS[x] = (rint(OffsetTime / 10) * 10).astype(int)
+        OffsetTime = OffsetTime + (ReadOutTimes[x] + ExtraOffset)
+
+        ExpInterval = maximum(
+            ExpInterval, ReadOutTimes[x] + ExpTime + ExtraIntervalTime
+        )
+        TransferTimesCombined = TransferTimesCombined + TransferTimes[x]
+
+        previous_ExpTime = ExpTime
+
+    FirstExpTime = min(ExpTime for ExpTime in TEXPMS if ExpTime != 0)
+    MaxOffset = TEXPIOFS.max(axis=0)
+
+    "Increase the IntervalTime if the Exposure and Readout of the last CCD interferes with the Readout of the leading CCD, or if the CRB needs more time to transfer the images"
+    ExpInterval = where(
+        FirstExpTime <= MaxOffset, ExpInterval + (MaxOffset - FirstExpTime), ExpInterval
+    )
+    ExpInterval = where(
+        TransferTimesCombined > ExpInterval, TransferTimesCombined, ExpInterval
+    )
+
+    TEXPIMS = around(ExpInterval, -2).astype(int)
+
+    return TEXPIOFS, TEXPIMS
+
+
+class SyncArgCalculator_Cache:
+    """In-process cache of the results of *_SyncArgCalculator*, with a bounded size and least recently used eviction.
+    
+    The same CCD settings are synchronized by every CCD macro in XML_gen, and again by Mode1 at every transition between day and night and between latitudes. 
+    The results are stored with a key made of the settings of the synchronized CCDs which the calculation depends on (see *SyncArg_settings*) and the extra times.
+    
+    Arguments:
+        MaxSize (int): Maximum number of results kept in the cache.
+        
+    Attributes:
+        hits (int): Number of results found in the cache.
+        misses (int): Number of results not found in the cache.
+        
+    """
+
+    def __init__(self, MaxSize=1000):
+
+        self.MaxSize = MaxSize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, CCD_settings, ExtraOffset, ExtraIntervalTime):
+        """Returns the key of a calculation, which is a frozen copy of the CCD settings it depends on.
+        
+        Arguments:
+            CCD_settings (dict of dict of int): Dictionary containing settings for the CCDs.
+            ExtraOffset (int): Extra offset time [ms] that is added to an estimated ReadoutTime.
+            ExtraIntervalTime (int): Extra time [ms] that is added to the calculated Exposure Interval Time.
+            
+        Returns:
+            (tuple): The key.
+            
+        """
+
+        return (
+            tuple(
+                tuple(CCD_settings[CCDSEL][name] for name in SyncArg_settings)
+                for CCDSEL in SyncArg_CCDSELs
+            ),
+            ExtraOffset,
+            ExtraIntervalTime,
+        )
+
+    def get(self, key):
+        """Returns the cached result of *key*, or None if it is not cached."""
+
+        result = self.results.get(key)
+
+        if result == None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.results.move_to_end(key)
+
+        CCDSEL, NCCD, TEXPIOFS, TEXPIMS = result
+        return CCDSEL, NCCD, list(TEXPIOFS), TEXPIMS
+
+    def put(self, key, result):
+        """Stores a result, evicting the least recently used ones if the cache is full."""
+
+        CCDSEL, NCCD, TEXPIOFS, TEXPIMS = result
+        self.results[key] = (CCDSEL, NCCD, tuple(TEXPIOFS), TEXPIMS)
+        self.results.move_to_end(key)
+
+        while len(self.results) > self.MaxSize:
+            self.results.popitem(last=False)
+
+    def clear(self):
+        """Removes all cached results and resets the statistics."""
+
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def statistics(self):
+        """Returns the statistics of the cache.
+        
+        Returns:
+            (dict): Dictionary containing the number of hits and misses, the hit rate and the current and maximum size of the cache.
+            
+        """
+
+        requests = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "HitRate": self.hits / requests if requests != 0 else 0.0,
+            "size": len(self.results),
+            "MaxSize": self.MaxSize,
+        }
+
+    def log_statistics(self, Logger):
+        """Logs the statistics of the cache."""
+
+        Logger.info("CCD synchronization cache: " + str(self.statistics()))
+
+
+"Cache shared by all CCD synchronizations in the process"
+SyncArg_cache = SyncArgCalculator_Cache()
+
+
+def SyncArgCalculator(CCD_settings, ExtraOffset, ExtraIntervalTime):
+    """Calculates appropriate arguments for the CCD Synchonize CMD, reusing earlier results for the same CCD settings.
+    
+    See *_SyncArgCalculator* for a description of the calculation. The results are cached in *SyncArg_cache*.
+    
+    Arguments:
+        CCD_settings (dict of dict of int): Dictionary containing settings for the CCDs.
+        ExtraOffset (int): Extra offset time [ms] that is added to an estimated ReadoutTime.
+        ExtraIntervalTime (int): Extra time [ms] that is added to the calculated Exposure Interval Time.
+        
+    Returns:
+        (tuple): tuple containing:
+            
+            - **CCDSEL** (*int*): Calculated CCDSEL argument for the CCD Synchronize CMD.
+            - **NCCD** (*int*): Calculated NCCD argument for the CCD Synchronize CMD.
+            - **TEXPIOFS** (*list of int*): Calculated TEXPIOFS argument for the CCD Synchronize CMD.
+            - **TEXPIMS** (*int*): Calculated minimum Exposure Interval Time [ms].
+        
+    """
+
+    key = SyncArg_cache.key(CCD_settings, ExtraOffset, ExtraIntervalTime)
+
+    result = SyncArg_cache.get(key)
+    if result == None:
+        result = _SyncArgCalculator(CCD_settings, ExtraOffset, ExtraIntervalTime)
+        SyncArg_cache.put(key, result)
+
+    return result
+
+
 def OrderingOfCCDSnapshots(CCD_settings):
     """Calculates a list of CCDSEL (1,2,4,8,16,32) arguments corresponding to their TEXPMS in increasing order.
     
@@ -802,6 +1630,326 @@ def CCDSELExtracter(CCDSEL):
     return IndividualCCDSEL
 
 
+def EarthSatellite_from_TLE(TLE, Timeline_settings, Logger=None):
+    """Creates the object used to simulate a satellite defined by a TLE.
+    
+    If *Timeline_settings['OrbitInterpolation_KnotSpacing']* is larger than 0, the satellite is only propagated with SGP4 at knots 
+    separated by this amount of seconds, and the position and velocity in between are interpolated (see *_OrbitInterpolation*).
+    Otherwise a skyfield.sgp4lib.EarthSatellite, which propagates every point in time with SGP4, is returned.
+    
+    Arguments:
+        TLE (list): A list containing the two rows of a TLE.
+        Timeline_settings (dict): A dictionary containing the settings of the Timeline.
+        Logger (:obj:`logging.Logger`): Logger used to report the estimated error of the interpolation.
+    
+    Returns:
+        (:obj:`skyfield.sgp4lib.EarthSatellite` or :obj:`OPT._OrbitInterpolation.InterpolatedSatellite`): Satellite_skyfield
+    
+    """
+
+    Satellite_skyfield = api.EarthSatellite(TLE[0], TLE[1])
+
+    KnotSpacing = Timeline_settings.get("OrbitInterpolation_KnotSpacing", 0)
+
+    if KnotSpacing > 0:
+        Satellite_skyfield = _OrbitInterpolation.InterpolatedSatellite(
+            Satellite_skyfield,
+            KnotSpacing,
+            Timeline_settings.get("OrbitInterpolation_MaxError", 1),
+            Logger,
+        )
+
+    return Satellite_skyfield
+
+
+class Satellite_Simulator_Cache:
+    """In-process cache of data simulated by *Satellite_Simulator* and *Satellite_Simulator_Batch*, with a bounded size and least recently used eviction.
+    
+    The data of each call is stored as a whole, with a key made of the satellite (the orbital elements of the TLE and the settings of the orbit interpolation, see *SatelliteKey*), 
+    the array of times (rounded to 10 microseconds), the pointing altitudes, the yaw settings and the track used to estimate the latitude of the LP. 
+    A call is only found in the cache if it simulates exactly the same points in time as a previous call, for example when a program is run again in the same process.
+    Storing calls as a whole keeps the cost of the cache negligible compared to the vectorized simulation.
+    
+    Points in time on the grid of the orbit products added with *add_OrbitProduct* (see *OPT._OrbitProduct*) are read from them instead, 
+    which is how the data is shared between Timeline_gen, XML_gen and Timeline_Plotter even though they simulate different points in time.
+    
+    Arguments:
+        MaxSize (int): Maximum number of points in time kept in the cache, summed over all cached calls. Each point in time uses about 0.3 kB of memory, 
+            and the default of 400000 covers a week simulated with a timestep of 2 s.
+        
+    Attributes:
+        hits (int): Number of points in time found in the cache or in an orbit product.
+        misses (int): Number of points in time not found in the cache.
+        OrbitProduct_hits (int): Number of points in time found in an orbit product.
+        OrbitProducts (list): The added orbit products.
+        size (int): Number of points in time currently kept in the cache.
+        
+    """
+
+    "Resolution of the time in the key [s]"
+    TimeResolution = 1e-5
+
+    def __init__(self, MaxSize=400000):
+
+        self.MaxSize = MaxSize
+        self.Satellite_dicts = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.OrbitProduct_hits = 0
+        self.OrbitProducts = []
+
+    def SatelliteKey(self, Satellite_skyfield):
+        """Returns the part of the key which identifies the satellite, made of the orbital elements of its TLE, its orbit engine and the settings of the orbit interpolation (see *OPT._OrbitInterpolation.InterpolatedSatellite*)."""
+
+        model = Satellite_skyfield.model
+
+        return (
+            type(Satellite_skyfield).__name__,
+            model.satnum,
+            model.jdsatepoch,
+            model.jdsatepochF,
+            model.no_kozai,
+            model.ecco,
+            model.inclo,
+            model.nodeo,
+            model.argpo,
+            model.mo,
+            model.bstar,
+        ) + tuple(getattr(Satellite_skyfield, "InterpolationSettings", ()))
+
+    def SettingsKey(self, Timeline_settings):
+        """Returns the part of the key made of the yaw settings in *Timeline_settings*."""
+
+        return (
+            Timeline_settings["yaw_correction"],
+            Timeline_settings.get("yaw_amplitude"),
+            Timeline_settings.get("yaw_phase"),
+        )
+
+    def TimeKeys(self, SimulationTimes):
+        """Returns the times (ephem.Date floats) as integer multiples of *TimeResolution*."""
+
+        return rint(
+            atleast_1d(array(SimulationTimes, dtype=float)) / ephem.second / self.TimeResolution
+        ).astype("int64")
+
+    def key(
+        self,
+        SatelliteKey,
+        SimulationTimes,
+        Timeline_settings,
+        pointing_altitude,
+        Track=None,
+        Function="Satellite_Simulator_Batch",
+    ):
+        """Returns the key of a call.
+        
+        Arguments:
+            SatelliteKey (tuple): Output of *SatelliteKey*.
+            SimulationTimes (array): The times of the simulation as ephem.Date floats.
+            Timeline_settings (dict): A dictionary containing relevant settings to the simulation.
+            pointing_altitude (float or array): Contains the pointing altitude of the simulation [km]. Either a single value or one value for each point in time.
+            Track (tuple): The *Track* given to *Satellite_Simulator_Batch*, if any.
+            Function (str): Name of the simulating function, as *Satellite_Simulator* returns scalars and *Satellite_Simulator_Batch* arrays.
+            
+        Returns:
+            (tuple): The key.
+            
+        """
+
+        TimeKeys = self.TimeKeys(SimulationTimes)
+
+        if Track is not None:
+            Track = (
+                self.TimeKeys(Track[0]).tobytes(),
+                array(Track[1], dtype=float).tobytes(),
+            )
+
+        return (
+            Function,
+            SatelliteKey,
+            TimeKeys.tobytes(),
+            broadcast_to(array(pointing_altitude, dtype=float), TimeKeys.shape).tobytes(),
+            self.SettingsKey(Timeline_settings),
+            Track,
+        )
+
+    def _copy(self, Satellite_dict):
+        """Copies the arrays of a Satellite_dict, so that neither the cache nor the caller can modify the data of the other."""
+
+        return {
+            name: value.copy() if isinstance(value, ndarray) else value
+            for name, value in Satellite_dict.items()
+        }
+
+    def get(self, key, size):
+        """Returns the cached Satellite_dict of *key*, or None if it is not cached.
+        
+        Arguments:
+            key (tuple): Output of *key*.
+            size (int): The number of points in time of the call, counted as hits if it is cached. Otherwise nothing is counted, see *count*.
+            
+        """
+
+        Satellite_dict = self.Satellite_dicts.get(key)
+
+        if Satellite_dict == None:
+            return None
+
+        self.hits += size
+        self.Satellite_dicts.move_to_end(key)
+
+        return self._copy(Satellite_dict[1])
+
+    def count(self, OrbitProduct_hits=0, misses=0):
+        """Adds points in time which were not found in the cache to the statistics, either as found in an orbit product or as simulated."""
+
+        self.hits += OrbitProduct_hits
+        self.OrbitProduct_hits += OrbitProduct_hits
+        self.misses += misses
+
+    def put(self, key, Satellite_dict, size):
+        """Stores the Satellite_dict of a call with *size* points in time, evicting the least recently used calls if the cache is full."""
+
+        if size > self.MaxSize:
+            return
+
+        if key in self.Satellite_dicts:
+            self.size -= self.Satellite_dicts[key][0]
+        self.Satellite_dicts[key] = (size, self._copy(Satellite_dict))
+        self.Satellite_dicts.move_to_end(key)
+        self.size += size
+
+        while self.size > self.MaxSize:
+            self.size -= self.Satellite_dicts.popitem(last=False)[1][0]
+
+    def OrbitProduct_indices(
+        self, SatelliteKey, SimulationTimes, Timeline_settings, pointing_altitude
+    ):
+        """Looks up points in time in the added orbit products.
+        
+        Arguments:
+            SatelliteKey (tuple): Output of *SatelliteKey*.
+            SimulationTimes (array): The times of the simulation as ephem.Date floats.
+            Timeline_settings (dict): A dictionary containing relevant settings to the simulation. If None, orbit products with any yaw settings are used, which is only correct for data that does not depend on the pointing.
+            pointing_altitude (float or array): Contains the pointing altitude of the simulation [km]. Either a single value or one value for each point in time. If None, orbit products with any pointing altitude are used.
+            
+        Returns:
+            (list): List of tuples containing an orbit product and the indices of the points in time in it, or -1 if a point in time is not covered by it. 
+            Each point in time is only covered by the first orbit product which has it.
+            
+        """
+
+        TimeKeys = self.TimeKeys(SimulationTimes)
+        if pointing_altitude is not None:
+            pointing_altitude = broadcast_to(array(pointing_altitude, dtype=float), TimeKeys.shape)
+        SettingsKey = self.SettingsKey(Timeline_settings) if Timeline_settings != None else None
+        covered = zeros(TimeKeys.shape, dtype=bool)
+
+        Indices = []
+        for OrbitProduct in self.OrbitProducts:
+            indices = OrbitProduct.indices(SatelliteKey, TimeKeys, SettingsKey, pointing_altitude)
+            indices[covered] = -1
+            covered |= indices != -1
+            Indices.append((OrbitProduct, indices))
+
+        return Indices
+
+    def OrbitProduct_grid(
+        self,
+        SatelliteKey,
+        StartDate,
+        EndDate,
+        GridSpacing,
+        Timeline_settings=None,
+        pointing_altitude=None,
+    ):
+        """Returns the grid of the first added orbit product which covers a time window, to be used by *event_finder*.
+        
+        Arguments:
+            SatelliteKey (tuple): Output of *SatelliteKey*.
+            StartDate (:obj:`ephem.Date`): Start of the time window.
+            EndDate (:obj:`ephem.Date`): End of the time window.
+            GridSpacing (float): Wanted spacing of the grid [s].
+            Timeline_settings (dict): Optional. If given, only orbit products with the same yaw settings are used.
+            pointing_altitude (float): Optional. If given, only orbit products with the same pointing altitude [km] are used.
+            
+        Returns:
+            (array): The dates (ephem.Date floats) of the grid (see *OPT._OrbitProduct.OrbitProduct.grid*), or None if no orbit product covers the time window.
+            
+        """
+
+        for OrbitProduct in self.OrbitProducts:
+            if OrbitProduct.SatelliteKey != SatelliteKey:
+                continue
+            if (
+                Timeline_settings != None
+                and OrbitProduct.SettingsKey != self.SettingsKey(Timeline_settings)
+            ):
+                continue
+            if (
+                pointing_altitude != None
+                and OrbitProduct.pointing_altitude != float(pointing_altitude)
+            ):
+                continue
+
+            GridDates = OrbitProduct.grid(StartDate, EndDate, GridSpacing)
+            if GridDates is not None:
+                return GridDates
+
+        return None
+
+    def add_OrbitProduct(self, OrbitProduct):
+        """Adds an orbit product in which points in time not found in the cache are looked up.
+        
+        Arguments:
+            OrbitProduct (:obj:`OPT._OrbitProduct.OrbitProduct`): The orbit product.
+            
+        """
+
+        if OrbitProduct.path not in [Product.path for Product in self.OrbitProducts]:
+            self.OrbitProducts.append(OrbitProduct)
+
+    def clear(self):
+        """Removes all cached data and orbit products and resets the statistics."""
+
+        self.Satellite_dicts.clear()
+        self.size = 0
+        self.OrbitProducts = []
+        self.hits = 0
+        self.misses = 0
+        self.OrbitProduct_hits = 0
+
+    def statistics(self):
+        """Returns the statistics of the cache.
+        
+        Returns:
+            (dict): Dictionary containing the number of hits and misses (points in time), the number of hits found in orbit products, the hit rate and the current and maximum size of the cache (points in time).
+            
+        """
+
+        requests = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "OrbitProductHits": self.OrbitProduct_hits,
+            "HitRate": self.hits / requests if requests != 0 else 0.0,
+            "size": self.size,
+            "MaxSize": self.MaxSize,
+        }
+
+    def log_statistics(self, Logger):
+        """Logs the statistics of the cache."""
+
+        Logger.info("Satellite simulation cache: " + str(self.statistics()))
+
+
+"Cache shared by all simulations in the process"
+Satellite_cache = Satellite_Simulator_Cache()
+
+
 def Satellite_Simulator(
     Satellite_skyfield,
     SimulationTime,
@@ -830,6 +1978,34 @@ def Satellite_Simulator(
         
     """
 
+    "Return previously simulated data if available"
+    SatelliteKey = Satellite_cache.SatelliteKey(Satellite_skyfield)
+    key = Satellite_cache.key(
+        SatelliteKey,
+        SimulationTime,
+        Timeline_settings,
+        pointing_altitude,
+        Function="Satellite_Simulator",
+    )
+    Satellite_dict = Satellite_cache.get(key, 1)
+    if Satellite_dict == None:
+        for OrbitProduct, indices in Satellite_cache.OrbitProduct_indices(
+            SatelliteKey, SimulationTime, Timeline_settings, pointing_altitude
+        ):
+            if indices[0] != -1:
+                Satellite_dict = {
+                    name: float(value[0]) if value.ndim == 1 else value[0]
+                    for name, value in OrbitProduct.get(indices).items()
+                }
+                Satellite_cache.count(OrbitProduct_hits=1)
+                Satellite_cache.put(key, Satellite_dict, 1)
+                break
+    if Satellite_dict != None:
+        if LogFlag == True and Logger != None:
+            Satellite_Simulator_Logger(Satellite_dict, SimulationTime, Logger)
+        return Satellite_dict
+    Satellite_cache.count(misses=1)
+
     U = 398600.441800000  # Earth gravitational parameter
     R_mean = 6371.000
     celestial_eq = [0, 0, 1]
@@ -839,17 +2015,7 @@ def Satellite_Simulator(
 
     yaw_correction = Timeline_settings["yaw_correction"]
 
-    current_time_datetime = ephem.Date(SimulationTime).datetime()
-    year = current_time_datetime.year
-    month = current_time_datetime.month
-    day = current_time_datetime.day
-    hour = current_time_datetime.hour
-    minute = current_time_datetime.minute
-    second = current_time_datetime.second + current_time_datetime.microsecond / 1000000
-
-    current_time_skyfield = timescale_skyfield.utc(
-        year, month, day, hour, minute, second
-    )
+    current_time_skyfield = ephemDate_to_skyfield(SimulationTime)
 
     Satellite_geo = Satellite_skyfield.at(current_time_skyfield)
     v_Satellite = Satellite_geo.velocity.km_per_s
@@ -878,7 +2044,7 @@ def Satellite_Simulator(
     "Estimation of lat of LP using the position of Satellite at a previous time"
     date_of_Satellitelat_is_equal_2_current_LPlat = ephem.Date(
         SimulationTime - ephem.second * time_between_LP_and_Satellite
-    ).datetime()
+    )
     lat_LP = lat_calculator(
         Satellite_skyfield, date_of_Satellitelat_is_equal_2_current_LPlat
     )
@@ -961,33 +2127,6 @@ def Satellite_Simulator(
     if optical_axis[1] < 0:
         RA_optical_axis = 360 - RA_optical_axis
 
-    if LogFlag == True and Logger != None:
-        Logger.debug("")
-
-        Logger.debug("SimulationTime time: " + str(SimulationTime))
-        Logger.debug("Semimajor axis in km: " + str(Satellite_p))
-        Logger.debug("Orbital Period in s: " + str(orbital_period))
-        Logger.debug("Vector to Satellite [km]: " + str(r_Satellite))
-        Logger.debug("Latitude in degrees: " + str(lat_Satellite))
-        Logger.debug("Longitude in degrees: " + str(long_Satellite))
-        Logger.debug("Altitude in km: " + str(alt_Satellite))
-        Logger.debug("Satellite_distance [km]: " + str(Satellite_distance))
-
-        Logger.debug("R_earth_LP [km]: " + str(R_earth_LP))
-
-        Logger.debug("Pitch [degrees]: " + str(Pitch))
-        Logger.debug("Yaw [degrees]: " + str(yaw_offset_angle))
-        Logger.debug("ArgOfLat [degrees]: " + str(arg_of_lat))
-        Logger.debug("Latitude of LP: " + str(lat_LP))
-        Logger.debug("Optical Axis: " + str(optical_axis_unit_vector))
-        Logger.debug(
-            "Orthogonal direction to H-offset plane: " + str(r_H_offset_normal)
-        )
-        Logger.debug(
-            "Orthogonal direction to V-offset plane: " + str(r_V_offset_normal)
-        )
-        Logger.debug("Orthogonal direction to the orbital plane: " + str(normal_orbit))
-
     Satellite_dict = {
         "Position [km]": r_Satellite,
         "Velocity [km/s]": v_Satellite,
@@ -1008,103 +2147,743 @@ def Satellite_Simulator(
         "EstimatedLatitude_LP [degrees]": lat_LP,
     }
 
+    Satellite_cache.put(key, Satellite_dict, 1)
+
+    if LogFlag == True and Logger != None:
+        Satellite_Simulator_Logger(Satellite_dict, SimulationTime, Logger)
+
     # return r_Satellite, lat_Satellite, long_Satellite, alt_Satellite, optical_axis_unit_vector, Dec_optical_axis, RA_optical_axis, r_H_offset_normal, r_V_offset_normal, orbital_period
     return Satellite_dict
 
 
-'''
-def IntrinsicEulerAnglesSLOF( VelocityVector, NegativeOrbitalNormal, NegativePosVector,):
-    """Calculates intrinsic Euler angles (ZYZ or Yaw, Pitch, Roll) defined from SLOF (Spacecraft Local Orbit Frame)
+def Satellite_Simulator_Logger(Satellite_dict, SimulationTime, Logger):
+    """Logs the data of a single point in time simulated by *Satellite_Simulator* or *Satellite_Simulator_Batch*.
+    
+    Nothing is formatted unless the Logger handles debug records, and the records are rate limited as the site 'Satellite_Simulator_Logger' (see *LogRateLimiter*). 
+    The data is also written to the sink of numeric traces if one is set up (see *SetupTraceSink*).
     
     Arguments:
-        VelocityVector (array): Velocity vector in GCRS. X basis vector in SLOF.
-        NegativeOrbitalNormal (array): Negative orbital normal vector in GCRS. Y basis vector in SLOF.
-        NegativePosVector (array): Negative positional vector in GCRS. Z basis vector in SLOF.
+        Satellite_dict (dict): Dictionary containing simulated data for a single point in time.
+        SimulationTime (:obj:`ephem.Date`): The time of the simulation.
+        Logger (:obj:`logging.Logger`): Logger used to log the result.
         
     Returns:
-        (tuple): tuple containing:
-            
-            - **Yaw** (*float*): Yaw angle in degrees.
-            - **Pitch** (*float*): Pitch angle in degrees.
-            - **Roll** (*float*): Roll angle in degrees.
-        
+        None
         
-    
     """
+
+    "Write the numeric values to the sink of numeric traces, if one is set up"
+    if Trace_sink is not None:
+        Trace_sink.write(
+            "Satellite_Simulator",
+            SimulationTime=float(SimulationTime),
+            **{
+                key: value
+                for key, value in Satellite_dict.items()
+                if not isinstance(value, str)
+            }
+        )
+
+    if not log_enabled(Logger) or not Log_rate_limiter("Satellite_Simulator_Logger"):
+        return
+
+    Satellite_distance = norm(Satellite_dict["Position [km]"])
+
+    Logger.debug("")
+
+    Logger.debug("SimulationTime time: %s", ephem.Date(SimulationTime))
+    Logger.debug("Semimajor axis in km: %s", Satellite_distance)
+    Logger.debug("Orbital Period in s: %s", Satellite_dict["OrbitalPeriod [s]"])
+    Logger.debug("Vector to Satellite [km]: %s", Satellite_dict["Position [km]"])
+    Logger.debug("Latitude in degrees: %s", Satellite_dict["Latitude [degrees]"])
+    Logger.debug("Longitude in degrees: %s", Satellite_dict["Longitude [degrees]"])
+    Logger.debug("Altitude in km: %s", Satellite_dict["Altitude [km]"])
+    Logger.debug("Satellite_distance [km]: %s", Satellite_distance)
+
+    Logger.debug(
+        "R_earth_LP [km]: %s", lat_2_R(Satellite_dict["EstimatedLatitude_LP [degrees]"])
+    )
+
+    Logger.debug("Pitch [degrees]: %s", Satellite_dict["Pitch [degrees]"])
+    Logger.debug("Yaw [degrees]: %s", Satellite_dict["Yaw [degrees]"])
+    Logger.debug("ArgOfLat [degrees]: %s", Satellite_dict["ArgOfLat [degrees]"])
+    Logger.debug(
+        "Latitude of LP: %s", Satellite_dict["EstimatedLatitude_LP [degrees]"]
+    )
+    Logger.debug("Optical Axis: %s", Satellite_dict["OpticalAxis"])
+    Logger.debug(
+        "Orthogonal direction to H-offset plane: %s", Satellite_dict["Normal2H_offset"]
+    )
+    Logger.debug(
+        "Orthogonal direction to V-offset plane: %s", Satellite_dict["Normal2V_offset"]
+    )
+    Logger.debug(
+        "Orthogonal direction to the orbital plane: %s", Satellite_dict["OrbitNormal"]
+    )
+
+
+def Satellite_Simulator_Batch(
+    Satellite_skyfield,
+    SimulationTimes,
+    Timeline_settings,
+    pointing_altitude,
+    StartDate=None,
+    Track=None,
+    Cache=True,
+):
+    """Simulates an array of points in time for a Satellite using Skyfield and also the pointing of the satellite.
     
-    "Define SLOF basis"
-    z_SLOF = NegativePosVector
-    z_SLOF = z_SLOF / norm(z_SLOF)
-    y_SLOF = NegativeOrbitalNormal
-    y_SLOF = y_SLOF / norm(y_SLOF)
-    x_SLOF = VelocityVector
-    x_SLOF = x_SLOF / norm(x_SLOF)
+    Vectorized version of *Satellite_Simulator* which gives the same result as calling *Satellite_Simulator* for each point in time, 
+    but propagates all points in time with a single call to Skyfield and calculates the pointing with array operations.
     
-    "Convert ECI coordinates to SLOF"
-    dcm_SLOF_coordinate_system = array( ([x_SLOF[0], y_SLOF[0], z_SLOF[0]], [x_SLOF[1], y_SLOF[1], z_SLOF[1]], [x_SLOF[2], y_SLOF[2], z_SLOF[2]]) )
-    dcm_change_of_basis_ECI_to_SLOF = transpose(dcm_SLOF_coordinate_system)
-    r_change_of_basis_ECI_to_SLOF = R.from_dcm(dcm_change_of_basis_ECI_to_SLOF)
+    The latitude of the LP is estimated from the latitude of the Satellite at a previous time, which is interpolated from the simulated track 
+    (and the optional *Track*) instead of being propagated once more. Only points in time not covered by the track, which are the ones at the start of the simulated range, are propagated directly.
     
-    optical_axis_SLOF = r_change_of_basis_ECI_to_SLOF.apply( optical_axis[t,:])
-    r_V_offset_normal_SLOF = r_change_of_basis_ECI_to_SLOF.apply( r_V_offset_normal )
-    r_H_offset_normal_SLOF = r_change_of_basis_ECI_to_SLOF.apply( r_H_offset_normal )
+    Arguments:
+        Satellite_skyfield (:obj:`skyfield.sgp4lib.EarthSatellite`): A Skyfield object representing an EarthSatellite defined by a TLE.
+        SimulationTimes (array): The times of the simulation as ephem.Date floats (Dublin Julian Days). If *StartDate* is given, instead the times of the simulation as seconds after *StartDate*.
+        Timeline_settings (dict): A dictionary containing relevant settings to the simulation.
+        pointing_altitude (float or array): Contains the pointing altitude of the simulation [km]. Either a single value or one value for each point in time.
+        StartDate (:obj:`ephem.Date`): Optional. The date which *SimulationTimes* are given relative to.
+        Track (tuple): Optional. Tuple containing dates (ephem.Date floats) and latitudes [degrees] of the Satellite from a previous simulation. Used together with the simulated latitudes to estimate the latitude of the LP without propagating the Satellite again.
+        Cache (bool): If True, the result of a previous call with the same arguments is returned from *Satellite_cache*, points in time found in its orbit products are not simulated again and the result is added to it.
+        
+    Returns:
+        (dict): Dictionary containing simulated data with the same keys as the one returned by *Satellite_Simulator*. Each value is an array with its first dimension equal to the number of points in time.
+        
+    """
+
+    U = 398600.441800000  # Earth gravitational parameter
+    R_mean = 6371.000
+    celestial_eq = array([0, 0, 1])
+
+    SimulationTimes = atleast_1d(array(SimulationTimes, dtype=float))
+    if StartDate != None:
+        SimulationTimes = ephem.Date(StartDate) + ephem.second * SimulationTimes
+
+    pointing_altitude = broadcast_to(
+        array(pointing_altitude, dtype=float), SimulationTimes.shape
+    )
+
+    if Cache == True and len(SimulationTimes) != 0:
+        "Return previously simulated data if the same points in time are cached, otherwise only simulate the points in time which are not in an orbit product"
+        size = len(SimulationTimes)
+        SatelliteKey = Satellite_cache.SatelliteKey(Satellite_skyfield)
+        key = Satellite_cache.key(
+            SatelliteKey, SimulationTimes, Timeline_settings, pointing_altitude, Track
+        )
+        Satellite_dict = Satellite_cache.get(key, size)
+        if Satellite_dict != None:
+            return Satellite_dict
+
+        Parts = []
+        covered = zeros(size, dtype=bool)
+        for OrbitProduct, indices in Satellite_cache.OrbitProduct_indices(
+            SatelliteKey, SimulationTimes, Timeline_settings, pointing_altitude
+        ):
+            found = indices != -1
+            if found.any():
+                Parts.append((found, OrbitProduct.get(indices[found])))
+                covered |= found
+
+        missing = ~covered
+        Satellite_cache.count(
+            OrbitProduct_hits=int(covered.sum()), misses=int(missing.sum())
+        )
+        if missing.any():
+            Parts.append(
+                (
+                    missing,
+                    Satellite_Simulator_Batch(
+                        Satellite_skyfield,
+                        SimulationTimes[missing],
+                        Timeline_settings,
+                        pointing_altitude[missing],
+                        Track=Track,
+                        Cache=False,
+                    ),
+                )
+            )
+
+        if len(Parts) == 1:
+            Satellite_dict = Parts[0][1]
+        else:
+            Satellite_dict = {}
+            for name, value in Parts[0][1].items():
+                Satellite_dict[name] = zeros((size,) + value.shape[1:], dtype=value.dtype)
+                for part, Part_dict in Parts:
+                    Satellite_dict[name][part] = Part_dict[name]
+
+        Satellite_cache.put(key, Satellite_dict, size)
+
+        return Satellite_dict
+
+    "Offset the pointing altitude slightly which improves the estimation of OHBs actual pointing"
+    pointing_altitude = pointing_altitude + 0.3
+
+    yaw_correction = Timeline_settings["yaw_correction"]
+
+    current_time_skyfield = ephemDate_to_skyfield(SimulationTimes)
+
+    Satellite_geo = Satellite_skyfield.at(current_time_skyfield)
+    v_Satellite = Satellite_geo.velocity.km_per_s.T
+    r_Satellite = Satellite_geo.position.km.T
+    Satellite_distance = Satellite_geo.distance().km
+    Satellite_subpoint = Satellite_geo.subpoint()
+    lat_Satellite = Satellite_subpoint.latitude.degrees
+    long_Satellite = Satellite_subpoint.longitude.degrees
+    alt_Satellite = Satellite_subpoint.elevation.km
+
+    "Semi-Major axis of Satellite, assuming circular orbit"
+    Satellite_p = norm(r_Satellite, axis=1)
+
+    "Orbital Period of Satellite"
+    orbital_period = 2 * pi * sqrt(Satellite_p ** 3 / U)
+
+    "Initial Estimated pitch or elevation angle for Satellite pointing (angle between negativ velocity vector and optical axis in the orbital plane)"
+    OrbAngleBetweenSatelliteAndLP = (
+        arccos((R_mean + pointing_altitude) / (Satellite_distance)) / pi * 180
+    )
+
+    time_between_LP_and_Satellite = orbital_period * OrbAngleBetweenSatelliteAndLP / 360
+
+    "Estimation of lat of LP using the latitude of Satellite at previous times"
+    dates_of_Satellitelat_is_equal_2_current_LPlat = (
+        SimulationTimes - ephem.second * time_between_LP_and_Satellite
+    )
+
+    "Look up the latitudes in the already simulated track"
+    TrackDates = SimulationTimes
+    TrackLatitudes = lat_Satellite
+    if Track != None:
+        TrackDates = concatenate((Track[0], TrackDates))
+        TrackLatitudes = concatenate((Track[1], TrackLatitudes))
+    TrackOrder = argsort(TrackDates, kind="stable")
+    lat_LP = track_interpolator(
+        dates_of_Satellitelat_is_equal_2_current_LPlat,
+        TrackDates[TrackOrder],
+        TrackLatitudes[TrackOrder],
+    )
+
+    "Propagate the Satellite directly where the track does not reach, at the edges of the simulated range"
+    NotInTrack = isnan(lat_LP)
+    if NotInTrack.any():
+        lat_LP[NotInTrack] = (
+            Satellite_skyfield.at(
+                ephemDate_to_skyfield(
+                    dates_of_Satellitelat_is_equal_2_current_LPlat[NotInTrack]
+                )
+            )
+            .subpoint()
+            .latitude.degrees
+        )
+    R_earth_LP = lat_2_R(lat_LP)
+
+    "More accurate estimated pitch or elevation angle for Satellite pointing"
+    OrbAngleBetweenSatelliteAndLP = (
+        arccos((R_earth_LP + pointing_altitude) / (Satellite_distance)) / pi * 180
+    )
+
+    Pitch = 90 + OrbAngleBetweenSatelliteAndLP
+
+    "############# Calculations of orbital and pointing vectors ############"
+    "Vector normal to the orbital plane of Satellite"
+    normal_orbit = cross(r_Satellite, v_Satellite)
+    normal_orbit = normal_orbit / norm(normal_orbit, axis=1)[:, None]
+
+    "Calculate intersection between the orbital plane and the equator"
+    ascending_node = cross(celestial_eq, normal_orbit)
+
+    "Argument of latitude"
+    arg_of_lat = (
+        arccos(
+            einsum("ij,ij->i", ascending_node, r_Satellite)
+            / Satellite_p
+            / norm(ascending_node, axis=1)
+        )
+        / pi
+        * 180
+    )
+
+    "To determine if Satellite is moving towards the ascending node"
+    arg_of_lat = where(
+        einsum("ij,ij->i", cross(ascending_node, r_Satellite), normal_orbit) <= 0,
+        360 - arg_of_lat,
+        arg_of_lat,
+    )
+
+    if yaw_correction == True:
+        yaw_offset_angle = Timeline_settings["yaw_amplitude"] * cos(
+            arg_of_lat / 180 * pi
+            - (Pitch - 90) / 180 * pi
+            - Timeline_settings["yaw_phase"] / 180 * pi
+        )
+    elif yaw_correction == False:
+        yaw_offset_angle = zeros(SimulationTimes.shape)
+
+    "Optical axis and normals to the H-offset and V-offset planes, rotated by the pitch and yaw"
+    optical_axis, r_H_offset_normal, r_V_offset_normal = _MATS_attitude.pointing_vectors(
+        r_Satellite, normal_orbit, Pitch, yaw_offset_angle
+    )
+
+    "Calculate Dec and RA of optical axis"
+    optical_axis_xy_norm = sqrt(optical_axis[:, 0] ** 2 + optical_axis[:, 1] ** 2)
+    Dec_optical_axis = arctan(optical_axis[:, 2] / optical_axis_xy_norm) / pi * 180
+    RA_optical_axis = arccos(optical_axis[:, 0] / optical_axis_xy_norm) / pi * 180
+    RA_optical_axis = where(optical_axis[:, 1] < 0, 360 - RA_optical_axis, RA_optical_axis)
+
+    Satellite_dict = {
+        "Position [km]": r_Satellite,
+        "Velocity [km/s]": v_Satellite,
+        "OrbitNormal": normal_orbit,
+        "OrbitalPeriod [s]": orbital_period,
+        "Latitude [degrees]": lat_Satellite,
+        "Longitude [degrees]": long_Satellite,
+        "Altitude [km]": alt_Satellite,
+        "AscendingNode": ascending_node,
+        "ArgOfLat [degrees]": arg_of_lat,
+        "Yaw [degrees]": yaw_offset_angle,
+        "Pitch [degrees]": Pitch,
+        "OpticalAxis": optical_axis,
+        "Dec_OpticalAxis [degrees]": Dec_optical_axis,
+        "RA_OpticalAxis [degrees]": RA_optical_axis,
+        "Normal2H_offset": r_H_offset_normal,
+        "Normal2V_offset": r_V_offset_normal,
+        "EstimatedLatitude_LP [degrees]": lat_LP,
+    }
+
+    return Satellite_dict
+
+
+class Satellite_Simulator_Buffer:
+    """Simulates a Satellite in batches ahead of time along a grid of points in time separated by a constant timestep.
     
+    Used in place of *Satellite_Simulator* in simulation loops that mostly increment the simulation time with a constant timestep, 
+    but occasionally jump ahead in time (for example after a completed orbit or after scheduling of CMDs).
+    The grid starting at the requested time is simulated with a single call to *Satellite_Simulator_Batch* and then consumed one point in time at a time.
+    Whenever the requested time is not the next point of the grid, a new batch is simulated starting at the requested time. 
+    The size of the batches grows while the grid is being consumed and is reset after a jump.
     
+    The grid is generated by repeatedly adding the timestep to the previous date, in the same way as the simulation loops increment their time, which means that the requested dates match the grid exactly.
     
-    "Find rotation and Euler angles from definition of optical axis in SLOF"
-    basis_SLOF = array( ( (optical_axis_SLOF), (r_V_offset_normal_SLOF), (r_H_offset_normal_SLOF) ) )
-    basis_ECI = array( ( (0,0,-1), (0,1,0), (1,0,0) ) )
-    rotation, sensitivity_matrix = R.match_vectors(basis_SLOF, basis_ECI)
+    Arguments:
+        Satellite_skyfield (:obj:`skyfield.sgp4lib.EarthSatellite`): A Skyfield object representing an EarthSatellite defined by a TLE.
+        Timeline_settings (dict): A dictionary containing relevant settings to the simulation.
+        pointing_altitude (float): Contains the pointing altitude of the simulation [km].
+        timestep (float): The timestep of the grid [s].
+        MaxBatchSize (int): Maximum number of points in time simulated in each batch.
     
-    Euler_angles[t,:] = rotation.as_euler('ZYZ', degrees=True)
-    yaw_offset_angle[t] = Euler_angles[t,0]
-    pitch_MATS[t] = Euler_angles[t,1]
-    roll_MATS[t] = Euler_angles[t,2]
-'''
+    """
 
+    MinBatchSize = 8
+
+    "Time [s] of previously simulated latitudes kept to estimate the latitude of the LP"
+    TrackLength = 3600
+
+    def __init__(
+        self,
+        Satellite_skyfield,
+        Timeline_settings,
+        pointing_altitude,
+        timestep,
+        MaxBatchSize=1024,
+    ):
+
+        self.Satellite_skyfield = Satellite_skyfield
+        self.Timeline_settings = Timeline_settings
+        self.pointing_altitude = pointing_altitude
+        self.timestep = timestep
+        self.MaxBatchSize = MaxBatchSize
+
+        self.BatchSize = self.MinBatchSize
+        self.SimulationTimes = []
+        self.Satellite_dict = {}
+        self.index = 0
+
+        self.TrackDates = zeros(0)
+        self.TrackLatitudes = zeros(0)
+
+    def _simulate(self, SimulationTime):
+        """Simulates a new batch starting at SimulationTime."""
+
+        SimulationTimes = [SimulationTime]
+        for x in range(self.BatchSize - 1):
+            SimulationTimes.append(
+                ephem.Date(SimulationTimes[-1] + ephem.second * self.timestep)
+            )
 
-def SunAngle(PositionVector, SimulationTime):
-    """Calculates angle between a position vector and the position vector of the Sun.
+        "Previously simulated latitudes are used to look up the latitude of the LP"
+        self.Satellite_dict = Satellite_Simulator_Batch(
+            self.Satellite_skyfield,
+            SimulationTimes,
+            self.Timeline_settings,
+            self.pointing_altitude,
+            Track=(self.TrackDates, self.TrackLatitudes),
+        )
+        self.SimulationTimes = SimulationTimes
+
+        "Only keep the part of the track that may be looked up by later batches"
+        KeepTrack = self.TrackDates >= SimulationTime - ephem.second * self.TrackLength
+        self.TrackDates = concatenate(
+            (self.TrackDates[KeepTrack], array(SimulationTimes))
+        )
+        self.TrackLatitudes = concatenate(
+            (
+                self.TrackLatitudes[KeepTrack],
+                self.Satellite_dict["Latitude [degrees]"],
+            )
+        )
+        self.index = 0
+
+    def __call__(self, SimulationTime, LogFlag=False, Logger=None):
+        """Returns the simulated data of a single point in time.
+        
+        Arguments:
+            SimulationTime (:obj:`ephem.Date`): The time of the simulation.
+            LogFlag (bool): If data from the simulation shall be logged.
+            Logger (:obj:`logging.Logger`): Logger used to log the result from the simulation if LogFlag == True.
+            
+        Returns:
+            (dict): Dictionary containing simulated data, the same as returned by *Satellite_Simulator*.
+            
+        """
+
+        SimulationTime = float(SimulationTime)
+
+        if (
+            self.index < len(self.SimulationTimes)
+            and self.SimulationTimes[self.index] == SimulationTime
+        ):
+            pass
+        elif self.index == len(self.SimulationTimes) and self.index != 0 and (
+            ephem.Date(self.SimulationTimes[-1] + ephem.second * self.timestep)
+            == SimulationTime
+        ):
+            "The whole grid was consumed, simulate a larger batch"
+            self.BatchSize = min(2 * self.BatchSize, self.MaxBatchSize)
+            self._simulate(SimulationTime)
+        else:
+            "The simulation jumped ahead in time"
+            self.BatchSize = self.MinBatchSize
+            self._simulate(SimulationTime)
+
+        Satellite_dict = {
+            key: value[self.index] for key, value in self.Satellite_dict.items()
+        }
+        self.index += 1
+
+        if LogFlag == True and Logger != None:
+            Satellite_Simulator_Logger(Satellite_dict, SimulationTime, Logger)
+
+        return Satellite_dict
+
+
+def Satellite_Simulator_Batch_Logger(
+    Satellite_skyfield,
+    StartDate,
+    EndDate,
+    log_timestep,
+    Timeline_settings,
+    pointing_altitude,
+    Logger,
+):
+    """Simulates a Satellite with *Satellite_Simulator_Batch* every *log_timestep* seconds during a time window and logs the result.
     
-    Simulates a single point in time for the Sun observed from Earth using Skyfield and then calculates the angle between the position vector of the Sun and the given input position vector.
-    Used to determine the eclipse angle of the Sun angle of the position.
+    Used when the simulation itself is not performed timestep by timestep, but the simulated data is still to be logged at regular intervals for debugging purposes.
+    Nothing is simulated if DEBUG records are not handled by the Logger (see *log_enabled*).
     
     Arguments:
-        PositionVector (array): Position vector.
-        SimulationTime (:obj:`ephem.Date`): The time of the simulation.
+        Satellite_skyfield (:obj:`skyfield.sgp4lib.EarthSatellite`): A Skyfield object representing an EarthSatellite defined by a TLE.
+        StartDate (:obj:`ephem.Date`): Start of the time window.
+        EndDate (:obj:`ephem.Date`): End of the time window.
+        log_timestep (float): Time between logged points [s].
+        Timeline_settings (dict): A dictionary containing relevant settings to the simulation.
+        pointing_altitude (float): Contains the pointing altitude of the simulation [km].
+        Logger (:obj:`logging.Logger`): Logger used to log the result.
         
     Returns:
-        (float): The sun angle [degrees].
+        None
         
     """
 
-    current_time_datetime = ephem.Date(SimulationTime).datetime()
-    year = current_time_datetime.year
-    month = current_time_datetime.month
-    day = current_time_datetime.day
-    hour = current_time_datetime.hour
-    minute = current_time_datetime.minute
-    second = current_time_datetime.second + current_time_datetime.microsecond / 1000000
+    if not log_enabled(Logger):
+        return
+
+    timesteps = int(ceil((EndDate - StartDate) / (ephem.second * log_timestep)))
+    LogDates = StartDate + ephem.second * log_timestep * arange(timesteps)
 
-    current_time_skyfield = timescale_skyfield.utc(
-        year, month, day, hour, minute, second
+    Satellite_dicts = Satellite_Simulator_Batch(
+        Satellite_skyfield, LogDates, Timeline_settings, pointing_altitude
     )
 
-    Sun = database_skyfield["Sun"]
-    Earth = database_skyfield["Earth"]
+    for t, LogDate in enumerate(LogDates):
+        Satellite_dict = {key: value[t] for key, value in Satellite_dicts.items()}
+        Satellite_Simulator_Logger(Satellite_dict, LogDate, Logger)
 
-    SunFromEarth = Earth.at(current_time_skyfield).observe(Sun)
-    r_SunFromEarth_km = SunFromEarth.position.km
+
+def SunAngle(PositionVector, SimulationTime):
+    """Calculates angle between a position vector and the position vector of the Sun.
+    
+    The position vector of the Sun observed from Earth is interpolated from the table given by *_Ephemeris.Sun_ephemeris*, which is calculated hourly with Skyfield, and then the angle between the position vector of the Sun and the given input position vector is calculated.
+    Used to determine the eclipse angle of the Sun angle of the position. Also accepts arrays of position vectors and times.
+    
+    Arguments:
+        PositionVector (array): Position vector (3) or array of position vectors (N x 3).
+        SimulationTime (:obj:`ephem.Date` or array): The time of the simulation, or an array of N times.
+        
+    Returns:
+        (float or array): The sun angle [degrees].
+        
+    """
+
+    current_time_skyfield = ephemDate_to_skyfield(SimulationTime)
+
+    PositionVector = asarray(PositionVector)
+    r_SunFromEarth_km = _Ephemeris.Sun_ephemeris().position(current_time_skyfield).T
 
     SunAngle = arccos(
-        dot(PositionVector, r_SunFromEarth_km)
-        / (norm(r_SunFromEarth_km) * norm(PositionVector))
+        (PositionVector * r_SunFromEarth_km).sum(axis=-1)
+        / (norm(r_SunFromEarth_km, axis=-1) * norm(PositionVector, axis=-1))
     )
     SunAngle = SunAngle / pi * 180
 
     return SunAngle
 
 
+def event_finder_grid(StartDate, EndDate, GridSpacing):
+    """Returns the grid used by *event_finder* to bracket crossings, unless it is given another grid.
+    
+    Arguments:
+        StartDate (:obj:`ephem.Date`): Start of the time window.
+        EndDate (:obj:`ephem.Date`): End of the time window.
+        GridSpacing (float): Spacing of the grid [s].
+        
+    Returns:
+        (array): The dates (ephem.Date floats) of the grid, starting at *StartDate* and ending with *EndDate*.
+        
+    """
+
+    timesteps = int(floor((EndDate - StartDate) / (ephem.second * GridSpacing))) + 1
+
+    return concatenate(
+        (StartDate + ephem.second * GridSpacing * arange(timesteps), [EndDate])
+    )
+
+
+def event_finder(
+    function,
+    StartDate,
+    EndDate,
+    threshold,
+    GridSpacing=60,
+    Tolerance=0.1,
+    GridDates=None,
+):
+    """Finds all times when a function of time crosses a threshold during a time window.
+    
+    The function is first evaluated on a grid with a spacing of *GridSpacing* seconds (or on *GridDates*) to bracket all crossings. 
+    Each crossing is then refined with bisection, performed for all crossings at once, until it is known to within *Tolerance* seconds.
+    Crossings which occur twice within one grid interval are not found.
+    
+    Arguments:
+        function (function): Function which takes an array of dates (ephem.Date floats) and returns an array of values.
+        StartDate (:obj:`ephem.Date`): Start of the time window.
+        EndDate (:obj:`ephem.Date`): End of the time window.
+        threshold (float): The value of which crossings are searched for.
+        GridSpacing (float): Spacing of the grid used to bracket the crossings [s].
+        Tolerance (float): Precision of the found crossings [s].
+        GridDates (array): Optional. Increasing dates (ephem.Date floats) used as the grid instead of a grid with a spacing of *GridSpacing*, for example the grid of an orbit product. *StartDate* and *EndDate* are added to it.
+        
+    Returns:
+        (tuple): tuple containing:
+            (array): **EventDates**, the dates (ephem.Date floats) of the crossings, in increasing order. The function is on the new side of the threshold at each returned date. \n
+            (array): **Rising**, True where the function becomes larger than the threshold, False where it becomes smaller.
+        
+    """
+
+    if GridDates is None:
+        dates = event_finder_grid(StartDate, EndDate, GridSpacing)
+    else:
+        GridDates = asarray(GridDates, dtype=float)
+        dates = concatenate(
+            (
+                [StartDate],
+                GridDates[(GridDates > StartDate) & (GridDates < EndDate)],
+                [EndDate],
+            )
+        )
+    Above = function(dates) > threshold
+
+    index = where(Above[:-1] != Above[1:])[0]
+    LowerDates = dates[index]
+    UpperDates = dates[index + 1]
+    Rising = Above[index + 1]
+
+    while len(index) > 0 and (UpperDates - LowerDates).max() > ephem.second * Tolerance:
+        MiddleDates = (LowerDates + UpperDates) / 2
+        "The crossing is before the middle if the function is already on the new side of the threshold"
+        CrossedAtMiddle = (function(MiddleDates) > threshold) == Rising
+        UpperDates = where(CrossedAtMiddle, MiddleDates, UpperDates)
+        LowerDates = where(CrossedAtMiddle, LowerDates, MiddleDates)
+
+    return UpperDates, Rising
+
+
+def Satellite_position(Satellite_skyfield, SimulationTimes):
+    """Returns the position of a Satellite in ECI, read from the orbit products added to *Satellite_cache* for points in time on their grid and propagated otherwise.
+    
+    Arguments:
+        Satellite_skyfield (:obj:`skyfield.sgp4lib.EarthSatellite`): A Skyfield object representing an EarthSatellite defined by a TLE.
+        SimulationTimes (array): The times of the simulation as ephem.Date floats.
+        
+    Returns:
+        (array): The positions [km] (number of points in time x 3).
+        
+    """
+
+    SimulationTimes = atleast_1d(array(SimulationTimes, dtype=float))
+    r_Satellite = zeros((len(SimulationTimes), 3))
+    missing = ones(len(SimulationTimes), dtype=bool)
+
+    for OrbitProduct, indices in Satellite_cache.OrbitProduct_indices(
+        Satellite_cache.SatelliteKey(Satellite_skyfield), SimulationTimes, None, None
+    ):
+        found = indices != -1
+        r_Satellite[found] = OrbitProduct.Data["Position [km]"][indices[found]]
+        missing &= ~found
+
+    if missing.any():
+        r_Satellite[missing] = Satellite_skyfield.at(
+            ephemDate_to_skyfield(SimulationTimes[missing])
+        ).position.km.T
+
+    return r_Satellite
+
+
+def eclipse_event_finder(
+    Satellite_skyfield, StartDate, EndDate, EclipseAngle, GridSpacing=60, Tolerance=0.1
+):
+    """Finds all times when the sun angle of a satellite crosses the eclipse angle during a time window.
+    
+    Used to find dusk and dawn below the satellite without simulating the satellite at every timestep. See *event_finder* and *SunAngle*.
+    If an orbit product of the satellite which covers the time window is added to *Satellite_cache*, the crossings are bracketed on its grid and the positions on the grid are read from it.
+    
+    Arguments:
+        Satellite_skyfield (:obj:`skyfield.sgp4lib.EarthSatellite`): A Skyfield object representing an EarthSatellite defined by a TLE.
+        StartDate (:obj:`ephem.Date`): Start of the time window.
+        EndDate (:obj:`ephem.Date`): End of the time window.
+        EclipseAngle (float): Sun angle [degrees] above which it is night below the satellite.
+        GridSpacing (float): Spacing of the grid used to bracket the crossings [s].
+        Tolerance (float): Precision of the found crossings [s].
+        
+    Returns:
+        (tuple): tuple containing:
+            (array): **EventDates**, the dates (ephem.Date floats) of dusk and dawn below the satellite. \n
+            (array): **Night**, True where it becomes night (dusk), False where it becomes day (dawn).
+        
+    """
+
+    def SunAngle_of_Satellite(dates):
+        return SunAngle(Satellite_position(Satellite_skyfield, dates), dates)
+
+    GridDates = Satellite_cache.OrbitProduct_grid(
+        Satellite_cache.SatelliteKey(Satellite_skyfield), StartDate, EndDate, GridSpacing
+    )
+
+    return event_finder(
+        SunAngle_of_Satellite,
+        StartDate,
+        EndDate,
+        EclipseAngle,
+        GridSpacing,
+        Tolerance,
+        GridDates,
+    )
+
+
+def LPlatitude_event_finder(
+    Satellite_skyfield,
+    StartDate,
+    EndDate,
+    Timeline_settings,
+    pointing_altitude,
+    lat,
+    GridSpacing=60,
+    Tolerance=0.1,
+):
+    """Finds all times when the estimated latitude of the LP crosses +-lat during a time window.
+    
+    The latitude of the LP is estimated with *Satellite_Simulator_Batch*. See *event_finder*.
+    If an orbit product of the satellite, the yaw settings and the pointing altitude which covers the time window is added to *Satellite_cache*, the crossings are bracketed on its grid and the latitudes on the grid are read from it.
+    Only the grid is added to *Satellite_cache*, the bisection steps are simulated without it.
+    
+    Arguments:
+        Satellite_skyfield (:obj:`skyfield.sgp4lib.EarthSatellite`): A Skyfield object representing an EarthSatellite defined by a TLE.
+        StartDate (:obj:`ephem.Date`): Start of the time window.
+        EndDate (:obj:`ephem.Date`): End of the time window.
+        Timeline_settings (dict): A dictionary containing relevant settings to the simulation.
+        pointing_altitude (float): Contains the pointing altitude of the simulation [km].
+        lat (float): The latitude [degrees] (+ and -) of which crossings are searched for.
+        GridSpacing (float): Spacing of the grid used to bracket the crossings [s].
+        Tolerance (float): Precision of the found crossings [s].
+        
+    Returns:
+        (tuple): tuple containing:
+            (array): **EventDates**, the dates (ephem.Date floats) of the crossings. \n
+            (array): **Poleward**, True where the LP moves polewards of +-lat, False where it moves equatorwards.
+        
+    """
+
+    "Only the grid, which event_finder simulates first, is cached. The dates of the bisection steps are only used once and would evict useful entries from Satellite_cache"
+    GridCall = True
+
+    def absolute_LPlatitude(dates):
+        nonlocal GridCall
+        Satellite_dicts = Satellite_Simulator_Batch(
+            Satellite_skyfield,
+            dates,
+            Timeline_settings,
+            pointing_altitude,
+            Cache=GridCall,
+        )
+        GridCall = False
+        return abs(Satellite_dicts["EstimatedLatitude_LP [degrees]"])
+
+    GridDates = Satellite_cache.OrbitProduct_grid(
+        Satellite_cache.SatelliteKey(Satellite_skyfield),
+        StartDate,
+        EndDate,
+        GridSpacing,
+        Timeline_settings,
+        pointing_altitude,
+    )
+
+    return event_finder(
+        absolute_LPlatitude, StartDate, EndDate, lat, GridSpacing, Tolerance, GridDates
+    )
+
+
+def merge_events(Events):
+    """Merges the results of several event finders into one list of events sorted by date.
+    
+    Arguments:
+        Events (dict): Dictionary with the name of the kind of event as keys and the output of an event finder, a tuple of the dates of the events and their values, as entries.
+        
+    Returns:
+        (:obj:`list` of :obj:`tuple`): List of events sorted by date, each event being a tuple containing the date (ephem.Date float), the name of the kind of event, and the value of the event.
+        
+    """
+
+    EventList = [
+        (EventDate, EventName, bool(EventValue))
+        for EventName, (EventDates, EventValues) in Events.items()
+        for EventDate, EventValue in zip(EventDates, EventValues)
+    ]
+    EventList.sort(key=lambda Event: Event[0])
+
+    return EventList
+
+
 def FreezeDuration_calculator(pointing_altitude1, pointing_altitude2, TLE2):
     """Function that calculates the angle between two tangential altitudes and then calculates
     the time it takes for orbital position angle of a satellite in a circular orbit to change by the same amount.
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""Attitude geometry of MATS calculated for arrays of states.
+
+All functions take arrays of vectors with shape (N,3), or quaternions with shape (N,4), with one row for each point in time,
+and perform the calculations for all rows at once with array operations and stacked *scipy.spatial.transform.Rotation* objects.
+Scipy is imported by the functions which return rotations, as importing it takes a quarter of a second.
+
+**Frames:**
+    SLOF = Spacecraft Local Orbit Frame. The X-axis is along the velocity, the Y-axis along the negative orbital normal, and the Z-axis along the negative position vector (towards the Earth). \n
+    SBF = Spacecraft Body Frame. The optical axis is equal to the -Z axis. \n
+    Yaw, pitch, and roll are defined as the intrinsic Euler angles (ZYZ) of the rotation from SLOF to SBF.
+
+"""
+
+from numpy import cos, sin, cross, einsum, pi, stack
+from numpy.linalg import norm
+
+
+def unit_vectors(vectors):
+    """Normalizes each row of an array of vectors.
+
+    Arguments:
+        vectors (array): Vectors. Shape (N,3).
+
+    Returns:
+        (array): Unit vectors. Shape (N,3).
+
+    """
+
+    return vectors / norm(vectors, axis=1)[:, None]
+
+
+def rot_arbit_apply(angle, u_v, vectors):
+    """Rotates an array of vectors, each around its own unit vector, using Rodrigues' rotation formula.
+
+    Gives the same result as *_Library.rot_arbit(angle[n], u_v[n]) @ vectors[n]* for each row n, but for all rows at once.
+
+    Arguments:
+        angle (array): Angles in radians. Shape (N,).
+        u_v (array): Unit vectors to rotate around. Shape (N,3).
+        vectors (array): Vectors to rotate. Shape (N,3).
+
+    Returns:
+        (array): Rotated vectors. Shape (N,3).
+
+    """
+
+    cos_angle = cos(angle)[:, None]
+    sin_angle = sin(angle)[:, None]
+
+    rotated_vectors = (
+        vectors * cos_angle
+        + cross(u_v, vectors) * sin_angle
+        + u_v * einsum("ij,ij->i", u_v, vectors)[:, None] * (1 - cos_angle)
+    )
+
+    return rotated_vectors
+
+
+def pointing_vectors(r_Satellite, normal_orbit, Pitch, Yaw):
+    """Calculates the optical axis and the normals to the H-offset and V-offset planes of the satellite from its pitch and yaw.
+
+    The vector to the satellite is rotated by the pitch around the negative orbital normal, and then by the yaw around the negative vector to the satellite.
+
+    Arguments:
+        r_Satellite (array): Position vectors of the satellite. Shape (N,3).
+        normal_orbit (array): Unit vectors normal to the orbital plane. Shape (N,3).
+        Pitch (array): Angles [degrees] between the vector to the satellite and the optical axis in the orbital plane. Shape (N,).
+        Yaw (array): Yaw angles [degrees] around the vector to the satellite. Shape (N,).
+
+    Returns:
+        (tuple): tuple containing:
+
+            **optical_axis** (*array*): Unit vectors of the optical axis. Shape (N,3). \n
+            **r_H_offset_normal** (*array*): Unit vectors normal to the H-offset plane. Shape (N,3). \n
+            **r_V_offset_normal** (*array*): Unit vectors normal to the V-offset plane. Shape (N,3).
+
+    """
+
+    r_Satellite_unit_vector = unit_vectors(r_Satellite)
+
+    "Rotate 'vector to Satellite', to represent pointing direction"
+    optical_axis = rot_arbit_apply(Pitch / 180 * pi, -normal_orbit, r_Satellite)
+
+    "Apply yaw to optical_axis, meaning to rotate around the vector to Satellite"
+    optical_axis = rot_arbit_apply(Yaw / 180 * pi, -r_Satellite_unit_vector, optical_axis)
+    optical_axis = unit_vectors(optical_axis)
+
+    "Rotate 'vector to Satellite', to represent vector normal to satellite H-offset "
+    r_H_offset_normal = rot_arbit_apply(
+        (Pitch - 90) / 180 * pi, -normal_orbit, r_Satellite
+    )
+    r_H_offset_normal = unit_vectors(r_H_offset_normal)
+
+    "If pointing direction has a Yaw defined, Rotate yaw of normal to pointing direction H-offset plane, meaning to rotate around the vector to Satellite"
+    r_H_offset_normal = rot_arbit_apply(
+        Yaw / 180 * pi, -r_Satellite_unit_vector, r_H_offset_normal
+    )
+    r_H_offset_normal = unit_vectors(r_H_offset_normal)
+
+    "Rotate negative orbital plane normal to make it into a normal to the V-offset plane"
+    r_V_offset_normal = rot_arbit_apply(
+        Yaw / 180 * pi, -r_Satellite_unit_vector, -normal_orbit
+    )
+    r_V_offset_normal = unit_vectors(r_V_offset_normal)
+
+    return optical_axis, r_H_offset_normal, r_V_offset_normal
+
+
+def SLOF_basis(r_Satellite, v_Satellite, normal_orbit=None):
+    """Calculates the basis vectors of SLOF.
+
+    Arguments:
+        r_Satellite (array): Position vectors of the satellite. Shape (N,3).
+        v_Satellite (array): Velocity vectors of the satellite. Shape (N,3).
+        normal_orbit (array): Vectors normal to the orbital plane. Shape (N,3). If None, the Y-axis is instead calculated as the cross product of the Z-axis and the X-axis (used when only the position and velocity are known, for example from OHB data).
+
+    Returns:
+        (tuple): tuple containing:
+
+            **x_SLOF** (*array*): Unit vectors along the X-axis of SLOF. Shape (N,3). \n
+            **y_SLOF** (*array*): Unit vectors along the Y-axis of SLOF. Shape (N,3). \n
+            **z_SLOF** (*array*): Unit vectors along the Z-axis of SLOF. Shape (N,3).
+
+    """
+
+    z_SLOF = unit_vectors(-r_Satellite)
+    x_SLOF = unit_vectors(v_Satellite)
+
+    if normal_orbit is None:
+        y_SLOF = unit_vectors(cross(z_SLOF, x_SLOF))
+    else:
+        y_SLOF = unit_vectors(-normal_orbit)
+
+    return x_SLOF, y_SLOF, z_SLOF
+
+
+def change_of_basis(x_basis, y_basis, z_basis):
+    """Returns the rotations which change the basis of vectors from ECI to a basis given by its unit vectors in ECI.
+
+    The change of basis matrix is the transpose of a matrix where the columns are the basis vectors.
+
+    Arguments:
+        x_basis (array): Unit vectors along the X-axis of the basis. Shape (N,3).
+        y_basis (array): Unit vectors along the Y-axis of the basis. Shape (N,3).
+        z_basis (array): Unit vectors along the Z-axis of the basis. Shape (N,3).
+
+    Returns:
+        (:obj:`scipy.spatial.transform.Rotation`): Stack of N rotations.
+
+    """
+
+    from scipy.spatial.transform import Rotation
+
+    return Rotation.from_matrix(stack((x_basis, y_basis, z_basis), axis=1))
+
+
+def ECI_to_SLOF(r_Satellite, v_Satellite, normal_orbit=None):
+    """Returns the rotations which change the basis of vectors from ECI to SLOF.
+
+    Arguments:
+        r_Satellite (array): Position vectors of the satellite. Shape (N,3).
+        v_Satellite (array): Velocity vectors of the satellite. Shape (N,3).
+        normal_orbit (array): Vectors normal to the orbital plane. Shape (N,3). Optional, see *SLOF_basis*.
+
+    Returns:
+        (:obj:`scipy.spatial.transform.Rotation`): Stack of N rotations.
+
+    """
+
+    return change_of_basis(*SLOF_basis(r_Satellite, v_Satellite, normal_orbit))
+
+
+def SLOF_to_SBF(
+    r_Satellite, v_Satellite, normal_orbit, optical_axis, r_V_offset_normal, r_H_offset_normal
+):
+    """Returns the rotations from SLOF to SBF given the optical axis and the normals to the H-offset and V-offset planes in ECI.
+
+    The basis vectors of SBF are (r_H_offset_normal, r_V_offset_normal, -optical_axis) expressed in SLOF.
+
+    Arguments:
+        r_Satellite (array): Position vectors of the satellite. Shape (N,3).
+        v_Satellite (array): Velocity vectors of the satellite. Shape (N,3).
+        normal_orbit (array): Vectors normal to the orbital plane. Shape (N,3).
+        optical_axis (array): Unit vectors of the optical axis. Shape (N,3).
+        r_V_offset_normal (array): Unit vectors normal to the V-offset plane. Shape (N,3).
+        r_H_offset_normal (array): Unit vectors normal to the H-offset plane. Shape (N,3).
+
+    Returns:
+        (:obj:`scipy.spatial.transform.Rotation`): Stack of N rotations.
+
+    """
+
+    from scipy.spatial.transform import Rotation
+
+    ECI2SLOF = ECI_to_SLOF(r_Satellite, v_Satellite, normal_orbit)
+
+    optical_axis_SLOF = ECI2SLOF.apply(optical_axis)
+    r_V_offset_normal_SLOF = ECI2SLOF.apply(r_V_offset_normal)
+    r_H_offset_normal_SLOF = ECI2SLOF.apply(r_H_offset_normal)
+
+    return Rotation.from_matrix(
+        stack((r_H_offset_normal_SLOF, r_V_offset_normal_SLOF, -optical_axis_SLOF), axis=2)
+    )
+
+
+def Euler_angles_SLOF(
+    r_Satellite, v_Satellite, normal_orbit, optical_axis, r_V_offset_normal, r_H_offset_normal
+):
+    """Calculates the yaw, pitch, and roll of MATS, which are the intrinsic Euler angles (ZYZ) of the rotation from SLOF to SBF.
+
+    Arguments:
+        r_Satellite (array): Position vectors of the satellite. Shape (N,3).
+        v_Satellite (array): Velocity vectors of the satellite. Shape (N,3).
+        normal_orbit (array): Vectors normal to the orbital plane. Shape (N,3).
+        optical_axis (array): Unit vectors of the optical axis. Shape (N,3).
+        r_V_offset_normal (array): Unit vectors normal to the V-offset plane. Shape (N,3).
+        r_H_offset_normal (array): Unit vectors normal to the H-offset plane. Shape (N,3).
+
+    Returns:
+        (array): Yaw, pitch, and roll [degrees]. Shape (N,3).
+
+    """
+
+    return SLOF_to_SBF(
+        r_Satellite, v_Satellite, normal_orbit, optical_axis, r_V_offset_normal, r_H_offset_normal
+    ).as_euler("ZYZ", degrees=True)
+
+
+def quaternions_to_rotations(quaternions):
+    """Returns the rotations from ECI to SBF given by attitude quaternions with the scalar part first (as in the OHB attitude data).
+
+    Arguments:
+        quaternions (array): Quaternions (q1, q2, q3, q4), where q1 is the scalar part. Shape (N,4).
+
+    Returns:
+        (:obj:`scipy.spatial.transform.Rotation`): Stack of N rotations.
+
+    """
+
+    from scipy.spatial.transform import Rotation
+
+    return Rotation.from_quat(quaternions[:, [1, 2, 3, 0]])
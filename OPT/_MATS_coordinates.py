@@ -16,39 +16,15 @@ Slightly edited by David Skånberg during 2019.
 
 #
 
-import pylab
-
-# from scipy.spatial.transform import Rotation
-
-from astropy.coordinates import (
-    EarthLocation,
-    GCRS,
-    CartesianRepresentation,
-    ITRS,
-    get_sun,
-    AltAz,
-)
-
-from astropy import units as units
-
-from astropy import time as time
-
-
-from astroquery.vizier import Vizier
-
-import astropy.coordinates as coord
+from collections import OrderedDict
 
+import numpy
 
-from astropy.utils import iers
-
-try:
-    iers.IERS_A.open(iers.IERS_A_URL)
-    iers.conf.auto_download = True
-except:
-    iers.conf.auto_download = False
+# from scipy.spatial.transform import Rotation
 
+"Astropy, erfa and astroquery are imported in the functions which use them, as importing them takes most of a second"
 
-# iers.conf.auto_max_age=60
+from OPT import _Ephemeris
 
 
 def ecef2tanpoint(x, y, z, dx, dy, dz):
@@ -97,17 +73,17 @@ def ecef2tanpoint(x, y, z, dx, dy, dz):
 
     b2 = a2 * (1 - e ** 2)
 
-    X = pylab.array([x, y, z])
+    X = numpy.array([x, y, z])
 
-    xunit = pylab.array([dx, dy, dz])
+    xunit = numpy.array([dx, dy, dz])
 
-    zunit = pylab.cross(xunit, X)
+    zunit = numpy.cross(xunit, X)
 
-    zunit = zunit / pylab.linalg.norm(zunit)
+    zunit = zunit / numpy.linalg.norm(zunit)
 
-    yunit = pylab.cross(zunit, xunit)
+    yunit = numpy.cross(zunit, xunit)
 
-    yunit = yunit / pylab.linalg.norm(yunit)
+    yunit = yunit / numpy.linalg.norm(yunit)
 
     w11 = xunit[0]
 
@@ -121,9 +97,9 @@ def ecef2tanpoint(x, y, z, dx, dy, dz):
 
     w32 = yunit[2]
 
-    yr = pylab.dot(X, yunit)
+    yr = numpy.dot(X, yunit)
 
-    xr = pylab.dot(X, xunit)
+    xr = numpy.dot(X, xunit)
 
     A = (w11 * w11 + w21 * w21) / a2 + w31 * w31 / b2
 
@@ -141,7 +117,7 @@ def ecef2tanpoint(x, y, z, dx, dy, dz):
 
         factor = 1.0 / (A + (B + C * K) * K)
 
-        xx = pylab.sqrt(factor)
+        xx = numpy.sqrt(factor)
 
         yy = K * x
 
@@ -162,6 +138,83 @@ def ecef2tanpoint(x, y, z, dx, dy, dz):
     return tx, ty, tz
 
 
+def ecef2tanpoint_array(r, look):
+    """Array version of *ecef2tanpoint*, which calculates the tangent points of many positions and look vectors at once.
+    
+    Performs the same operations as *ecef2tanpoint* for each row, where the choice of the sign of the tangent point (dist1 > dist2) is made with *where*. 
+    The results equal those of *ecef2tanpoint* to within rounding errors (about 1e-8 m).
+    
+    Arguments:
+        r (array): ECEF positions (m). Shape (N,3).
+        look (array): ECEF look vectors. Shape (N,3).
+        
+    Returns:
+        (array): ECEF positions of the tangent points (m). Shape (N,3).
+    
+    """
+
+    # WGS-84 semi-major axis and eccentricity
+
+    a = 6378137
+
+    e = 0.081819190842621
+
+    a2 = a ** 2
+
+    b2 = a2 * (1 - e ** 2)
+
+    X = numpy.asarray(r, dtype=float).reshape((-1, 3))
+
+    xunit = numpy.asarray(look, dtype=float).reshape((-1, 3))
+
+    zunit = numpy.cross(xunit, X)
+
+    zunit = zunit / numpy.linalg.norm(zunit, axis=1)[:, None]
+
+    yunit = numpy.cross(zunit, xunit)
+
+    yunit = yunit / numpy.linalg.norm(yunit, axis=1)[:, None]
+
+    w11, w21, w31 = xunit.T
+
+    w12, w22, w32 = yunit.T
+
+    yr = numpy.einsum("ij,ij->i", X, yunit)
+
+    xr = numpy.einsum("ij,ij->i", X, xunit)
+
+    A = (w11 * w11 + w21 * w21) / a2 + w31 * w31 / b2
+
+    B = 2.0 * ((w11 * w12 + w21 * w22) / a2 + (w31 * w32) / b2)
+
+    C = (w12 * w12 + w22 * w22) / a2 + w32 * w32 / b2
+
+    "B == 0 only for look vectors tangent to a meridian plane at the equator, where xx = yy = 0 is used"
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+
+        K = -2.0 * A / B
+
+        factor = 1.0 / (A + (B + C * K) * K)
+
+        xx = numpy.where(B == 0.0, 0.0, numpy.sqrt(factor))
+
+        yy = numpy.where(B == 0.0, 0.0, K * X[:, 0])
+
+    dist1 = (xr - xx) * (xr - xx) + (yr - yy) * (yr - yy)
+
+    dist2 = (xr + xx) * (xr + xx) + (yr + yy) * (yr + yy)
+
+    xx = numpy.where(dist1 > dist2, -xx, xx)
+
+    tx = w11 * xx + w12 * yr
+
+    ty = w21 * xx + w22 * yr
+
+    tz = w31 * xx + w32 * yr
+
+    return numpy.stack((tx, ty, tz), axis=1)
+
+
 '''
 def quaternion2ECEF(q):
     """This function takes a quaternion look vector in ECEF system and converts 
@@ -217,17 +270,20 @@ def ECEF2lla(x, y, z):
 
     # alt = altitude above ellipsoid (m)
 
-    # FIXME: check if obstime is needed
+    # Returned as astropy Latitude, Longitude and Quantity as from EarthLocation.to_geodetic,
+
+    # but calculated with ECEF2geodetic
 
-    el = EarthLocation.from_geocentric(x, y, z, unit=units.m)
+    from astropy.coordinates import Latitude, Longitude
+    from astropy import units
 
-    geo = el.to_geodetic()
+    lat, lon, alt = ECEF2geodetic(x, y, z)
 
-    lat = geo[1]
+    lat = Latitude(lat, unit=units.deg)
 
-    lon = geo[0]
+    lon = Longitude(lon, unit=units.deg, wrap_angle=180 * units.deg)
 
-    alt = geo[2]
+    alt = units.Quantity(alt, units.m)
 
     return lat, lon, alt
 
@@ -254,17 +310,110 @@ def lla2ECEF(lat, lon, alt):
 
     # z = Position in ECEF (m)
 
-    # FIXME: check if obstime is needed
+    # Calculated with geodetic2ECEF, lat and lon may also be given as astropy Quantities
 
-    el = EarthLocation.from_geodetic(lon, lat, alt)
+    from astropy import units
+
+    lat = units.Quantity(lat, units.deg).to_value(units.deg)
+
+    lon = units.Quantity(lon, units.deg).to_value(units.deg)
+
+    alt = units.Quantity(alt, units.m).to_value(units.m)
+
+    return geodetic2ECEF(lat, lon, alt)
+
+
+"WGS-84 semi-major axis [m] and first eccentricity squared"
+WGS84_a = 6378137.0
+WGS84_e2 = (2 - 1 / 298.257223563) / 298.257223563
+
+
+def ECEF2geodetic(x, y, z):
+    """Converts ECEF positions into geodetic latitude, longitude and altitude above the WGS-84 ellipsoid.
+    
+    Uses the closed form solution of Vermeille (2004), which is exact to within rounding errors for positions further than about 43 km from the center of the Earth.
+    Works on arrays without creating astropy objects and gives the same result as *EarthLocation.to_geodetic* to within 0.1 mm.
+    
+    Arguments:
+        x (float or array): ECEF X-coordinate [m].
+        y (float or array): ECEF Y-coordinate [m].
+        z (float or array): ECEF Z-coordinate [m].
+        
+    Returns:
+        (tuple): tuple containing:
+            
+            **lat** (*float or array*): Geodetic latitude [degrees]. \n
+            **lon** (*float or array*): Longitude [degrees], between -180 and 180. \n
+            **alt** (*float or array*): Altitude above the ellipsoid [m].
+    
+    """
+
+    e4 = WGS84_e2 ** 2
+
+    rho2 = x * x + y * y
+
+    p = rho2 / WGS84_a ** 2
+
+    q = (1 - WGS84_e2) * z * z / WGS84_a ** 2
+
+    r = (p + q - e4) / 6
+
+    s = e4 * p * q / (4 * r ** 3)
+
+    t = numpy.cbrt(1 + s + numpy.sqrt(s * (2 + s)))
+
+    u = r * (1 + t + 1 / t)
+
+    v = numpy.sqrt(u * u + e4 * q)
+
+    w = WGS84_e2 * (u + v - q) / (2 * v)
 
-    ecef = el.get_itrs()
+    k = numpy.sqrt(u + v + w * w) - w
 
-    x = ecef.cartesian.x.value
+    D = k * numpy.sqrt(rho2) / (k + WGS84_e2)
 
-    y = ecef.cartesian.y.value
+    Dz = numpy.sqrt(D * D + z * z)
 
-    z = ecef.cartesian.z.value
+    lat = 2 * numpy.arctan2(z, D + Dz) / numpy.pi * 180
+
+    lon = numpy.arctan2(y, x) / numpy.pi * 180
+
+    alt = (k + WGS84_e2 - 1) / k * Dz
+
+    return lat, lon, alt
+
+
+def geodetic2ECEF(lat, lon, alt):
+    """Converts geodetic latitude, longitude and altitude above the WGS-84 ellipsoid into ECEF positions.
+    
+    Works on arrays without creating astropy objects.
+    
+    Arguments:
+        lat (float or array): Geodetic latitude [degrees].
+        lon (float or array): Longitude [degrees].
+        alt (float or array): Altitude above the ellipsoid [m].
+        
+    Returns:
+        (tuple): tuple containing:
+            
+            **x** (*float or array*): ECEF X-coordinate [m]. \n
+            **y** (*float or array*): ECEF Y-coordinate [m]. \n
+            **z** (*float or array*): ECEF Z-coordinate [m].
+    
+    """
+
+    lat = lat / 180 * numpy.pi
+
+    lon = lon / 180 * numpy.pi
+
+    "Prime vertical radius of curvature"
+    N = WGS84_a / numpy.sqrt(1 - WGS84_e2 * numpy.sin(lat) ** 2)
+
+    x = (N + alt) * numpy.cos(lat) * numpy.cos(lon)
+
+    y = (N + alt) * numpy.cos(lat) * numpy.sin(lon)
+
+    z = (N * (1 - WGS84_e2) + alt) * numpy.sin(lat)
 
     return x, y, z
 
@@ -293,6 +442,14 @@ def ecef2eci(x, y, z, dt):
 
     #
 
+    from astropy.coordinates import GCRS, ITRS, CartesianRepresentation
+    from astropy import units, time
+    from OPT import _IERS
+
+    # load the IERS data used by OPT (without network access)
+
+    _IERS.IERS_table()
+
     # convert datetime object to astropy time object
 
     tt = time.Time(dt, format="datetime")
@@ -341,6 +498,14 @@ def eci2ecef(x, y, z, dt):
 
     #
 
+    from astropy.coordinates import GCRS, ITRS, CartesianRepresentation
+    from astropy import time
+    from OPT import _IERS
+
+    # load the IERS data used by OPT (without network access)
+
+    _IERS.IERS_table()
+
     # convert datetime object to astropy time object
 
     tt = time.Time(dt, format="datetime")
@@ -362,6 +527,320 @@ def eci2ecef(x, y, z, dt):
     return x, y, z
 
 
+def astropy_Time(dt):
+    """Returns the times as a one dimensional astropy Time.
+    
+    Arguments:
+        dt (list or :obj:`astropy.time.Time`): UTC times, as a list of datetime objects or an astropy Time.
+        
+    Returns:
+        (:obj:`astropy.time.Time`): The times. Shape (N).
+    
+    """
+
+    from astropy import time
+
+    if isinstance(dt, time.Time):
+        tt = dt
+    else:
+        tt = time.Time(dt, format="datetime")
+
+    return tt.reshape((-1,))
+
+
+"Rotation matrices from GCRS to ITRS of the most recently used arrays of times, see *GCRS2ITRS_matrices*"
+GCRS2ITRS_cache = OrderedDict()
+GCRS2ITRS_cache_size = 64
+
+
+def GCRS2ITRS_matrices(dt, Fast=False):
+    """Returns the matrices which rotate a vector in GCRS (ECI-J2000) into ITRS (ECEF), one for each time.
+    
+    The matrices are calculated with a single astropy transformation of the three basis vectors for all times, 
+    which gives the same result as *eci2ecef* as the transformation between GCRS and ITRS is a rotation. 
+    If *Fast* is True, the approximation of *GCRS2ITRS_matrices_fast* is used instead.
+    The matrices of the most recently used arrays of times are cached, which means that any number of vectors at the same times are transformed while only calculating the matrices once.
+    
+    Arguments:
+        dt (list or :obj:`astropy.time.Time`): UTC times, as a list of datetime objects or an astropy Time. Shape (N).
+        Fast (bool): If True, use *GCRS2ITRS_matrices_fast*, which is accurate to within 10 m at LEO altitudes.
+        
+    Returns:
+        (array): Rotation matrices. Shape (N,3,3).
+    
+    """
+
+    tt = astropy_Time(dt)
+    if len(tt) == 0:
+        return numpy.zeros((0, 3, 3))
+
+    key = (Fast, tt.scale, tt.jd1.tobytes(), tt.jd2.tobytes())
+    if key in GCRS2ITRS_cache:
+        GCRS2ITRS_cache.move_to_end(key)
+        return GCRS2ITRS_cache[key]
+
+    if Fast:
+        matrices = GCRS2ITRS_matrices_fast(tt)
+    else:
+        matrices = GCRS2ITRS_matrices_astropy(tt)
+
+    GCRS2ITRS_cache[key] = matrices
+    while len(GCRS2ITRS_cache) > GCRS2ITRS_cache_size:
+        GCRS2ITRS_cache.popitem(last=False)
+
+    return matrices
+
+
+def GCRS2ITRS_matrices_astropy(tt):
+    """Calculates the matrices which rotate a vector in GCRS into ITRS with the astropy transformation, see *GCRS2ITRS_matrices*.
+    
+    Arguments:
+        tt (:obj:`astropy.time.Time`): Times. Shape (N).
+        
+    Returns:
+        (array): Rotation matrices. Shape (N,3,3).
+    
+    """
+
+    from astropy.coordinates import GCRS, ITRS, CartesianRepresentation
+    from OPT import _IERS
+
+    _IERS.IERS_table()
+
+    "Transform the basis vectors (first axis) for all times (last axis)"
+    basis = numpy.eye(3)[:, :, None] * numpy.ones(len(tt))
+    gcrs = GCRS(
+        CartesianRepresentation(x=basis[:, 0], y=basis[:, 1], z=basis[:, 2], unit="m"),
+        obstime=tt,
+    )
+    itrs = gcrs.transform_to(ITRS(obstime=tt)).cartesian.xyz.to_value("m")
+
+    "The columns of each matrix are the transformed basis vectors"
+    return numpy.transpose(itrs, (2, 0, 1))
+
+
+def GCRS2ITRS_matrices_fast(tt):
+    """Calculates approximate matrices which rotate a vector in GCRS into ITRS, for fast preview runs.
+    
+    The rotation is split as in the CIO based transformation (IAU 2006/2000A) into polar motion, the Earth Rotation Angle (ERA), and precession-nutation (including frame bias). 
+    Only the ERA is calculated for each time, from UT1. Precession-nutation, polar motion and UT1-UTC are calculated once for each UTC day, at noon, and held constant during the day.
+    The neglected change of precession-nutation during half a day is below 0.1 arcsec, which gives an error below 10 m at LEO altitudes (about 2 m is typical, see *GCRS2ITRS_validation*). 
+    
+    Arguments:
+        tt (:obj:`astropy.time.Time`): Times. Shape (N).
+        
+    Returns:
+        (array): Rotation matrices. Shape (N,3,3).
+    
+    """
+
+    PolarMotion, ERA, PrecessionNutation, day_index = GCRS2ITRS_rotations_fast(tt)
+
+    "Rotation around the z-axis with the Earth Rotation Angle of each time"
+    EarthRotation = numpy.zeros((len(ERA), 3, 3))
+    EarthRotation[:, 0, 0] = numpy.cos(ERA)
+    EarthRotation[:, 0, 1] = numpy.sin(ERA)
+    EarthRotation[:, 1, 0] = -numpy.sin(ERA)
+    EarthRotation[:, 1, 1] = numpy.cos(ERA)
+    EarthRotation[:, 2, 2] = 1
+
+    return PolarMotion[day_index] @ EarthRotation @ PrecessionNutation[day_index]
+
+
+def GCRS2ITRS_rotations_fast(tt):
+    """Calculates the rotations of the approximation of *GCRS2ITRS_matrices_fast*.
+    
+    Arguments:
+        tt (:obj:`astropy.time.Time`): Times. Shape (N).
+        
+    Returns:
+        (tuple): tuple containing:
+            
+            **PolarMotion** (*array*): Polar motion matrix of each day. Shape (D,3,3). \n
+            **ERA** (*array*): Earth Rotation Angle [rad] of each time. Shape (N). \n
+            **PrecessionNutation** (*array*): Precession-nutation matrix (GCRS to CIRS) of each day. Shape (D,3,3). \n
+            **day_index** (*array*): Index of the day of each time. Shape (N).
+    
+    """
+
+    import erfa
+    from astropy import time
+    from OPT import _IERS
+
+    utc = tt.utc
+    days, day_index = numpy.unique(numpy.floor(utc.mjd), return_inverse=True)
+    noon = time.Time(days + 0.5, format="mjd", scale="utc")
+    noon_tt = noon.tt
+
+    "Precession-nutation and polar motion of each day"
+    PrecessionNutation = erfa.c2i06a(noon_tt.jd1, noon_tt.jd2)
+    xp, yp = _IERS.IERS_table().pm_xy(noon)
+    PolarMotion = erfa.pom00(
+        xp.to_value("rad"), yp.to_value("rad"), erfa.sp00(noon_tt.jd1, noon_tt.jd2)
+    )
+    DUT1 = numpy.atleast_1d(noon.delta_ut1_utc)
+
+    "Earth Rotation Angle of each time"
+    ERA = erfa.era00(utc.jd1, utc.jd2 + DUT1[day_index] / 86400)
+
+    return PolarMotion, ERA, PrecessionNutation, day_index
+
+
+def eci2ecef_fast(vectors, dt):
+    """Transforms vectors from ECI-J2000 (GCRS) into ECEF (ITRS) with the approximation of *GCRS2ITRS_matrices_fast*.
+    
+    The rotations are applied to the vectors directly instead of forming a matrix for each time, which is faster when each time only has one vector.
+    
+    Arguments:
+        vectors (array): Vectors in ECI. Shape (N,3).
+        dt (list or :obj:`astropy.time.Time`): UTC times of the vectors, as a list of datetime objects or an astropy Time. Shape (N).
+        
+    Returns:
+        (array): Vectors in ECEF, in the same unit as *vectors*. Shape (N,3).
+    
+    """
+
+    tt = astropy_Time(dt)
+    vectors = numpy.asarray(vectors, dtype=float).reshape((-1, 3))
+    if len(tt) == 0:
+        return numpy.zeros((0, 3))
+
+    PolarMotion, ERA, PrecessionNutation, day_index = GCRS2ITRS_rotations_fast(tt)
+
+    "Precession-nutation, one day at a time"
+    cirs = numpy.empty_like(vectors)
+    for day in range(len(PrecessionNutation)):
+        InDay = day_index == day
+        cirs[InDay] = vectors[InDay] @ PrecessionNutation[day].T
+
+    "Rotation around the z-axis with the Earth Rotation Angle"
+    cos_ERA = numpy.cos(ERA)
+    sin_ERA = numpy.sin(ERA)
+    tirs = numpy.stack(
+        (
+            cos_ERA * cirs[:, 0] + sin_ERA * cirs[:, 1],
+            -sin_ERA * cirs[:, 0] + cos_ERA * cirs[:, 1],
+            cirs[:, 2],
+        ),
+        axis=1,
+    )
+
+    "Polar motion, one day at a time"
+    itrs = numpy.empty_like(vectors)
+    for day in range(len(PolarMotion)):
+        InDay = day_index == day
+        itrs[InDay] = tirs[InDay] @ PolarMotion[day].T
+
+    return itrs
+
+
+def GCRS2ITRS_validation(dt, radius=7e6):
+    """Measures the error of the approximation of *GCRS2ITRS_matrices_fast* compared to the astropy transformation.
+    
+    Arguments:
+        dt (list or :obj:`astropy.time.Time`): UTC times, as a list of datetime objects or an astropy Time. Shape (N).
+        radius (float): Distance from the center of the Earth [m] of the transformed positions.
+        
+    Returns:
+        (array): The largest error [m] in ITRS for a position at the distance *radius*, for each time. Shape (N).
+    
+    """
+
+    Astropy = GCRS2ITRS_matrices(dt)
+    Fast = GCRS2ITRS_matrices(dt, Fast=True)
+
+    return numpy.linalg.norm(Fast - Astropy, ord=2, axis=(1, 2)) * radius
+
+
+def eci2ecef_array(vectors, dt, Fast=False):
+    """Transforms vectors from ECI-J2000 (GCRS) into ECEF (ITRS), with one rotation matrix for each time.
+    
+    Array version of *eci2ecef*. Used for both positions and directions (for example velocities, optical axes and normals), 
+    which are all transformed by the same cached matrices (see *GCRS2ITRS_matrices*).
+    
+    Arguments:
+        vectors (array): Vectors in ECI. Shape (N,3).
+        dt (list or :obj:`astropy.time.Time`): UTC times of the vectors, as a list of datetime objects or an astropy Time. Shape (N).
+        Fast (bool): If True, use the approximate matrices of *GCRS2ITRS_matrices_fast*.
+        
+    Returns:
+        (array): Vectors in ECEF, in the same unit as *vectors*. Shape (N,3).
+    
+    """
+
+    return numpy.einsum("nij,nj->ni", GCRS2ITRS_matrices(dt, Fast), vectors)
+
+
+def ecef2eci_array(vectors, dt, Fast=False):
+    """Transforms vectors from ECEF (ITRS) into ECI-J2000 (GCRS), with one rotation matrix for each time.
+    
+    Array version of *ecef2eci*, using the transpose of the matrices of *GCRS2ITRS_matrices*.
+    
+    Arguments:
+        vectors (array): Vectors in ECEF. Shape (N,3).
+        dt (list or :obj:`astropy.time.Time`): UTC times of the vectors, as a list of datetime objects or an astropy Time. Shape (N).
+        Fast (bool): If True, use the approximate matrices of *GCRS2ITRS_matrices_fast*.
+        
+    Returns:
+        (array): Vectors in ECI, in the same unit as *vectors*. Shape (N,3).
+    
+    """
+
+    return numpy.einsum("nji,nj->ni", GCRS2ITRS_matrices(dt, Fast), vectors)
+
+
+def SZAfromlla_array(lat, lon, alt, dt):
+    """Calculates the solar zenith angle at many geodetic positions and times at once, for example at the LP along a simulated track.
+    
+    Array version of *SZAfromlla*. The position of the Sun is interpolated from the table of *_Ephemeris.Sun_ephemeris* once for each time 
+    and transformed to ECEF with the approximation of *eci2ecef_fast*. The zenith is the normal of the WGS-84 ellipsoid and the parallax of the position is included, but refraction is not.
+    The result agrees with *SZAfromlla* to within 0.01 degrees, the difference being mostly aberration.
+    
+    Arguments:
+        lat (array): Geodetic latitude [degrees] (WGS-84). Shape (N) or (N,M), where M positions share each time.
+        lon (array): Longitude [degrees]. Same shape as *lat*.
+        alt (array): Altitude above the ellipsoid [m]. Same shape as *lat*.
+        dt (list or :obj:`astropy.time.Time`): UTC times, as a list of datetime objects or an astropy Time. Shape (N).
+        
+    Returns:
+        (array): The solar zenith angle [degrees]. Same shape as *lat*.
+    
+    """
+
+    tt = astropy_Time(dt)
+    lat, lon, alt = numpy.broadcast_arrays(
+        numpy.asarray(lat, dtype=float),
+        numpy.asarray(lon, dtype=float),
+        numpy.asarray(alt, dtype=float),
+    )
+    if len(tt) == 0:
+        return numpy.zeros(lat.shape)
+
+    "Position of the Sun in ECEF [m], once for each time, with a shape which broadcasts against the positions"
+    tt_TT = tt.tt
+    r_Sun = _Ephemeris.Sun_ephemeris().position(
+        _Ephemeris.timescale().tt_jd(tt_TT.jd1, tt_TT.jd2)
+    )
+    r_Sun_ECEF = eci2ecef_fast(numpy.transpose(r_Sun) * 1000, tt)
+    r_Sun_ECEF = r_Sun_ECEF.reshape((len(tt), 3) + (1,) * (lat.ndim - 1))
+
+    x, y, z = geodetic2ECEF(lat, lon, alt)
+    dx = r_Sun_ECEF[:, 0] - x
+    dy = r_Sun_ECEF[:, 1] - y
+    dz = r_Sun_ECEF[:, 2] - z
+
+    "Zenith direction, normal to the ellipsoid"
+    lat = lat / 180 * numpy.pi
+    lon = lon / 180 * numpy.pi
+    cos_zenith = (
+        numpy.cos(lat) * numpy.cos(lon) * dx
+        + numpy.cos(lat) * numpy.sin(lon) * dy
+        + numpy.sin(lat) * dz
+    ) / numpy.sqrt(dx * dx + dy * dy + dz * dz)
+
+    return numpy.arccos(numpy.clip(cos_zenith, -1, 1)) / numpy.pi * 180
+
+
 def SZAfromlla(lat, lon, alt, dt):
 
     # This function takes a geodetic position and calculates the solar zenith
@@ -390,6 +869,14 @@ def SZAfromlla(lat, lon, alt, dt):
 
     # sza = solar zenith angle (deg)
 
+    from astropy.coordinates import EarthLocation, get_sun, AltAz
+    from astropy import time
+    from OPT import _IERS
+
+    # load the IERS data used by OPT (without network access)
+
+    _IERS.IERS_table()
+
     # convert datetime object to astropy time object
 
     tt = time.Time(dt, format="datetime")
@@ -415,18 +902,18 @@ def SZAfromlla(lat, lon, alt, dt):
 
 def find_orbit_plane(satpos1_eci_1, satpos2_eci):
 
-    n = pylab.cross(satpos1_eci_1, satpos2_eci)
+    n = numpy.cross(satpos1_eci_1, satpos2_eci)
 
-    n_norm = pylab.linalg.norm(n)
+    n_norm = numpy.linalg.norm(n)
 
     return n_norm
 
 
 def los_from_tanpoint_spherical(satpos1_eci_1, satpos2_eci):
 
-    n = pylab.cross(satpos1_eci_1, satpos2_eci)
+    n = numpy.cross(satpos1_eci_1, satpos2_eci)
 
-    n_norm = pylab.linalg.norm(n)
+    n_norm = numpy.linalg.norm(n)
 
     return n_norm
 
@@ -463,6 +950,10 @@ def starlist_from_ra_dec(ra_in, dec_in, width_in, height_in, Vmag):
 
     # star_table = table of stars
 
+    from astroquery.vizier import Vizier
+    import astropy.coordinates as coord
+    from astropy import units
+
     v = Vizier(
         columns=["_RAJ2000", "_DEJ2000", "Vmag"],
         column_filters={"Vmag": "<" + str(Vmag)},
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Simulates MATS during the timeline defined in the *Configuration File* for several TLEs at once.
+A part of the Operational Planning Tool.
+"""
+
+import ephem, importlib, logging
+from numpy import arange, arccos, pi
+
+from OPT import _Globals, _Library, _SatrecArray
+
+OPT_Config_File = importlib.import_module(_Globals.Config_File)
+Logger = logging.getLogger(OPT_Config_File.Logger_name())
+
+
+def MultiTLE_Simulator(TLEs, Timestep):
+    """The core function of the *MultiTLE_Simulator* program.
+
+    All TLEs are propagated together with *_SatrecArray.SatrecArrayPropagator* and then simulated one after another with *_Library.Satellite_Simulator_Batch*,
+    looking at *Timeline_settings['StandardPointingAltitude']*.
+    The transitions which determine the scheduling of *Operational Science Modes* (Mode1 and Mode2) are found in the same way as in *XML_gen*.
+    The grid of the event finders is also propagated for all TLEs together, while the refinement of the transitions of each TLE only propagates that TLE.
+
+    Arguments:
+        TLEs (list): List of TLEs, each being a list containing the two lines of a TLE.
+        Timestep (int): Timestep [s] of the simulated LP track.
+
+    Returns:
+        (list): One dictionary for each TLE containing:
+
+            **TLE** (*list*): The TLE. \n
+            **Date** (*array*): The dates of the LP track as ephem.Date floats. \n
+            **LP_track** (*dict*): The data simulated by *_Library.Satellite_Simulator_Batch* at *Date*. \n
+            **Events** (*list*): Sorted list of transitions, each being a tuple of a date (str), the name of the transition and its value.
+            "Night" is True when the point below MATS enters night and False at dawn (used by Mode1 and Mode2). "UV_on" is True when the LP moves polewards of *lat* and False when it moves equatorwards (used by Mode1).
+
+    """
+
+    _Library.SetupLogger(
+        OPT_Config_File.Logger_name(),
+        _Library.ConfigFile_Logger_settings(OPT_Config_File),
+    )
+
+    Timeline_settings = OPT_Config_File.Timeline_settings()
+    Mode_settings = OPT_Config_File.Operational_Science_Mode_settings()
+
+    StartDate = ephem.Date(Timeline_settings["start_date"])
+    EndDate = ephem.Date(StartDate + ephem.second * Timeline_settings["duration"])
+    SimulationTimes = StartDate + ephem.second * Timestep * arange(
+        int(Timeline_settings["duration"] / Timestep) + 1
+    )
+    pointing_altitude = Timeline_settings["StandardPointingAltitude"] / 1000
+
+    R_mean = 6371000  # Radius of Earth in m
+    heightAboveSurface = 35000  # Altitude in m where sun is deemed to reflect in atmosphere, determining night and day below satellite"
+
+    # Estimation of the angle between the sun and the FOV position when it enters eclipse
+    MATS_nadir_eclipse_angle = (
+        arccos(R_mean / (R_mean + heightAboveSurface)) / pi * 180 + 90
+    )
+
+    Logger.info("Number of TLEs: " + str(len(TLEs)))
+    Logger.info("Start date: " + str(StartDate) + ", End date: " + str(EndDate))
+
+    Propagator = _SatrecArray.SatrecArrayPropagator(TLEs)
+
+    "Propagate all TLEs at once at the times simulated for every TLE: the LP track and the grid of the event finders"
+    Propagator.propagate(_Library.ephemDate_to_skyfield(SimulationTimes))
+    Propagator.propagate(
+        _Library.ephemDate_to_skyfield(
+            _Library.event_finder_grid(StartDate, EndDate, Mode_settings["timestep"])
+        )
+    )
+
+    LP_tracks = [
+        _Library.Satellite_Simulator_Batch(
+            Satellite, SimulationTimes, Timeline_settings, pointing_altitude, Cache=False
+        )
+        for Satellite in Propagator.satellites
+    ]
+
+    Results = []
+    for TLE, Satellite, LP_track in zip(TLEs, Propagator.satellites, LP_tracks):
+
+        Logger.info("")
+        Logger.info("TLE: " + str(TLE))
+
+        Events = _Library.merge_events(
+            {
+                "Night": _Library.eclipse_event_finder(
+                    Satellite,
+                    StartDate,
+                    EndDate,
+                    MATS_nadir_eclipse_angle,
+                    GridSpacing=Mode_settings["timestep"],
+                ),
+                "UV_on": _Library.LPlatitude_event_finder(
+                    Satellite,
+                    StartDate,
+                    EndDate,
+                    Timeline_settings,
+                    pointing_altitude,
+                    Mode_settings["lat"],
+                    GridSpacing=Mode_settings["timestep"],
+                ),
+            }
+        )
+        Logger.info("Number of dusk/dawn and latitude transitions found: " + str(len(Events)))
+
+        Results.append(
+            {
+                "TLE": TLE,
+                "Date": SimulationTimes,
+                "LP_track": LP_track,
+                "Events": [
+                    (str(ephem.Date(EventDate)), EventName, EventValue)
+                    for EventDate, EventName, EventValue in Events
+                ],
+            }
+        )
+
+    Logger.info("")
+    Logger.info("Number of propagations of all TLEs: " + str(Propagator.propagations))
+    Logger.info(
+        "Number of propagations of single TLEs: " + str(Propagator.single_propagations)
+    )
+
+    return Results
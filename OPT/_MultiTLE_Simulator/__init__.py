@@ -0,0 +1,4 @@
+"""
+The *MultiTLE_Simulator* part of the *Operational_Planning_Tool*, which 
+purpose is to compare the LP track and the scheduling of *Operational Science Modes* for several TLEs of MATS.
+"""
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""Orbit engine which propagates a satellite with SGP4 at coarse knots and interpolates in between.
+
+Used in place of a *skyfield.sgp4lib.EarthSatellite* when simulations are run with a fine timestep.
+SGP4 is only run at knots separated by *KnotSpacing* seconds and the position and velocity at any
+time in between is calculated with cubic Hermite interpolation of the positions and velocities at the two surrounding knots.
+
+The interpolation error is estimated against direct SGP4 propagation at the midpoints of the knot intervals (where the error of the interpolation is largest).
+If the estimated error exceeds *MaxError*, the knot spacing is halved and the knots are propagated again.
+
+"""
+
+from numpy import array, zeros, floor, atleast_1d, concatenate, arange
+from numpy.linalg import norm
+from skyfield.constants import AU_KM, DAY_S
+from skyfield.positionlib import Geocentric
+
+
+def hermite_interpolation(tau, h, r0, v0, r1, v1):
+    """Cubic Hermite interpolation between two knots with known values and derivatives.
+
+    Arguments:
+        tau (array): Normalized time (0 to 1) between the knots for each point.
+        h (float): Time between the knots.
+        r0 (array): Values at the first knot for each point (N x 3).
+        v0 (array): Derivatives at the first knot for each point (N x 3).
+        r1 (array): Values at the second knot for each point (N x 3).
+        v1 (array): Derivatives at the second knot for each point (N x 3).
+
+    Returns:
+        (tuple): Interpolated values and derivatives (N x 3 each).
+
+    """
+
+    v0, v1 = v0 * h, v1 * h
+
+    tau = tau[:, None]
+    tau2 = tau * tau
+    tau3 = tau2 * tau
+
+    r = (
+        (2 * tau3 - 3 * tau2 + 1) * r0
+        + (tau3 - 2 * tau2 + tau) * v0
+        + (-2 * tau3 + 3 * tau2) * r1
+        + (tau3 - tau2) * v1
+    )
+    v = (
+        (6 * tau2 - 6 * tau) * r0
+        + (3 * tau2 - 4 * tau + 1) * v0
+        + (-6 * tau2 + 6 * tau) * r1
+        + (3 * tau2 - 2 * tau) * v1
+    ) / h
+
+    return r, v
+
+
+class InterpolatedSatellite:
+    """A satellite which position and velocity is interpolated between knots propagated with SGP4.
+
+    Has the same *at* method as *skyfield.sgp4lib.EarthSatellite* and can therefore be used in its place, for example in *Satellite_Simulator*.
+    Knots are propagated lazily when times outside of the already propagated knots are requested.
+
+    Arguments:
+        Satellite_skyfield (:obj:`skyfield.sgp4lib.EarthSatellite`): A Skyfield object representing an EarthSatellite defined by a TLE.
+        KnotSpacing (float): Time in seconds between the knots propagated with SGP4.
+        MaxError (float): Maximum allowed error in meters of the interpolated position compared to direct SGP4 propagation.
+        Logger (:obj:`logging.Logger`): Logger used to report the estimated error. Optional.
+        ErrorCheckStride (int): Every *ErrorCheckStride*-th new knot interval is checked against direct SGP4 propagation.
+
+    Attributes:
+        ErrorEstimate (float): Largest found error in meters of the interpolated position compared to direct SGP4 propagation.
+        InterpolationSettings (tuple): The given *KnotSpacing* and *MaxError*, which stay the same when the spacing of the knots is halved.
+
+    """
+
+    MinKnotSpacing = 1
+
+    def __init__(
+        self,
+        Satellite_skyfield,
+        KnotSpacing=60,
+        MaxError=1,
+        Logger=None,
+        ErrorCheckStride=10,
+    ):
+
+        self.Satellite_skyfield = Satellite_skyfield
+        self.model = Satellite_skyfield.model
+        self.epoch = Satellite_skyfield.epoch
+        self.name = Satellite_skyfield.name
+        self.target = Satellite_skyfield.target
+
+        self.KnotSpacing = float(KnotSpacing)
+        self.MaxError = MaxError
+        self.InterpolationSettings = (float(KnotSpacing), MaxError)
+        self.Logger = Logger
+        self.ErrorCheckStride = ErrorCheckStride
+
+        "Whole TT Julian date used as reference for the knots"
+        self.ReferenceDate = Satellite_skyfield.epoch.whole
+
+        self._reset()
+
+    def _reset(self):
+        """Removes all propagated knots."""
+
+        self.FirstKnot = None
+        self.r_knots = zeros((0, 3))
+        self.v_knots = zeros((0, 3))
+        self.ErrorEstimate = 0.0
+
+    def _seconds(self, t):
+        """Returns the time in TT seconds after *ReferenceDate*."""
+
+        return (t.whole - self.ReferenceDate) * DAY_S + t.tt_fraction * DAY_S
+
+    def _propagate(self, seconds, timescale):
+        """Propagates the satellite with SGP4 at times given in seconds after *ReferenceDate*."""
+
+        t = timescale.tt_jd(self.ReferenceDate, array(seconds) / DAY_S)
+        Satellite_geo = self.Satellite_skyfield.at(t)
+
+        return Satellite_geo.position.km.T, Satellite_geo.velocity.km_per_s.T
+
+    def _interpolate(self, seconds):
+        """Cubic Hermite interpolation of position [km] and velocity [km/s] at times given in seconds after *ReferenceDate*."""
+
+        h = self.KnotSpacing
+        knots = floor(seconds / h).astype(int)
+        index = knots - self.FirstKnot
+        tau = (seconds - knots * h) / h
+
+        return hermite_interpolation(
+            tau,
+            h,
+            self.r_knots[index],
+            self.v_knots[index],
+            self.r_knots[index + 1],
+            self.v_knots[index + 1],
+        )
+
+    def _extend(self, FirstKnot, LastKnot, timescale):
+        """Propagates any missing knots between FirstKnot and LastKnot. Returns the indices of the new knots."""
+
+        h = self.KnotSpacing
+
+        if self.FirstKnot == None:
+            knots = arange(FirstKnot, LastKnot + 1)
+            self.r_knots, self.v_knots = self._propagate(knots * h, timescale)
+            self.FirstKnot = FirstKnot
+            return knots
+
+        CurrentLastKnot = self.FirstKnot + len(self.r_knots) - 1
+        new_knots = []
+
+        if FirstKnot < self.FirstKnot:
+            knots = arange(FirstKnot, self.FirstKnot)
+            r, v = self._propagate(knots * h, timescale)
+            self.r_knots = concatenate((r, self.r_knots))
+            self.v_knots = concatenate((v, self.v_knots))
+            self.FirstKnot = FirstKnot
+            new_knots.append(knots)
+
+        if LastKnot > CurrentLastKnot:
+            knots = arange(CurrentLastKnot + 1, LastKnot + 1)
+            r, v = self._propagate(knots * h, timescale)
+            self.r_knots = concatenate((self.r_knots, r))
+            self.v_knots = concatenate((self.v_knots, v))
+            new_knots.append(knots)
+
+        if new_knots == []:
+            return arange(0)
+        else:
+            return concatenate(new_knots)
+
+    def _check_error(self, new_knots, timescale):
+        """Estimates the interpolation error at the midpoints of a subset of the knot intervals starting at new_knots."""
+
+        LastKnot = self.FirstKnot + len(self.r_knots) - 1
+        knots = new_knots[new_knots < LastKnot][:: self.ErrorCheckStride]
+        if len(knots) == 0:
+            return
+
+        midpoints = (knots + 0.5) * self.KnotSpacing
+        r_interpolated, v_interpolated = self._interpolate(midpoints)
+        r_SGP4, v_SGP4 = self._propagate(midpoints, timescale)
+
+        Error = norm(r_interpolated - r_SGP4, axis=1).max() * 1000
+
+        if Error > self.ErrorEstimate:
+            self.ErrorEstimate = Error
+            if self.Logger != None:
+                self.Logger.debug(
+                    "Estimated orbit interpolation error [m]: "
+                    + str(self.ErrorEstimate)
+                    + ", with a knot spacing of [s]: "
+                    + str(self.KnotSpacing)
+                )
+
+    def at(self, t):
+        """Returns the interpolated position and velocity of the satellite.
+
+        Arguments:
+            t (:obj:`skyfield.timelib.Time`): The time, or array of times, of the position.
+
+        Returns:
+            (:obj:`skyfield.positionlib.Geocentric`): Position and velocity of the satellite in GCRS.
+
+        """
+
+        seconds = atleast_1d(self._seconds(t))
+
+        while True:
+            FirstKnot = int(floor(seconds.min() / self.KnotSpacing))
+            LastKnot = int(floor(seconds.max() / self.KnotSpacing)) + 1
+
+            new_knots = self._extend(FirstKnot, LastKnot, t.ts)
+            self._check_error(new_knots, t.ts)
+
+            if (
+                self.ErrorEstimate <= self.MaxError
+                or self.KnotSpacing / 2 < self.MinKnotSpacing
+            ):
+                break
+
+            "The interpolation is not accurate enough, propagate again with a shorter knot spacing"
+            if self.Logger != None:
+                self.Logger.warning(
+                    "Estimated orbit interpolation error of "
+                    + str(self.ErrorEstimate)
+                    + " m is larger than "
+                    + str(self.MaxError)
+                    + " m. The knot spacing is reduced to "
+                    + str(self.KnotSpacing / 2)
+                    + " s"
+                )
+            self.KnotSpacing = self.KnotSpacing / 2
+            self._reset()
+
+        r, v = self._interpolate(seconds)
+
+        if len(t.shape) == 0:
+            r, v = r[0], v[0]
+
+        return Geocentric(r.T / AU_KM, v.T * DAY_S / AU_KM, t, 399, self.target)
+
+    def ErrorBound(self, t):
+        """Returns the largest error in meters of the interpolated position compared to direct SGP4 propagation at the given times.
+
+        Arguments:
+            t (:obj:`skyfield.timelib.Time`): Array of times to compare at.
+
+        Returns:
+            (float): Largest position error [m].
+
+        """
+
+        r_interpolated = self.at(t).position.km
+        r_SGP4 = self.Satellite_skyfield.at(t).position.km
+
+        return norm(atleast_1d(r_interpolated - r_SGP4).reshape(3, -1), axis=0).max() * 1000
@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""Orbit product: the simulated track of MATS during a timeline, saved to a HDF5 file which is shared by the programs of OPT.
+
+*Timeline_gen* optionally simulates MATS at a fixed cadence (*Timeline_settings['OrbitProduct_Timestep']*) during the whole timeline,
+looking at *Timeline_settings['StandardPointingAltitude']*, and saves the result in the *Output* folder.
+The file holds the time, all data returned by *_Library.Satellite_Simulator_Batch* and also the position, velocity, orbit normal and optical axis in ECEF,
+and the position of the LP in ECI and ECEF together with its latitude, longitude and altitude.
+
+The name of the file contains a hash of the TLE and the settings which affect the simulation (see *OrbitProduct_key*).
+*XML_gen* and *Timeline_Plotter* look for a file with the hash of their TLE and settings and, if it exists, memory-map it and register it in *_Library.Satellite_cache*.
+Simulations of points in time on the grid of the orbit product are then read from the file instead of being simulated again.
+The event finders of *_Library* (used by the Science Modes of *XML_gen*) bracket their events on the grid of the orbit product, so that only the refinement of each event is simulated.
+Points in time between the grid or with another pointing altitude are still simulated as usual.
+
+The datasets are stored contiguously and uncompressed which makes it possible to memory-map them with *numpy.memmap*,
+meaning that only the parts of the file which are actually read are loaded into memory.
+
+"""
+
+import ephem, hashlib, json, os
+from numpy import memmap
+from numpy import (
+    array,
+    arange,
+    atleast_1d,
+    concatenate,
+    full,
+    nan,
+    searchsorted,
+    zeros,
+)
+
+from OPT import _Library, _MATS_coordinates
+
+
+"Version of the layout of the file. Files of another version are not used"
+Version = 2
+
+"Number of points in time simulated at once when the orbit product is written"
+ChunkSize = 20000
+
+"Time [s] of previously simulated latitudes kept between chunks to estimate the latitude of the LP"
+TrackLength = 3600
+
+"Settings in Timeline_settings which affect the data in the orbit product"
+SettingNames = [
+    "start_date",
+    "duration",
+    "yaw_correction",
+    "yaw_amplitude",
+    "yaw_phase",
+    "StandardPointingAltitude",
+    "OrbitInterpolation_KnotSpacing",
+    "OrbitInterpolation_MaxError",
+    "OrbitProduct_Timestep",
+    "FastTransformations",
+]
+
+
+def _dataset_name(name):
+    """Returns the name of the dataset of a key of a Satellite_dict, as '/' separates groups in HDF5."""
+
+    return name.replace("/", " per ")
+
+
+def OrbitProduct_key(TLE, Timeline_settings):
+    """Returns the hash of the TLE and of the settings which affect the data in the orbit product.
+
+    Arguments:
+        TLE (list): List containing the two lines of the TLE.
+        Timeline_settings (dict): A dictionary containing relevant settings to the simulation.
+
+    Returns:
+        (str): The hash.
+
+    """
+
+    settings = {name: Timeline_settings.get(name) for name in SettingNames}
+    text = json.dumps([Version, TLE[0], TLE[1], settings], sort_keys=True)
+
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def OrbitProduct_path(TLE, Timeline_settings):
+    """Returns the path of the orbit product of the TLE and the settings.
+
+    Arguments:
+        TLE (list): List containing the two lines of the TLE.
+        Timeline_settings (dict): A dictionary containing relevant settings to the simulation.
+
+    Returns:
+        (str): Path of the file in the *Output* folder.
+
+    """
+
+    return os.path.join(
+        "Output", "OrbitProduct__" + OrbitProduct_key(TLE, Timeline_settings) + ".h5"
+    )
+
+
+def OrbitProduct_simulator(Satellite_skyfield, SimulationTimes, Timeline_settings, Track):
+    """Simulates the data of an orbit product.
+
+    Arguments:
+        Satellite_skyfield (:obj:`skyfield.sgp4lib.EarthSatellite`): A Skyfield object representing an EarthSatellite defined by a TLE.
+        SimulationTimes (array): The times of the simulation as ephem.Date floats.
+        Timeline_settings (dict): A dictionary containing relevant settings to the simulation.
+        Track (tuple): Tuple containing dates (ephem.Date floats) and latitudes [degrees] of the Satellite simulated before *SimulationTimes*.
+
+    Returns:
+        (tuple): tuple containing:
+
+            **Satellite_dict** (*dict*): Simulated data from *_Library.Satellite_Simulator_Batch*. \n
+            **Extra_dict** (*dict*): Simulated data in ECEF and of the LP. \n
+            **Track** (*tuple*): The end of the track, to be used when the next points in time are simulated.
+
+    """
+
+    Satellite_dict = _Library.Satellite_Simulator_Batch(
+        Satellite_skyfield,
+        SimulationTimes,
+        Timeline_settings,
+        Timeline_settings["StandardPointingAltitude"] / 1000,
+        Track=Track,
+        Cache=False,
+    )
+
+    "Keep the end of the track to estimate the latitude of the LP in the next chunk"
+    TrackDates = concatenate((Track[0], SimulationTimes))
+    TrackLatitudes = concatenate((Track[1], Satellite_dict["Latitude [degrees]"]))
+    KeepTrack = TrackDates >= SimulationTimes[-1] - ephem.second * TrackLength
+    Track = (TrackDates[KeepTrack], TrackLatitudes[KeepTrack])
+
+    "Transform to ECEF in the same way as Timeline_Plotter, but for all points in time at once"
+    dates = [ephem.Date(date).datetime() for date in SimulationTimes]
+    Fast = Timeline_settings.get("FastTransformations", False)
+
+    def eci2ecef(vectors):
+        return _MATS_coordinates.eci2ecef_array(vectors, dates, Fast)
+
+    r_ECEF = eci2ecef(Satellite_dict["Position [km]"] * 1000)
+    optical_axis_ECEF = eci2ecef(Satellite_dict["OpticalAxis"])
+
+    r_LP_ECEF = _MATS_coordinates.ecef2tanpoint_array(r_ECEF, optical_axis_ECEF)
+    lat_LP, long_LP, alt_LP = _MATS_coordinates.ECEF2geodetic(
+        r_LP_ECEF[:, 0], r_LP_ECEF[:, 1], r_LP_ECEF[:, 2]
+    )
+    r_LP = _MATS_coordinates.ecef2eci_array(r_LP_ECEF, dates, Fast)
+
+    Extra_dict = {
+        "Position_ECEF [km]": r_ECEF / 1000,
+        "Velocity_ECEF [km/s]": eci2ecef(Satellite_dict["Velocity [km/s]"]),
+        "OrbitNormal_ECEF": eci2ecef(Satellite_dict["OrbitNormal"]),
+        "OpticalAxis_ECEF": optical_axis_ECEF,
+        "Position_LP [km]": r_LP / 1000,
+        "Position_LP_ECEF [km]": r_LP_ECEF / 1000,
+        "Latitude_LP [degrees]": lat_LP,
+        "Longitude_LP [degrees]": long_LP,
+        "Altitude_LP [km]": alt_LP / 1000,
+    }
+
+    return Satellite_dict, Extra_dict, Track
+
+
+def create_OrbitProduct(TLE, Timeline_settings, Logger):
+    """Writes the orbit product of the TLE and the settings, unless it already exists.
+
+    Arguments:
+        TLE (list): List containing the two lines of the TLE.
+        Timeline_settings (dict): A dictionary containing relevant settings to the simulation.
+        Logger (:obj:`logging.Logger`): Logger used to log the progress.
+
+    Returns:
+        (str): Path of the orbit product.
+
+    """
+
+    import h5py
+    from OPT import _IERS
+
+    path = OrbitProduct_path(TLE, Timeline_settings)
+
+    if os.path.isfile(path):
+        Logger.info("Orbit product already exists: " + path)
+        return path
+
+    Timestep = Timeline_settings["OrbitProduct_Timestep"]
+    StartDate = ephem.Date(Timeline_settings["start_date"])
+    timesteps = int(Timeline_settings["duration"] / Timestep) + 1
+    Logger.info(
+        "Write orbit product with "
+        + str(timesteps)
+        + " points in time to: "
+        + path
+    )
+    _IERS.log_IERS_status(Logger)
+
+    Satellite_skyfield = _Library.EarthSatellite_from_TLE(TLE, Timeline_settings, Logger)
+    Track = (zeros(0), zeros(0))
+
+    "Write to a temporary file which is renamed when complete, so that an interrupted run never leaves an incomplete orbit product"
+    with h5py.File(path + ".tmp", "w") as File:
+
+        File.attrs["Version"] = Version
+        File.attrs["key"] = OrbitProduct_key(TLE, Timeline_settings)
+        File.attrs["TLE"] = TLE
+        File.attrs["Timeline_settings"] = json.dumps(
+            {name: Timeline_settings.get(name) for name in SettingNames}
+        )
+        File.attrs["SatelliteKey"] = json.dumps(
+            _Library.Satellite_cache.SatelliteKey(Satellite_skyfield)
+        )
+
+        for start in range(0, timesteps, ChunkSize):
+
+            SimulationTimes = StartDate + ephem.second * Timestep * arange(
+                start, min(start + ChunkSize, timesteps)
+            )
+            Satellite_dict, Extra_dict, Track = OrbitProduct_simulator(
+                Satellite_skyfield, SimulationTimes, Timeline_settings, Track
+            )
+            Data = {"Date": SimulationTimes}
+            Data.update(Satellite_dict)
+            Data.update(Extra_dict)
+
+            for name, value in Data.items():
+                if start == 0:
+                    File.create_dataset(
+                        _dataset_name(name),
+                        shape=(timesteps,) + value.shape[1:],
+                        dtype=value.dtype,
+                    )
+                File[_dataset_name(name)][start : start + len(value)] = value
+
+            Logger.debug(
+                "Orbit product simulated until: "
+                + str(ephem.Date(SimulationTimes[-1]))
+            )
+
+        File.attrs["names"] = list(Data.keys())
+        File.attrs["Satellite_names"] = list(Satellite_dict.keys())
+
+    os.replace(path + ".tmp", path)
+
+    return path
+
+
+def load_OrbitProduct(TLE, Timeline_settings, Logger):
+    """Memory-maps the orbit product of the TLE and the settings if it exists, and registers it in *_Library.Satellite_cache*.
+
+    Arguments:
+        TLE (list): List containing the two lines of the TLE.
+        Timeline_settings (dict): A dictionary containing relevant settings to the simulation.
+        Logger (:obj:`logging.Logger`): Logger used to log if the orbit product is used.
+
+    Returns:
+        (:obj:`OrbitProduct`): The orbit product, or None if it does not exist or if orbit products are not used.
+
+    """
+
+    if Timeline_settings.get("OrbitProduct_Timestep", 0) == 0:
+        return None
+
+    path = OrbitProduct_path(TLE, Timeline_settings)
+
+    if not os.path.isfile(path):
+        Logger.info(
+            "No orbit product found for the TLE and Timeline_settings, simulating instead"
+        )
+        return None
+
+    Product = OrbitProduct(path)
+
+    if Product.key != OrbitProduct_key(TLE, Timeline_settings):
+        Logger.warning("Orbit product " + path + " does not match its name, not used")
+        return None
+
+    Logger.info("Using orbit product: " + path)
+    _Library.Satellite_cache.add_OrbitProduct(Product)
+
+    return Product
+
+
+def OrbitProduct_lookup(
+    Satellite_skyfield, SimulationTimes, Timeline_settings, pointing_altitude
+):
+    """Reads data from the orbit products registered in *_Library.Satellite_cache*.
+
+    Arguments:
+        Satellite_skyfield (:obj:`skyfield.sgp4lib.EarthSatellite`): A Skyfield object representing an EarthSatellite defined by a TLE.
+        SimulationTimes (array): The times of the simulation as ephem.Date floats.
+        Timeline_settings (dict): A dictionary containing relevant settings to the simulation.
+        pointing_altitude (float or array): Contains the pointing altitude of the simulation [km]. Either a single value or one value for each point in time.
+
+    Returns:
+        (tuple): tuple containing:
+
+            **Data** (*dict*): All data of the orbit product, with its first dimension equal to the number of points in time. Set to nan for points in time not covered. \n
+            **covered** (*array*): True for points in time found in an orbit product.
+
+    """
+
+    SimulationTimes = atleast_1d(array(SimulationTimes, dtype=float))
+    covered = zeros(SimulationTimes.shape, dtype=bool)
+    Data = {}
+
+    Satellite_cache = _Library.Satellite_cache
+    Indices = Satellite_cache.OrbitProduct_indices(
+        Satellite_cache.SatelliteKey(Satellite_skyfield),
+        SimulationTimes,
+        Timeline_settings,
+        pointing_altitude,
+    )
+
+    for Product, indices in Indices:
+        found = indices != -1
+        if not found.any():
+            continue
+
+        for name, value in Product.Data.items():
+            if name not in Data:
+                Data[name] = full((len(SimulationTimes),) + value.shape[1:], nan)
+            Data[name][found] = value[indices[found]]
+        covered |= found
+
+    return Data, covered
+
+
+class OrbitProduct:
+    """An orbit product written by *create_OrbitProduct*, memory-mapped for reading.
+
+    Arguments:
+        path (str): Path of the orbit product.
+
+    Attributes:
+        key (str): Hash of the TLE and the settings (see *OrbitProduct_key*).
+        Data (dict): Memory-mapped arrays with the same keys as the datasets of the orbit product (including "Date").
+
+    """
+
+    def __init__(self, path):
+
+        import h5py
+
+        self.path = path
+
+        with h5py.File(path, "r") as File:
+
+            self.key = File.attrs["key"]
+            self.SatelliteKey = tuple(json.loads(File.attrs["SatelliteKey"]))
+            settings = json.loads(File.attrs["Timeline_settings"])
+            names = list(File.attrs["names"])
+            self.Satellite_names = list(File.attrs["Satellite_names"])
+
+            self.Data = {}
+            for name in names:
+                dataset = File[_dataset_name(name)]
+                self.Data[name] = memmap(
+                    path,
+                    dtype=dataset.dtype,
+                    mode="r",
+                    offset=dataset.id.get_offset(),
+                    shape=dataset.shape,
+                )
+
+        "Parts of the keys of *_Library.Satellite_cache* which are covered by the orbit product"
+        TimeResolution = _Library.Satellite_Simulator_Cache.TimeResolution
+        self.FirstTimeKey = round(
+            float(ephem.Date(settings["start_date"])) / ephem.second / TimeResolution
+        )
+        self.TimeKeyStep = round(settings["OrbitProduct_Timestep"] / TimeResolution)
+        self.pointing_altitude = float(settings["StandardPointingAltitude"] / 1000)
+        self.SettingsKey = (
+            settings["yaw_correction"],
+            settings["yaw_amplitude"],
+            settings["yaw_phase"],
+        )
+
+    def indices(self, SatelliteKey, TimeKeys, SettingsKey, pointing_altitude):
+        """Returns the indices in the orbit product of points in time.
+
+        Arguments:
+            SatelliteKey (tuple): Output of *_Library.Satellite_Simulator_Cache.SatelliteKey*.
+            TimeKeys (array): Output of *_Library.Satellite_Simulator_Cache.TimeKeys*.
+            SettingsKey (tuple): Output of *_Library.Satellite_Simulator_Cache.SettingsKey*. If None, the yaw settings are not compared, which is only correct for data that does not depend on the pointing.
+            pointing_altitude (array): The pointing altitude of each point in time [km]. If None, the pointing altitude is not compared.
+
+        Returns:
+            (array): The index of each point in time, or -1 if it is not covered by the orbit product.
+
+        """
+
+        indices = full(TimeKeys.shape, -1, dtype="int64")
+
+        if SatelliteKey != self.SatelliteKey or (
+            SettingsKey != None and SettingsKey != self.SettingsKey
+        ):
+            return indices
+
+        steps, remainder = divmod(TimeKeys - self.FirstTimeKey, self.TimeKeyStep)
+        covered = (remainder == 0) & (steps >= 0) & (steps < len(self.Data["Date"]))
+        if pointing_altitude is not None:
+            covered &= pointing_altitude == self.pointing_altitude
+        indices[covered] = steps[covered]
+
+        return indices
+
+    def grid(self, StartDate, EndDate, GridSpacing):
+        """Returns points in time of the orbit product in a time window, to be used as the grid of *_Library.event_finder*.
+
+        Arguments:
+            StartDate (:obj:`ephem.Date`): Start of the time window.
+            EndDate (:obj:`ephem.Date`): End of the time window.
+            GridSpacing (float): Wanted spacing of the grid [s]. Rounded to a multiple of the timestep of the orbit product.
+
+        Returns:
+            (array): The dates (ephem.Date floats) of the points in time between *StartDate* and *EndDate*, or None if the orbit product does not cover the whole time window.
+
+        """
+
+        Dates = array(self.Data["Date"])
+
+        if len(Dates) == 0 or not Dates[0] <= StartDate <= EndDate <= Dates[-1]:
+            return None
+
+        Timestep = self.TimeKeyStep * _Library.Satellite_Simulator_Cache.TimeResolution
+        Stride = max(1, round(GridSpacing / Timestep))
+        First = searchsorted(Dates, StartDate)
+        Last = searchsorted(Dates, EndDate, side="right")
+
+        return Dates[First:Last:Stride]
+
+    def get(self, indices):
+        """Returns the Satellite_dict of points in time covered by the orbit product.
+
+        Arguments:
+            indices (array): The indices of the points in time in the orbit product (see *indices*).
+
+        Returns:
+            (dict): The data with the same keys as the output of *_Library.Satellite_Simulator_Batch*.
+
+        """
+
+        return {name: array(self.Data[name][indices]) for name in self.Satellite_names}
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""Orbit engine which propagates several TLEs at once with the *SatrecArray* of sgp4.
+
+Used to compare simulations of several TLEs of MATS (for example a fresh TLE, the TLE of the previous day and a TLE derived by OHB).
+Skyfield propagates each *EarthSatellite* separately and then rotates the position from TEME to GCRS, which requires the precession and nutation of the Earth
+at each point in time. The rotation is the slow part of the propagation, and it is the same for all TLEs.
+*SatrecArrayPropagator* instead propagates all TLEs with a single call to *SatrecArray.sgp4* and rotates them with one rotation calculated for each point in time.
+
+*SatrecArrayPropagator* provides one *SatrecArraySatellite* for each TLE, which is used in place of a *skyfield.sgp4lib.EarthSatellite* in the simulations of OPT.
+The arrays of times shared by all TLEs are propagated with *SatrecArrayPropagator.propagate*, which keeps the propagated positions of the most recently propagated arrays of times.
+The satellites can then be simulated one after another at those times while only being propagated once.
+Times which are only requested by one satellite, such as the refinement steps of the event finders, are propagated for that satellite alone.
+
+"""
+
+from collections import OrderedDict
+from numpy import atleast_1d, einsum, rint
+from sgp4.api import SatrecArray, SGP4_ERRORS
+from skyfield.constants import AU_KM, DAY_S
+from skyfield.positionlib import Geocentric
+from skyfield.sgp4lib import EarthSatellite, TEME
+from skyfield.timelib import julian_day
+
+
+class SatrecArrayPropagator:
+    """Propagates several TLEs at once.
+
+    Arguments:
+        TLEs (list): List of TLEs, each being a list containing the two lines of a TLE.
+        MaxSize (int): Number of arrays of times of which the propagated positions are kept.
+
+    Attributes:
+        satellites (list): One *SatrecArraySatellite* for each TLE, in the same order as *TLEs*.
+        propagations (int): Number of times that all TLEs have been propagated.
+        single_propagations (int): Number of times that a single TLE has been propagated, at times not propagated for all TLEs.
+
+    """
+
+    def __init__(self, TLEs, MaxSize=64):
+
+        EarthSatellites = [EarthSatellite(TLE[0], TLE[1]) for TLE in TLEs]
+
+        self.satrecs = [Satellite_skyfield.model for Satellite_skyfield in EarthSatellites]
+        self.satrec_array = SatrecArray(self.satrecs)
+        self.satellites = [
+            SatrecArraySatellite(self, index, Satellite_skyfield)
+            for index, Satellite_skyfield in enumerate(EarthSatellites)
+        ]
+
+        self.MaxSize = MaxSize
+        self.propagated = OrderedDict()
+        self.propagations = 0
+        self.single_propagations = 0
+
+    def split_date(self, t):
+        """Returns the date of times split into a whole and a fractional Julian date in UTC, as expected by sgp4, and the key of the times.
+
+        Arguments:
+            t (:obj:`skyfield.timelib.Time`): The time, or array of times.
+
+        Returns:
+            (tuple): tuple containing:
+
+                **whole** (*array*): The whole part of the Julian dates. \n
+                **fraction** (*array*): The fractional part of the Julian dates in UTC. \n
+                **key** (*tuple*): Key of the times among the propagated arrays of times.
+
+        """
+
+        "The leap seconds (TAI - UTC, a whole number of seconds) are derived from the public UTC calendar date of Skyfield"
+        UTC = t.utc
+        whole = atleast_1d(t.whole)
+        UTC_jd = julian_day(UTC.year, UTC.month, UTC.day) - 0.5 + (
+            UTC.hour * 3600 + UTC.minute * 60 + UTC.second
+        ) / DAY_S
+        leap_seconds = rint((t.tai - UTC_jd) * DAY_S)
+        fraction = atleast_1d(t.tai_fraction - leap_seconds / DAY_S)
+
+        return whole, fraction, (whole.tobytes(), fraction.tobytes())
+
+    def propagate(self, t):
+        """Returns the positions and velocities of all TLEs in GCRS, in the same way as *skyfield.sgp4lib.EarthSatellite.at*.
+
+        Used for arrays of times which are simulated for all TLEs. The result is kept, and is also used by *propagate_satellite*.
+
+        Arguments:
+            t (:obj:`skyfield.timelib.Time`): The time, or array of times.
+
+        Returns:
+            (tuple): tuple containing:
+
+                **r** (*array*): Positions [au] (number of TLEs x 3 x number of times). \n
+                **v** (*array*): Velocities [au/day] (number of TLEs x 3 x number of times). \n
+                **errors** (*array*): SGP4 error codes (number of TLEs x number of times).
+
+        """
+
+        whole, fraction, key = self.split_date(t)
+
+        if key in self.propagated:
+            self.propagated.move_to_end(key)
+            return self.propagated[key]
+
+        errors, r_TEME, v_TEME = self.satrec_array.sgp4(whole, fraction)
+        self.propagations += 1
+
+        "Rotation from TEME to GCRS, the same for all TLEs"
+        R = TEME.rotation_at(t).reshape(3, 3, -1)
+
+        r = einsum("jit,ntj->nit", R, r_TEME / AU_KM)
+        v = einsum("jit,ntj->nit", R, v_TEME / AU_KM * DAY_S)
+
+        self.propagated[key] = (r, v, errors)
+        while len(self.propagated) > self.MaxSize:
+            self.propagated.popitem(last=False)
+
+        return r, v, errors
+
+    def propagate_satellite(self, t, index):
+        """Returns the position and velocity of one TLE in GCRS.
+
+        Taken from the result of *propagate* if the times have been propagated for all TLEs, otherwise only the TLE is propagated.
+
+        Arguments:
+            t (:obj:`skyfield.timelib.Time`): The time, or array of times.
+            index (int): The index of the TLE.
+
+        Returns:
+            (tuple): tuple containing:
+
+                **r** (*array*): Positions [au] (3 x number of times). \n
+                **v** (*array*): Velocities [au/day] (3 x number of times). \n
+                **errors** (*array*): SGP4 error codes (number of times).
+
+        """
+
+        whole, fraction, key = self.split_date(t)
+
+        if key in self.propagated:
+            self.propagated.move_to_end(key)
+            r, v, errors = self.propagated[key]
+            return r[index], v[index], errors[index]
+
+        errors, r_TEME, v_TEME = self.satrecs[index].sgp4_array(whole, fraction)
+        self.single_propagations += 1
+
+        R = TEME.rotation_at(t).reshape(3, 3, -1)
+
+        r = einsum("jit,tj->it", R, r_TEME / AU_KM)
+        v = einsum("jit,tj->it", R, v_TEME / AU_KM * DAY_S)
+
+        return r, v, errors
+
+
+class SatrecArraySatellite:
+    """One of the TLEs of a *SatrecArrayPropagator*, used in place of a *skyfield.sgp4lib.EarthSatellite*.
+
+    Arguments:
+        Propagator (:obj:`SatrecArrayPropagator`): The propagator of all TLEs.
+        index (int): The index of the TLE in the propagator.
+        Satellite_skyfield (:obj:`skyfield.sgp4lib.EarthSatellite`): The EarthSatellite of the TLE.
+
+    """
+
+    def __init__(self, Propagator, index, Satellite_skyfield):
+
+        self.Propagator = Propagator
+        self.index = index
+        self.model = Satellite_skyfield.model
+        self.epoch = Satellite_skyfield.epoch
+        self.name = Satellite_skyfield.name
+        self.target = Satellite_skyfield.target
+
+    def at(self, t):
+        """Returns the position and velocity of the satellite.
+
+        Arguments:
+            t (:obj:`skyfield.timelib.Time`): The time, or array of times, of the position.
+
+        Returns:
+            (:obj:`skyfield.positionlib.Geocentric`): Position and velocity of the satellite in GCRS.
+
+        """
+
+        r, v, errors = self.Propagator.propagate_satellite(t, self.index)
+
+        if len(t.shape) == 0:
+            r, v, errors = r[:, 0], v[:, 0], errors[:1]
+
+        position = Geocentric(r, v, t, 399, self.target)
+        messages = [SGP4_ERRORS[error] if error else None for error in errors]
+        position.message = messages[0] if len(t.shape) == 0 else messages
+
+        return position
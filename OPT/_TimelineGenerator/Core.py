@@ -11,7 +11,7 @@ import json, logging, sys, time, os, ephem, importlib
 
 
 from .Modes import Modes_Header
-from OPT import _Globals, _Library
+from OPT import _Globals, _Library, _OrbitProduct
 
 OPT_Config_File = importlib.import_module(_Globals.Config_File)
 Logger = logging.getLogger(OPT_Config_File.Logger_name())
@@ -33,7 +33,7 @@ def Timeline_generator():
     
     
     "############# Set up Logger #################################"
-    _Library.SetupLogger(OPT_Config_File.Logger_name())
+    _Library.SetupLogger(OPT_Config_File.Logger_name(), _Library.ConfigFile_Logger_settings(OPT_Config_File))
     "#############################################################"
     
     Logger.info('Start of program')
@@ -57,6 +57,11 @@ def Timeline_generator():
         Logger.error('OPT_Config_File.Timeline_settings["yaw_correction"] is set wrong')
         raise TypeError
         
+    "Write the orbit product, which is reused by the Modes and later by XML_gen and Timeline_Plotter"
+    if( Timeline_settings.get('OrbitProduct_Timestep', 0) != 0 ):
+        _OrbitProduct.create_OrbitProduct(OPT_Config_File.getTLE(), Timeline_settings, Logger)
+        _OrbitProduct.load_OrbitProduct(OPT_Config_File.getTLE(), Timeline_settings, Logger)
+    
     
     "Get a List of Modes and CMDs in a prioritized order which are to be scheduled"
     Scheduling_priority = OPT_Config_File.Scheduling_priority()
@@ -65,7 +70,7 @@ def Timeline_generator():
     SCIMOD_Timeline_unchronological = []
     
     "Create Occupied_Timeline dictionary with keys equal to keys of Scheduling_priority"
-    Occupied_Timeline = {key:[] for key in Scheduling_priority}
+    Occupied_Timeline = _Library.OccupiedTimeline({key:[] for key in Scheduling_priority})
     "Create scheduled_instances dictionary with keys equal to keys of Scheduling_priority. This will keep track of how many times something is scheduled"
     scheduled_instances = {key:0 for key in Scheduling_priority}
     
@@ -74,7 +79,7 @@ def Timeline_generator():
     _Globals.Mode124Iteration = 1
     
     Logger.debug('')
-    Logger.debug('Occupied_Timeline: \n'+"{" + "\n".join("        {}: {}".format(k, v) for k, v in Occupied_Timeline.items()) + "}")
+    Logger.debug(_Library.LazyMessage(_Library.format_dict, 'Occupied_Timeline: \n', Occupied_Timeline))
     Logger.debug('')
     
     Logger.info('')
@@ -108,7 +113,7 @@ def Timeline_generator():
         Occupied_Timeline, Mode_comment = Mode_function(Occupied_Timeline)
         
         Logger.debug('')
-        Logger.debug('Post-'+scimod+' Occupied_Timeline: \n'+"{" + "\n".join("        {}: {}".format(k, v) for k, v in Occupied_Timeline.items()) + "}")
+        Logger.debug(_Library.LazyMessage(_Library.format_dict, 'Post-'+scimod+' Occupied_Timeline: \n', Occupied_Timeline))
         Logger.debug('')
         
         
@@ -135,7 +140,7 @@ def Timeline_generator():
             
             "Append mode and dates and comment to an unchronological Science Mode Timeline"
             SCIMOD_Timeline_unchronological.append((Occupied_Timeline[scimod][scheduled_instances[scimod]-1][0], Occupied_Timeline[scimod][scheduled_instances[scimod]-1][1],scimod, Mode_comment))
-            Logger.debug('Entry number '+str(len(SCIMOD_Timeline_unchronological))+' in unchronological Science Mode list: '+str(SCIMOD_Timeline_unchronological[-1]))
+            Logger.debug('Entry number %s in unchronological Science Mode list: %s', len(SCIMOD_Timeline_unchronological), SCIMOD_Timeline_unchronological[-1])
             Logger.debug('')
         
     "###########################################################################################################"
@@ -143,6 +148,7 @@ def Timeline_generator():
     
     
     Logger.info('Looping sequence of modes priority list complete')
+    _Library.Satellite_cache.log_statistics(Logger)
     Logger.info('')
     
     
@@ -182,12 +188,12 @@ def Timeline_generator():
     
     Occupied_Timeline, Mode_comment = Mode1_2_5(Occupied_Timeline)
     Logger.debug('')
-    Logger.debug('Post-'+OpSciMode+' Occupied_Timeline: \n'+"{" + "\n".join("        {}: {}".format(k, v) for k, v in Occupied_Timeline.items()) + "}")
+    Logger.debug(_Library.LazyMessage(_Library.format_dict, 'Post-'+OpSciMode+' Occupied_Timeline: \n', Occupied_Timeline))
     Logger.debug('')
     
     Logger.debug(OpSciMode+' getting added to unchronological timeline')
     for x in range(len(Occupied_Timeline[OpSciMode])):
-        Logger.debug('Appended to timeline: '+str((Occupied_Timeline[OpSciMode][x][0], Occupied_Timeline[OpSciMode][x][1],OpSciMode, Mode_comment)))
+        Logger.debug('Appended to timeline: %s', (Occupied_Timeline[OpSciMode][x][0], Occupied_Timeline[OpSciMode][x][1],OpSciMode, Mode_comment))
         SCIMOD_Timeline_unchronological.append((Occupied_Timeline[OpSciMode][x][0], Occupied_Timeline[OpSciMode][x][1],OpSciMode, Mode_comment))
         
     
@@ -214,7 +220,7 @@ def Timeline_generator():
     "Add entries to the Science Mode Timeline list in chronological order. The entries in the list contains Mode name, start date, endDate, settings and comment"
     for x in SCIMOD_Timeline_unchronological:
         
-        Logger.debug(str(t+1)+' Timeline entry: '+str(x))
+        Logger.debug('%s Timeline entry: %s', t+1, x)
         
         
         Logger.debug('Get the parameters for XML-gen from OPT_Config_File and add them to Science Mode timeline')
@@ -244,7 +250,7 @@ def Timeline_generator():
         #SCIMOD_Timeline.append([ x[2],str(x[0]), str(x[1]),{},x[3] ])
         
         SCIMOD_Timeline.append([ x[2],str(x[0]), str(x[1]),Config_File,x[3] ])
-        Logger.debug(str(t+2)+' entry in Science Mode list: '+str(SCIMOD_Timeline[t+1]))
+        Logger.debug('%s entry in Science Mode list: %s', t+2, SCIMOD_Timeline[t+1])
         Logger.debug('')
         t= t+1
     
@@ -7,12 +7,11 @@ Part of Timeline_generator, as part of OPT.
 
 import logging, sys, csv, os, importlib
 import ephem
-from pylab import array, ceil, cos, sin, cross, dot, zeros, norm, pi, arccos, floor
-from astroquery.vizier import Vizier
-from skyfield import api
+from numpy import array, ceil, cos, sin, cross, dot, zeros, pi, arccos, floor
+from numpy.linalg import norm
 
 
-from OPT._Library import deg2HMS, Satellite_Simulator
+from OPT._Library import deg2HMS, Satellite_Simulator_Buffer, EarthSatellite_from_TLE, OccupiedTimeline, log_debug, log_enabled
 from OPT import _Globals
 from .Mode12X import UserProvidedDateScheduler
 
@@ -124,6 +123,7 @@ def Mode120_date_calculator():
     
     
     "Get relevant stars"
+    from astroquery.vizier import Vizier
     result = Vizier(columns=['all'], row_limit=3000).query_constraints(catalog='I/239/hip_main',Vmag=Mode120_settings['Vmag'])
     star_cat = result[0]
     ROWS = star_cat[0][:].count()
@@ -197,7 +197,9 @@ def Mode120_date_calculator():
     
     
     
-    MATS_skyfield = api.EarthSatellite(TLE[0], TLE[1])
+    MATS_skyfield = EarthSatellite_from_TLE(TLE, Timeline_settings, Logger)
+    "Simulates MATS in batches along the grid of timesteps"
+    Satellite_Simulator = Satellite_Simulator_Buffer( MATS_skyfield, Timeline_settings, pointing_altitude, timestep )
     
     t = 0
     
@@ -215,8 +217,7 @@ def Mode120_date_calculator():
         else:
             LogFlag = False
         
-        Satellite_dict = Satellite_Simulator( 
-                MATS_skyfield, current_time, Timeline_settings, pointing_altitude, LogFlag, Logger )
+        Satellite_dict = Satellite_Simulator( current_time, LogFlag, Logger )
         
         MATS_P[t] = Satellite_dict['OrbitalPeriod [s]']
         lat_MATS[t] =  Satellite_dict['Latitude [degrees]']
@@ -282,7 +283,7 @@ def Mode120_date_calculator():
                     if( ( abs(angle_between_orbital_plane_and_star[t][x]) > H_offset+(duration)/(365*24*3600)*360 and yaw_correction == False ) or 
                        ( abs(angle_between_orbital_plane_and_star[t][x]) > H_offset + abs(Timeline_settings['yaw_amplitude']) + (duration)/(365*24*3600)*360 and yaw_correction == True )):
                         
-                        Logger.debug('Skip star: '+stars[x].name+', with angle_between_orbital_plane_and_star of: '+str(angle_between_orbital_plane_and_star[t][x])+' degrees')
+                        log_debug(Logger, 'Mode120 skipped stars', 'Skip star: %s, with angle_between_orbital_plane_and_star of: %s degrees', stars[x].name, angle_between_orbital_plane_and_star[t][x])
                         skip_star_list.append(stars[x].name)
                         continue
                 
@@ -291,7 +292,7 @@ def Mode120_date_calculator():
                 if( V_offset - AngularChangePerTimestep  <= stars_vert_offset[t][x] <= V_offset and stars_vert_offset[t-1][x] > V_offset and abs(stars_hori_offset[t][x]) < H_offset):
                     
                     if( t % log_timestep == 0):
-                        Logger.debug('Star: '+stars[x].name+', with H-offset: '+str(stars_hori_offset[t][x])+' V-offset: '+str(stars_vert_offset[t][x])+' in degrees is available')
+                        log_debug(Logger, 'Mode120 available stars', 'Star: %s, with H-offset: %s V-offset: %s in degrees is available', stars[x].name, stars_hori_offset[t][x], stars_vert_offset[t][x])
                     
                     "Add the spotted star to the exception list and timestamp it"
                     spotted_star_name.append(stars[x].name)
@@ -363,8 +364,9 @@ def Mode120_date_calculator():
                 sys.exit()
     
     Logger.debug('Visible star list to be filtered:')
-    for x in range(len(SpottedStarList)):
-        Logger.debug(str(SpottedStarList[x]))
+    if( log_enabled(Logger) ):
+        for x in range(len(SpottedStarList)):
+            Logger.debug('%s', SpottedStarList[x])
     Logger.debug('')
     
     Logger.debug('Exit '+str(__name__))
@@ -455,6 +457,10 @@ def Mode120_date_select(Occupied_Timeline, SpottedStarList):
     Logger.debug('star_H_offset_sorted: '+str(star_H_offset_sorted))
     
     
+    "Index the scheduled dates to quickly find collisions"
+    if not isinstance(Occupied_Timeline, OccupiedTimeline):
+        Occupied_Timeline = OccupiedTimeline(Occupied_Timeline)
+    
     restart = True
     iterations = 0
     "Selects date based on min H-offset, if occupied, select date for next min H-offset"
@@ -486,19 +492,11 @@ def Mode120_date_select(Occupied_Timeline, SpottedStarList):
             continue
         
         "Extract Occupied dates and if they clash, restart loop and select new date"
-        for busy_dates in Occupied_Timeline.values():
-            if( busy_dates == []):
-                continue
-            else:
-                "Extract the start and end date of each instance of a scheduled mode"
-                for busy_date in busy_dates:
-                    if( busy_date[0] <= StartDate <= busy_date[1] or 
-                           busy_date[0] <= endDate <= busy_date[1] or
-                       (StartDate < busy_date[0] and endDate > busy_date[1])):
-                        
-                        iterations = iterations + 1
-                        restart = True
-                        break
+        colliding_modes = Occupied_Timeline.colliding_keys(StartDate, endDate, Inclusive=True)
+        if( colliding_modes != [] ):
+            
+            iterations = iterations + len(colliding_modes)
+            restart = True
     
     
     
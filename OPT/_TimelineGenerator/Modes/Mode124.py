@@ -7,11 +7,11 @@ Part of Timeline_generator, as part of OPT.
 
 
 import ephem, sys, logging, importlib
-from pylab import cross, ceil, dot, zeros, sqrt, norm, pi, arccos, arctan
-from skyfield import api
+from numpy import cross, ceil, dot, zeros, sqrt, pi, arccos, arctan
+from numpy.linalg import norm
 
-from OPT._Library import Satellite_Simulator, scheduler
-from OPT import _Globals
+from OPT._Library import Satellite_Simulator_Buffer, EarthSatellite_from_TLE, ephemDate_to_skyfield, scheduler, OccupiedTimeline, Log_rate_limiter, log_enabled
+from OPT import _Globals, _Ephemeris
 from .Mode12X import UserProvidedDateScheduler
 
 OPT_Config_File = importlib.import_module(_Globals.Config_File)
@@ -151,12 +151,13 @@ def date_calculator():
     
     
     
-    ts = api.load.timescale(builtin=True)
-    MATS_skyfield = api.EarthSatellite(TLE[0], TLE[1])
+    MATS_skyfield = EarthSatellite_from_TLE(TLE, Timeline_settings, Logger)
+    "Simulates MATS in batches along the grid of timesteps"
+    Satellite_Simulator = Satellite_Simulator_Buffer( MATS_skyfield, Timeline_settings, pointing_altitude, timestep )
     
-    planets = api.load('de421.bsp')
-    Moon = planets['Moon']
-    Earth = planets['Earth']
+    "Calculate the apparent position of the Moon for the whole simulation once"
+    Moon_ephemeris = _Ephemeris.Moon_ephemeris()
+    Moon_ephemeris.precompute( ephemDate_to_skyfield( [initial_time, initial_time+ephem.second*duration] ) )
     
     t=0
     
@@ -174,8 +175,7 @@ def date_calculator():
         else:
             LogFlag = False
         
-        Satellite_dict = Satellite_Simulator( 
-                MATS_skyfield, current_time, Timeline_settings, pointing_altitude, LogFlag, Logger )
+        Satellite_dict = Satellite_Simulator( current_time, LogFlag, Logger )
         
         r_MATS[t] = Satellite_dict['Position [km]']
         MATS_P[t] = Satellite_dict['OrbitalPeriod [s]']
@@ -197,18 +197,9 @@ def date_calculator():
         
         ############# End of Calculations of orbital and pointing vectors #####
         
-        current_time_datetime = ephem.Date(current_time).datetime()
-        year = current_time_datetime.year
-        month = current_time_datetime.month
-        day = current_time_datetime.day
-        hour = current_time_datetime.hour
-        minute = current_time_datetime.minute
-        second = current_time_datetime.second + current_time_datetime.microsecond/1000000
+        current_time_skyfield = ephemDate_to_skyfield(current_time)
         
-        current_time_skyfield = ts.utc(year, month, day, hour, minute, second)
-        
-        Moon_apparent_from_Earth = Earth.at(current_time_skyfield).observe(Moon).apparent()
-        r_Moon[t,0:3] = Moon_apparent_from_Earth.position.km
+        r_Moon[t,0:3] = Moon_ephemeris.position(current_time_skyfield)
         
         r_Moon_unit_vector[t,0:3] = r_Moon[t,0:3]/norm(r_Moon[t,0:3])
         
@@ -246,10 +237,10 @@ def date_calculator():
         angle_between_orbital_plane_and_moon[t] = arccos( dot(r_MATS_2_Moon_norm[t], Moon_r_orbital_plane[t]) / norm(Moon_r_orbital_plane[t])) /pi*180
         
         
-        if( t*timestep % log_timestep == 0 or t == 1 ):
-            Logger.debug('angle_between_orbital_plane_and_moon [degrees]: '+str(angle_between_orbital_plane_and_moon[t]))
-            Logger.debug('Moon_vert_offset [degrees]: '+str(Moon_vert_offset[t]))
-            Logger.debug('Moon_hori_offset [degrees]: '+str(Moon_hori_offset[t]))
+        if( (t*timestep % log_timestep == 0 or t == 1) and log_enabled(Logger) and Log_rate_limiter('Mode124 Moon offsets') ):
+            Logger.debug('angle_between_orbital_plane_and_moon [degrees]: %s', angle_between_orbital_plane_and_moon[t])
+            Logger.debug('Moon_vert_offset [degrees]: %s', Moon_vert_offset[t])
+            Logger.debug('Moon_hori_offset [degrees]: %s', Moon_hori_offset[t])
             
             
         
@@ -259,31 +250,32 @@ def date_calculator():
             "Check that the Moon is entering at V-offset degrees and within the H-offset angle"
             if( Moon_vert_offset[t] <= V_offset and Moon_vert_offset[t-1] > V_offset and abs(Moon_hori_offset[t]) < H_offset):
                 
-                Logger.debug('')
-                Logger.debug('!!!!!!!!Moon available!!!!!!!!!!')
-                Logger.debug('t (loop iteration number): '+str(t))
-                Logger.debug('Current time: '+str(current_time))
-                Logger.debug('Orbital Period in s: '+str(MATS_P[t]))
-                Logger.debug('Vector to MATS [km]: '+str(r_MATS[t,0:3]))
-                Logger.debug('Latitude in radians: '+str(lat_MATS[t]))
-                Logger.debug('Longitude in radians: '+str(long_MATS[t]))
-                
-                if( yaw_correction == True):
-                    Logger.debug('ascending_node: '+str(ascending_node))
-                    Logger.debug('arg_of_lat [degrees]: '+str(arg_of_lat))
-                    Logger.debug('yaw_offset_angle [degrees]: '+str(yaw_offset_angle))
-                
-                
-                
-                Logger.debug('angle_between_orbital_plane_and_moon [degrees]: '+str(angle_between_orbital_plane_and_moon[t]))
-                Logger.debug('Moon_vert_offset [degrees]: '+str(Moon_vert_offset[t]))
-                Logger.debug('Moon_hori_offset [degrees]: '+str(Moon_hori_offset[t]))
-                Logger.debug('normal_orbit: '+str(-negative_normal_orbit[t,0:3]))
-                Logger.debug('r_V_offset_normal: '+str(r_V_offset_normal[t,0:3]))
-                Logger.debug('r_H_offset_normal: '+str(r_H_offset_normal[t,0:3]))
-                Logger.debug('optical_axis: '+str(optical_axis[t,0:3]))
-                
-                Logger.debug('')
+                if( log_enabled(Logger) ):
+                    Logger.debug('')
+                    Logger.debug('!!!!!!!!Moon available!!!!!!!!!!')
+                    Logger.debug('t (loop iteration number): %s', t)
+                    Logger.debug('Current time: %s', current_time)
+                    Logger.debug('Orbital Period in s: %s', MATS_P[t])
+                    Logger.debug('Vector to MATS [km]: %s', r_MATS[t,0:3])
+                    Logger.debug('Latitude in radians: %s', lat_MATS[t])
+                    Logger.debug('Longitude in radians: %s', long_MATS[t])
+                    
+                    if( yaw_correction == True):
+                        Logger.debug('ascending_node: %s', ascending_node)
+                        Logger.debug('arg_of_lat [degrees]: %s', arg_of_lat)
+                        Logger.debug('yaw_offset_angle [degrees]: %s', yaw_offset_angle)
+                    
+                    
+                    
+                    Logger.debug('angle_between_orbital_plane_and_moon [degrees]: %s', angle_between_orbital_plane_and_moon[t])
+                    Logger.debug('Moon_vert_offset [degrees]: %s', Moon_vert_offset[t])
+                    Logger.debug('Moon_hori_offset [degrees]: %s', Moon_hori_offset[t])
+                    Logger.debug('normal_orbit: %s', -negative_normal_orbit[t,0:3])
+                    Logger.debug('r_V_offset_normal: %s', r_V_offset_normal[t,0:3])
+                    Logger.debug('r_H_offset_normal: %s', r_H_offset_normal[t,0:3])
+                    Logger.debug('optical_axis: %s', optical_axis[t,0:3])
+                    
+                    Logger.debug('')
                 
                 
                 SpottedMoonList.append({ 'Date': str(current_time), 'V-offset': Moon_vert_offset[t], 'H-offset': Moon_hori_offset[t], 
@@ -369,6 +361,10 @@ def date_select(Occupied_Timeline, SpottedMoonList):
     Moon_H_offset_sorted.sort()
     
     
+    "Index the scheduled dates to quickly find collisions"
+    if not isinstance(Occupied_Timeline, OccupiedTimeline):
+        Occupied_Timeline = OccupiedTimeline(Occupied_Timeline)
+    
     restart = True
     iterations = 0
     "Selects date based on min H-offset, if occupied, select date for next min H-offset"
@@ -401,20 +397,11 @@ def date_select(Occupied_Timeline, SpottedMoonList):
             continue
         
         "Extract Occupied dates and if they clash, restart loop and select new date"
-        for busy_dates in Occupied_Timeline.values():
-            if( busy_dates == []):
-                continue
-            else:
-                "Extract the start and end date of each instance of a scheduled mode"
-                for busy_date in busy_dates:
-                    
-                    if( busy_date[0] <= date <= busy_date[1] or 
-                           busy_date[0] <= endDate <= busy_date[1] or
-                       (date < busy_date[0] and endDate > busy_date[1])):
-                        
-                        iterations = iterations + 1
-                        restart = True
-                        break
+        colliding_modes = Occupied_Timeline.colliding_keys(date, endDate, Inclusive=True)
+        if( colliding_modes != [] ):
+            
+            iterations = iterations + len(colliding_modes)
+            restart = True
         
     comment = ('V-offset: '+str(round(Moon_V_offset[x][0],2))+', H-offset: '+str(round(Moon_H_offset[x][0],2))+', Times date changed: '+str(iterations)+
                                       ', MATS (long,lat) in degrees = ('+str(round(MATS_long[x],2))+', '+str(round(MATS_lat[x],2))+'), Moon Dec (J2000) [degrees]: '+
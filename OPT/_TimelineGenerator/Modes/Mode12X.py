@@ -5,11 +5,10 @@
 
 import logging, sys, importlib
 import ephem
-from pylab import array, ceil, cos, sin, dot, zeros, norm, pi, arccos, floor
-from astroquery.vizier import Vizier
-from skyfield import api
+from numpy import array, ceil, cos, sin, dot, zeros, pi, arccos, floor
+from numpy.linalg import norm
 
-from OPT._Library import Satellite_Simulator, deg2HMS, scheduler
+from OPT._Library import Satellite_Simulator_Buffer, EarthSatellite_from_TLE, deg2HMS, scheduler, OccupiedTimeline
 from OPT import _Globals, _MATS_coordinates
 
 OPT_Config_File = importlib.import_module(_Globals.Config_File)
@@ -123,6 +122,7 @@ def date_calculator(Settings):
         
         
         "Get relevant stars"
+        from astroquery.vizier import Vizier
         result = Vizier(columns=['all'], row_limit=3000).query_constraints(catalog='I/239/hip_main',Vmag=Settings['Vmag'])
         star_cat = result[0]
         ROWS = star_cat[0][:].count()
@@ -191,7 +191,9 @@ def date_calculator(Settings):
         TLE = OPT_Config_File.getTLE()
         Logger.debug('TLE used: '+TLE[0]+TLE[1])
         
-        MATS_skyfield = api.EarthSatellite(TLE[0], TLE[1])
+        MATS_skyfield = EarthSatellite_from_TLE(TLE, Timeline_settings, Logger)
+        "Simulates MATS in batches along the grid of timesteps"
+        Satellite_Simulator = Satellite_Simulator_Buffer( MATS_skyfield, Timeline_settings, pointing_altitude, timestep )
         
         "Loop counter"
         t=0
@@ -215,8 +217,7 @@ def date_calculator(Settings):
             else:
                 LogFlag = False
         
-            Satellite_dict = Satellite_Simulator( 
-                        MATS_skyfield, current_time, Timeline_settings, pointing_altitude, LogFlag, Logger )
+            Satellite_dict = Satellite_Simulator( current_time, LogFlag, Logger )
             
             MATS_P[t] = Satellite_dict['OrbitalPeriod [s]']
             lat_MATS[t] =  Satellite_dict['Latitude [degrees]']
@@ -358,6 +359,10 @@ def date_select(Occupied_Timeline, date_magnitude_array, Settings):
     
     loop_counter = 0
     
+    "Index the scheduled dates to quickly find collisions"
+    if not isinstance(Occupied_Timeline, OccupiedTimeline):
+        Occupied_Timeline = OccupiedTimeline(Occupied_Timeline)
+    
     "Loop for maximum magnitude visible until the date chosen is not occupied"
     while(restart == True):
         
@@ -379,24 +384,16 @@ def date_select(Occupied_Timeline, date_magnitude_array, Settings):
         date = ephem.Date(ephem.Date(date_max_mag)-ephem.second*(Settings['freeze_start']))
         endDate = ephem.Date(date+ephem.second* (Settings['freeze_start'] + Settings['freeze_duration'] + Timeline_settings['mode_separation']) )
         
-        "Extract the start and end date of each scheduled mode"
-        for busy_dates in Occupied_Timeline.values():
-            if( busy_dates == []):
-                continue
-            else:
-                "Extract the start and end date of each instance of a scheduled mode"
-                for busy_date in busy_dates:
-                    
-                    "If the planned date collides with any already scheduled ones -> post-pone and restart loop"
-                    if( busy_date[0] <= date < busy_date[1] or 
-                           busy_date[0] < endDate <= busy_date[1] or
-                           (date < busy_date[0] and endDate > busy_date[1])):
-                        
-                        restart = True
-                        "Set the current maximum magnitude arbitrary small to allow a new maximum magnitude date to be chosen in next loop"
-                        date_magnitude_array[index_max_mag,1] = arbitraryLowNumber
-                        loop_counter = loop_counter +1
-                        break
+        "Find the scheduled modes which collide with the planned date"
+        colliding_modes = Occupied_Timeline.colliding_keys(date, endDate)
+        
+        "If the planned date collides with any already scheduled ones -> post-pone and restart loop"
+        if( colliding_modes != [] ):
+            
+            restart = True
+            "Set the current maximum magnitude arbitrary small to allow a new maximum magnitude date to be chosen in next loop"
+            date_magnitude_array[index_max_mag,1] = arbitraryLowNumber
+            loop_counter = loop_counter + len(colliding_modes)
                 
         
     comment = 'Number of times date changed: ' + str(loop_counter)+', faintest magnitude visible (100 equals no stars visible): '+str(value_max_mag)+', Dec (J2000): '+str(dec_max_mag)+', RA (J2000): '+str(RA_max_mag)
@@ -11,7 +11,8 @@ function *Scheduling_priority* in the *Configuration File*. \n
 
 For each mode/CMD, one at a time, an appropriate date is calculated, or
 a predetermined date is already set in the *Configuration File* (or could also be at the start of the timeline if no specific date was given). A dictionary (Occupied_Timeline) 
-keeps track of the planned runtime of all Modes/CMDs, this to prevent colliding scheduling. \n
+keeps track of the planned runtime of all Modes/CMDs, this to prevent colliding scheduling. 
+The dictionary is a *_Library.OccupiedTimeline*, which also keeps all scheduled times sorted by date to quickly find collisions with a planned date. \n
 
 Mode1,2,5 are known as *Operational Science Modes*.
 These modes will fill out time left available after the rest of the Modes, set in *Scheduling_priority*, have been scheduled. 
@@ -29,7 +30,8 @@ To add your own Mode to be scheduled using *Timeline_gen* you need to follow the
  - It is recommended (but not necessary) to also give the new Mode its own "Configuration function" inside the *_ConfigFile*. This function will hold tuneable settings for the Mode, such as the duration.
  
  The function, inside your new module, has as input the *Occupied_Timeline* variable, which is a dictionary with keys equal to the names of scheduled modes. 
- Each key then contain a list of duples. Each element in each duple is a *ephem.Date* object, representing the scheduled starting date and end date respectively. \n
+ Each key then contain a list of duples. Each element in each duple is a *ephem.Date* object, representing the scheduled starting date and end date respectively. 
+ Collisions with already scheduled Modes/CMDs are found with *Occupied_Timeline.colliding_keys* or postponed until time is available with *_Library.scheduler*. \n
  
  The output of the function is a tuple where the first element is the *Occupied_Timeline* dictionary again. You can see in the code of your new module that the *Occupied_Timeline* variable is updated with a newly scheduled start date and end date.
  
@@ -17,6 +17,7 @@ from pylab import (
     norm,
     transpose,
     zeros,
+    arange,
     sqrt,
     floor,
     figure,
@@ -27,12 +28,20 @@ from pylab import (
     title,
     legend,
     date2num,
+    einsum,
 )
-from skyfield.api import load, EarthSatellite
 import ephem, logging, importlib, h5py, json, csv
 import datetime, os, pickle, astropy.time, sys, ntpath
 
-from OPT import _Library, _MATS_coordinates, _Globals
+from OPT import (
+    _Library,
+    _MATS_coordinates,
+    _Globals,
+    _OrbitProduct,
+    _MATS_attitude,
+    _IERS,
+)
+from OPT._Timeline_Plotter import OHB
 
 
 OPT_Config_File = importlib.import_module(_Globals.Config_File)
@@ -41,7 +50,9 @@ Logger = logging.getLogger(OPT_Config_File.Logger_name())
 rcParams["figure.max_open_warning"] = 30
 
 
-def Timeline_Plotter(Science_Mode_Path, OHB_H5_Path, STK_CSV_FILE, Timestep=10):
+def Timeline_Plotter(
+    Science_Mode_Path, OHB_H5_Path, STK_CSV_FILE, Timestep=10, FastTransformations=False
+):
     """Core function of the Timeline_Plotter.
     
     Goes through the *Science Mode Timeline*, one mode at a time.
@@ -51,6 +62,7 @@ def Timeline_Plotter(Science_Mode_Path, OHB_H5_Path, STK_CSV_FILE, Timestep=10):
         OHB_H5_Path (str): Path to the .h5 file containing position, time, and attitude data.
         STK_CSV_PATH (str): Path to the .csv file containing position (column 1-3), velocity (column 4-6), and time (column 7), generated in STK. Position and velocity data is assumed to be in km and in ICRF.
         Timestep (int): The timestep used for the Science Mode Timeline simulation and if possible when accessing OHB data. Needs to be evenly dividable with the h5-data timestep (or the h5-data timestep needs to be a even multiple of Timestep) to allow synchronized direct comparison. The h5 state data should have a timestep of 10s according to Ground Segment ICD document.
+        FastTransformations (bool): If True, transformations between ECI and ECEF use the approximation of *_MATS_coordinates.GCRS2ITRS_matrices_fast*, which is accurate to within 10 m.
         
     Returns:
         (tuple): Tuple containing:
@@ -62,13 +74,17 @@ def Timeline_Plotter(Science_Mode_Path, OHB_H5_Path, STK_CSV_FILE, Timestep=10):
     """
 
     ############# Set up Logger #################################
-    _Library.SetupLogger(OPT_Config_File.Logger_name())
+    _Library.SetupLogger(
+        OPT_Config_File.Logger_name(),
+        _Library.ConfigFile_Logger_settings(OPT_Config_File),
+    )
     Logger = logging.getLogger(OPT_Config_File.Logger_name())
 
     Version = OPT_Config_File.Version()
     Logger.info(
         "Configuration File used: " + _Globals.Config_File + ", Version: " + Version
     )
+    _IERS.log_IERS_status(Logger)
 
     "Get Timeline settings and TLE from Configuration File. Only used if not given in the Science Mode Timeline"
     Timeline_settings = OPT_Config_File.Timeline_settings()
@@ -215,6 +231,9 @@ def Timeline_Plotter(Science_Mode_Path, OHB_H5_Path, STK_CSV_FILE, Timestep=10):
                 3
             ]  # Use Timeline_settings given in the Timeline instead of from the Configuration File
             TLE = ScienceMode[x][4]
+
+            "Reuse the orbit product written by Timeline_gen, if it exists"
+            _OrbitProduct.load_OrbitProduct(TLE, Timeline_settings, Logger)
             continue
 
         Data_MATS, Data_LP, Time = Simulator(
@@ -227,9 +246,11 @@ def Timeline_Plotter(Science_Mode_Path, OHB_H5_Path, STK_CSV_FILE, Timestep=10):
             Data_LP=Data_LP,
             Time=Time,
             OHB_StartTime=OHB_StartTime,
+            FastTransformations=FastTransformations,
         )
 
     Logger.info("End of Simulation")
+    _Library.Satellite_cache.log_statistics(Logger)
 
     "Convert the data from python lists into Numpy arrays"
     "Allows easier data manipulation"
@@ -268,6 +289,14 @@ def Timeline_Plotter(Science_Mode_Path, OHB_H5_Path, STK_CSV_FILE, Timestep=10):
     Data_LP["r_LP [m]"] = array(Data_LP["r_LP [m]"])
     Data_LP["r_LP_ECEF [m]"] = array(Data_LP["r_LP_ECEF [m]"])
 
+    "Solar zenith angle at the LP, for all timesteps at once"
+    Data_LP["SZA_LP [degrees]"] = _MATS_coordinates.SZAfromlla_array(
+        Data_LP["lat_LP [degrees]"],
+        Data_LP["long_LP [degrees]"],
+        Data_LP["alt_LP [m]"],
+        Time,
+    )
+
     Time_OHB = Plotter(
         Data_MATS,
         Data_LP,
@@ -279,6 +308,7 @@ def Timeline_Plotter(Science_Mode_Path, OHB_H5_Path, STK_CSV_FILE, Timestep=10):
         OHB_H5_Path,
         STK_CSV_FILE,
         Science_Mode_Path,
+        FastTransformations,
     )
 
     return Data_MATS, Data_LP, Time, Time_OHB
@@ -294,6 +324,7 @@ def Simulator(
     Data_LP,
     Time,
     OHB_StartTime,
+    FastTransformations=False,
 ):
     """Subfunction, Simulates the position and attitude of MATS depending on the Mode given in *ScienceMode*.
     
@@ -309,6 +340,7 @@ def Simulator(
         Data_LP (dict of lists): Dictionary containing lists of simulated data of LP.
         Time (list): List containing timestamps (utc) of the simulated data in Data_MATS and Data_LP.
         OHB_StartTime (:obj:`ephem.Date`): Date and time of the first OHB data to be plotted. Used here to synchronize timestamps between Timeline Simulation datapoints and OHB datapoints.
+        FastTransformations (bool): If True, use the approximate transformations between ECI and ECEF of *_MATS_coordinates.GCRS2ITRS_matrices_fast*.
         
     Returns:
         (tuple): Tuple containing:
@@ -481,8 +513,6 @@ def Simulator(
     yaw_offset_angle = zeros((timesteps, 1))
     pitch_MATS = zeros((timesteps, 1))
     roll_MATS = zeros((timesteps, 1))
-    Euler_angles = zeros((timesteps, 3))
-    z_SLOF = zeros((timesteps, 3))
 
     RA_optical_axis = zeros((timesteps, 1))
     Dec_optical_axis = zeros((timesteps, 1))
@@ -493,15 +523,14 @@ def Simulator(
     normal_orbit = zeros((timesteps, 3))
     normal_orbit_ECEF = zeros((timesteps, 3))
     current_time = zeros((timesteps, 1))
+    Calculate_LP = zeros(timesteps, dtype=bool)
 
-    MATS_skyfield = EarthSatellite(TLE[0], TLE[1])
+    MATS_skyfield = _Library.EarthSatellite_from_TLE(TLE, Timeline_settings, Logger)
 
-    ###################################################################################
-    "Start of Simulation"
+    "Calculate the pointing altitude for each timestep"
+    pointing_altitudes = zeros(timesteps)
     for t in range(timesteps):
 
-        t = t
-
         if Simulator_Select == "Mode100":
             "Increment the pointing altitude as defined by Mode100"
             if (
@@ -545,6 +574,40 @@ def Simulator(
             "Looking at pointing_altitude"
             pass
 
+        pointing_altitudes[t] = pointing_altitude
+
+    "Run the satellite simulation for all timesteps at once"
+    Satellite_dicts = _Library.Satellite_Simulator_Batch(
+        MATS_skyfield,
+        Timestep * arange(timesteps),
+        Timeline_settings,
+        pointing_altitudes / 1000,
+        StartDate=Mode_start_date,
+    )
+
+    "Read the coordinate transformations from the orbit product for the timesteps it covers"
+    OrbitProduct_data, OrbitProduct_covered = _OrbitProduct.OrbitProduct_lookup(
+        MATS_skyfield,
+        Mode_start_date + ephem.second * Timestep * arange(timesteps),
+        Timeline_settings,
+        pointing_altitudes / 1000,
+    )
+
+    "Rotation matrices from ECI to ECEF for all timesteps, calculated at once and reused for all vectors"
+    GCRS2ITRS = _MATS_coordinates.GCRS2ITRS_matrices(
+        [
+            ephem.Date(Mode_start_date + ephem.second * (Timestep * t)).datetime()
+            for t in range(timesteps)
+        ],
+        Fast=FastTransformations,
+    )
+
+    ###################################################################################
+    "Start of Simulation"
+    for t in range(timesteps):
+
+        pointing_altitude = pointing_altitudes[t]
+
         "Increment Time"
         current_time = ephem.Date(Mode_start_date + ephem.second * (Timestep * t))
         current_time_datetime = ephem.Date(current_time).datetime()
@@ -555,15 +618,10 @@ def Simulator(
         else:
             LogFlag = False
 
-        "Run the satellite simulation for the current time"
-        Satellite_dict = _Library.Satellite_Simulator(
-            MATS_skyfield,
-            current_time,
-            Timeline_settings,
-            pointing_altitude / 1000,
-            LogFlag,
-            Logger,
-        )
+        "Extract the satellite simulation for the current time"
+        Satellite_dict = {key: value[t] for key, value in Satellite_dicts.items()}
+        if LogFlag == True:
+            _Library.Satellite_Simulator_Logger(Satellite_dict, current_time, Logger)
 
         "Save results"
         r_MATS[t] = Satellite_dict["Position [km]"]
@@ -585,68 +643,27 @@ def Simulator(
         v_MATS_unit_vector[t, 0:3] = v_MATS[t, 0:3] / norm(v_MATS[t, 0:3])
         r_MATS_unit_vector[t, 0:3] = r_MATS[t, 0:3] / norm(r_MATS[t, 0:3])
 
-        "Coordinate transformations and calculations"
-        (
-            r_MATS_ECEF[t, 0],
-            r_MATS_ECEF[t, 1],
-            r_MATS_ECEF[t, 2],
-        ) = _MATS_coordinates.eci2ecef(
-            r_MATS[t, 0] * 1000,
-            r_MATS[t, 1] * 1000,
-            r_MATS[t, 2] * 1000,
-            current_time_datetime,
-        )
-
-        (
-            optical_axis_ECEF[t, 0],
-            optical_axis_ECEF[t, 1],
-            optical_axis_ECEF[t, 2],
-        ) = _MATS_coordinates.eci2ecef(
-            optical_axis[t, 0],
-            optical_axis[t, 1],
-            optical_axis[t, 2],
-            current_time_datetime,
-        )
-
-        (
-            r_LP_ECEF[t, 0],
-            r_LP_ECEF[t, 1],
-            r_LP_ECEF[t, 2],
-        ) = _MATS_coordinates.ecef2tanpoint(
-            r_MATS_ECEF[t][0],
-            r_MATS_ECEF[t][1],
-            r_MATS_ECEF[t][2],
-            optical_axis_ECEF[t, 0],
-            optical_axis_ECEF[t, 1],
-            optical_axis_ECEF[t, 2],
-        )
-
-        lat_LP[t], long_LP[t], alt_LP[t] = _MATS_coordinates.ECEF2lla(
-            r_LP_ECEF[t, 0], r_LP_ECEF[t, 1], r_LP_ECEF[t, 2]
-        )
-
-        r_LP[t, 0], r_LP[t, 1], r_LP[t, 2] = _MATS_coordinates.ecef2eci(
-            r_LP_ECEF[t, 0], r_LP_ECEF[t, 1], r_LP_ECEF[t, 2], current_time_datetime
-        )
+        if OrbitProduct_covered[t] == True:
+            "Coordinate transformations from the orbit product"
+            r_MATS_ECEF[t] = OrbitProduct_data["Position_ECEF [km]"][t] * 1000
+            v_MATS_ECEF[t] = OrbitProduct_data["Velocity_ECEF [km/s]"][t]
+            normal_orbit_ECEF[t] = OrbitProduct_data["OrbitNormal_ECEF"][t]
+            optical_axis_ECEF[t] = OrbitProduct_data["OpticalAxis_ECEF"][t]
+            r_LP_ECEF[t] = OrbitProduct_data["Position_LP_ECEF [km]"][t] * 1000
+            r_LP[t] = OrbitProduct_data["Position_LP [km]"][t] * 1000
+            lat_LP[t] = OrbitProduct_data["Latitude_LP [degrees]"][t]
+            long_LP[t] = OrbitProduct_data["Longitude_LP [degrees]"][t]
+            alt_LP[t] = OrbitProduct_data["Altitude_LP [km]"][t] * 1000
+        else:
+            "Coordinate transformations and calculations"
+            r_MATS_ECEF[t] = dot(GCRS2ITRS[t], r_MATS[t] * 1000)
+            optical_axis_ECEF[t] = dot(GCRS2ITRS[t], optical_axis[t])
 
-        (
-            v_MATS_ECEF[t, 0],
-            v_MATS_ECEF[t, 1],
-            v_MATS_ECEF[t, 2],
-        ) = _MATS_coordinates.eci2ecef(
-            v_MATS[t, 0], v_MATS[t, 1], v_MATS[t, 2], current_time_datetime
-        )
+            "The LP is calculated for all timesteps at once after the simulation"
+            Calculate_LP[t] = True
 
-        (
-            normal_orbit_ECEF[t, 0],
-            normal_orbit_ECEF[t, 1],
-            normal_orbit_ECEF[t, 2],
-        ) = _MATS_coordinates.eci2ecef(
-            normal_orbit[t, 0],
-            normal_orbit[t, 1],
-            normal_orbit[t, 2],
-            current_time_datetime,
-        )
+            v_MATS_ECEF[t] = dot(GCRS2ITRS[t], v_MATS[t])
+            normal_orbit_ECEF[t] = dot(GCRS2ITRS[t], normal_orbit[t])
 
         # orbangle_between_LP_MATS_array_dotproduct[t] = arccos( dot(r_MATS_unit_vector[t], r_LP[t]) / norm(r_LP[t]) ) / pi*180
 
@@ -685,40 +702,13 @@ def Simulator(
 
             "Maintain the same optical axis as the simulation progresses during the freeze"
             optical_axis[t, :] = optical_axis_Freeze
-            (
-                optical_axis_ECEF[t, 0],
-                optical_axis_ECEF[t, 1],
-                optical_axis_ECEF[t, 2],
-            ) = _MATS_coordinates.eci2ecef(
-                optical_axis[t, 0],
-                optical_axis[t, 1],
-                optical_axis[t, 2],
-                current_time_datetime,
-            )
+            optical_axis_ECEF[t] = dot(GCRS2ITRS[t], optical_axis[t])
 
             r_V_offset_normal[t, :] = r_V_offset_normal_Freeze
             r_H_offset_normal[t, :] = r_H_offset_normal_Freeze
 
-            (
-                r_LP_ECEF[t, 0],
-                r_LP_ECEF[t, 1],
-                r_LP_ECEF[t, 2],
-            ) = _MATS_coordinates.ecef2tanpoint(
-                r_MATS_ECEF[t][0],
-                r_MATS_ECEF[t][1],
-                r_MATS_ECEF[t][2],
-                optical_axis_ECEF[t, 0],
-                optical_axis_ECEF[t, 1],
-                optical_axis_ECEF[t, 2],
-            )
-
-            lat_LP[t], long_LP[t], alt_LP[t] = _MATS_coordinates.ECEF2lla(
-                r_LP_ECEF[t, 0], r_LP_ECEF[t, 1], r_LP_ECEF[t, 2]
-            )
-
-            r_LP[t, 0], r_LP[t, 1], r_LP[t, 2] = _MATS_coordinates.ecef2eci(
-                r_LP_ECEF[t, 0], r_LP_ECEF[t, 1], r_LP_ECEF[t, 2], current_time_datetime
-            )
+            "The LP is calculated for all timesteps at once after the simulation"
+            Calculate_LP[t] = True
 
             Dec_optical_axis[t] = (
                 arctan(
@@ -740,46 +730,6 @@ def Simulator(
             if optical_axis[t, 1] < 0:
                 RA_optical_axis[t] = 360 - RA_optical_axis[t]
 
-        "Define SLOF basis and convert ECI coordinates to SLOF"
-        z_SLOF = -r_MATS[t, :]
-        z_SLOF = z_SLOF / norm(z_SLOF)
-        y_SLOF = -normal_orbit[t, :]
-        y_SLOF = y_SLOF / norm(y_SLOF)
-        x_SLOF = v_MATS[t, :]
-        x_SLOF = x_SLOF / norm(x_SLOF)
-
-        "A change of basis matrix is calculated from the transpose of a matrix where the columns are the basis vectors"
-        dcm_SLOF_coordinate_system = array(
-            (
-                [x_SLOF[0], y_SLOF[0], z_SLOF[0]],
-                [x_SLOF[1], y_SLOF[1], z_SLOF[1]],
-                [x_SLOF[2], y_SLOF[2], z_SLOF[2]],
-            )
-        )
-        dcm_change_of_basis_ECI_to_SLOF = transpose(dcm_SLOF_coordinate_system)
-        r_change_of_basis_ECI_to_SLOF = R.from_dcm(dcm_change_of_basis_ECI_to_SLOF)
-
-        optical_axis_SLOF = r_change_of_basis_ECI_to_SLOF.apply(optical_axis[t, :])
-        r_V_offset_normal_SLOF = r_change_of_basis_ECI_to_SLOF.apply(
-            r_V_offset_normal[t, :]
-        )
-        r_H_offset_normal_SLOF = r_change_of_basis_ECI_to_SLOF.apply(
-            r_H_offset_normal[t, :]
-        )
-
-        "Find rotation and Euler angles by matching basis vectors of optical axis in SLOF (Spacecraft Local orbit Frame) to basis vectors of SBF (Spacecraft Body Frame) in SLOF"
-        basis_SBF = array(
-            ((optical_axis_SLOF), (r_V_offset_normal_SLOF), (r_H_offset_normal_SLOF))
-        )
-        basis_SLOF = array(((0, 0, -1), (0, 1, 0), (1, 0, 0)))
-        rotation, sensitivity_matrix = R.match_vectors(basis_SBF, basis_SLOF)
-
-        "The intrinsic (ZYZ) Euler angles which corresponds to rotating the Z-axis of the SLOF basis to the Spacecraft body frame -Z-axis (which correspond to the optical axis)"
-        Euler_angles[t, :] = rotation.as_euler("ZYZ", degrees=True)
-        yaw_offset_angle[t] = Euler_angles[t, 0]
-        pitch_MATS[t] = Euler_angles[t, 1]
-        roll_MATS[t] = Euler_angles[t, 2]
-
         "Save data"
         Data_MATS["ScienceMode"].append(ModeName)
         Data_MATS["ColorRGB"].append(Color)
@@ -801,21 +751,43 @@ def Simulator(
         Data_MATS["r_optical_axis"].append(optical_axis[t])
         Data_MATS["r_optical_axis_ECEF"].append(optical_axis_ECEF[t])
 
-        Data_MATS["yaw_MATS [degrees]"].append(yaw_offset_angle[t])
-        Data_MATS["pitch_MATS [degrees]"].append(pitch_MATS[t])
-        Data_MATS["roll_MATS [degrees]"].append(roll_MATS[t])
-
         Data_MATS["optical_axis_RA [degrees]"].append(RA_optical_axis[t])
         Data_MATS["optical_axis_Dec [degrees]"].append(Dec_optical_axis[t])
 
-        Data_LP["lat_LP [degrees]"].append(lat_LP[t])
-        Data_LP["long_LP [degrees]"].append(long_LP[t])
-        Data_LP["alt_LP [m]"].append(alt_LP[t])
+        Time.append(current_time_datetime)
+
+    "Calculate the LP of all timesteps not given by the orbit product at once"
+    if Calculate_LP.any():
+        r_LP_ECEF[Calculate_LP] = _MATS_coordinates.ecef2tanpoint_array(
+            r_MATS_ECEF[Calculate_LP], optical_axis_ECEF[Calculate_LP]
+        )
+        (
+            lat_LP[Calculate_LP, 0],
+            long_LP[Calculate_LP, 0],
+            alt_LP[Calculate_LP, 0],
+        ) = _MATS_coordinates.ECEF2geodetic(*transpose(r_LP_ECEF[Calculate_LP]))
+        r_LP[Calculate_LP] = einsum(
+            "nji,nj->ni", GCRS2ITRS[Calculate_LP], r_LP_ECEF[Calculate_LP]
+        )
+
+    Data_LP["lat_LP [degrees]"].extend(lat_LP)
+    Data_LP["long_LP [degrees]"].extend(long_LP)
+    Data_LP["alt_LP [m]"].extend(alt_LP)
 
-        Data_LP["r_LP [m]"].append(r_LP[t])
-        Data_LP["r_LP_ECEF [m]"].append(r_LP_ECEF[t])
+    Data_LP["r_LP [m]"].extend(r_LP)
+    Data_LP["r_LP_ECEF [m]"].extend(r_LP_ECEF)
 
-        Time.append(current_time_datetime)
+    "The intrinsic (ZYZ) Euler angles which corresponds to rotating the basis vectors of SLOF (Spacecraft Local orbit Frame) to the basis vectors of SBF (Spacecraft Body Frame), for all timesteps at once"
+    Euler_angles = _MATS_attitude.Euler_angles_SLOF(
+        r_MATS, v_MATS, normal_orbit, optical_axis, r_V_offset_normal, r_H_offset_normal
+    )
+    yaw_offset_angle[:, 0] = Euler_angles[:, 0]
+    pitch_MATS[:, 0] = Euler_angles[:, 1]
+    roll_MATS[:, 0] = Euler_angles[:, 2]
+
+    Data_MATS["yaw_MATS [degrees]"].extend(yaw_offset_angle)
+    Data_MATS["pitch_MATS [degrees]"].extend(pitch_MATS)
+    Data_MATS["roll_MATS [degrees]"].extend(roll_MATS)
 
     return Data_MATS, Data_LP, Time
 
@@ -831,6 +803,7 @@ def Plotter(
     OHB_H5_Path="",
     STK_CSV_FILE="",
     Science_Mode_Path="",
+    FastTransformations=False,
 ):
     """Subfunction, Extracts data and performs calculations and plots the position and attitude data of MATS and LP.
     
@@ -848,6 +821,8 @@ def Plotter(
         StartIndexAttitude (int): The starting data index when going through the attitude data given in *OHB_H5_Path*.
         OHB_H5_Path (str): Path to the .h5 file containing position, time, and attitude data. If the string is empty, only Science Mode Timeline data will be plotted.
         STK_CSV_PATH (str): Path to the .csv file containing position (column 1-3), velocity (column 4-6), and time (column 7), generated in STK. Position and velocity data is assumed to be in km and in ICRF.
+        Science_Mode_Path (str): Path to the Science Mode Timeline (*.json file). Used to name the directory of the saved plots.
+        FastTransformations (bool): If True, use the approximate transformations between ECI and ECEF of *_MATS_coordinates.GCRS2ITRS_matrices_fast* for the OHB and STK data.
         
     Returns:
         (list): **Time_OHB**, Timestamps (datetime utc) of the OHB data.
@@ -871,86 +846,43 @@ def Plotter(
     if OHB_H5_Path == "":
         timesteps = 0
         StartIndexState = 0
+        Level1A_data = None
 
     elif OHB_H5_Path != "":
         OHB_data = h5py.File(OHB_H5_Path, "r")
 
         Level1A_data = OHB_data["root"]["Level1A"]
 
-        # root = OHB_data['root']
-
-        x_MATS_OHB = Level1A_data["ReconstructedData"]["PreciseOrbitEstimation"][
-            "acsGnssStateJ2000"
-        ][0, :]
-        y_MATS_OHB = Level1A_data["ReconstructedData"]["PreciseOrbitEstimation"][
-            "acsGnssStateJ2000"
-        ][1, :]
-        z_MATS_OHB = Level1A_data["ReconstructedData"]["PreciseOrbitEstimation"][
-            "acsGnssStateJ2000"
-        ][2, :]
-
-        vel_x_MATS_OHB = Level1A_data["ReconstructedData"]["PreciseOrbitEstimation"][
-            "acsGnssStateJ2000"
-        ][3, :]
-        vel_y_MATS_OHB = Level1A_data["ReconstructedData"]["PreciseOrbitEstimation"][
-            "acsGnssStateJ2000"
-        ][4, :]
-        vel_z_MATS_OHB = Level1A_data["ReconstructedData"]["PreciseOrbitEstimation"][
-            "acsGnssStateJ2000"
-        ][5, :]
-
-        quat1_MATS_OHB = Level1A_data["ReconstructedData"]["PreciseAttitudeEstimation"][
-            "afsAttitudeState"
-        ][0, :]
-        quat2_MATS_OHB = Level1A_data["ReconstructedData"]["PreciseAttitudeEstimation"][
-            "afsAttitudeState"
-        ][1, :]
-        quat3_MATS_OHB = Level1A_data["ReconstructedData"]["PreciseAttitudeEstimation"][
-            "afsAttitudeState"
-        ][2, :]
-        quat4_MATS_OHB = Level1A_data["ReconstructedData"]["PreciseAttitudeEstimation"][
-            "afsAttitudeState"
-        ][3, :]
-
-        x_MATS_OHB_ECEFdata = Level1A_data["TM_acGnssOps"]["acoOnGnssStateEcef_x"][:]
-        y_MATS_OHB_ECEFdata = Level1A_data["TM_acGnssOps"]["acoOnGnssStateEcef_y"][:]
-        z_MATS_OHB_ECEFdata = Level1A_data["TM_acGnssOps"]["acoOnGnssStateEcef_z"][:]
-
-        """
-        x_MATS_OHB = root['TM_acOnGnss']['acoOnGnssStateJ2000_x']['raw']
-        y_MATS_OHB = root['TM_acOnGnss']['acoOnGnssStateJ2000_y']['raw']
-        z_MATS_OHB = root['TM_acOnGnss']['acoOnGnssStateJ2000_z']['raw']
-        
-        vel_x_MATS_OHB = root['TM_acOnGnss']['acoOnGnssStateJ2000_vx']['raw']
-        vel_y_MATS_OHB = root['TM_acOnGnss']['acoOnGnssStateJ2000_vy']['raw']
-        vel_z_MATS_OHB = root['TM_acOnGnss']['acoOnGnssStateJ2000_vz']['raw']
-        
-        quat1_MATS_OHB = root['TM_afAre']['afoTmAreAttitudeState_0']['raw']
-        quat2_MATS_OHB = root['TM_afAre']['afoTmAreAttitudeState_1']['raw']
-        quat3_MATS_OHB = root['TM_afAre']['afoTmAreAttitudeState_2']['raw']
-        quat4_MATS_OHB = root['TM_afAre']['afoTmAreAttitudeState_3']['raw']
-        """
-
-        # Time_State_OHB = root['TM_acOnGnss']['acoOnGnssStateTime']['raw']
-        Time_State_OHB = Level1A_data["ReconstructedData"]["PreciseOrbitEstimation"][
-            "Time"
-        ][0, :]
-
-        Time_Attitude_OHB = Level1A_data["ReconstructedData"][
-            "PreciseAttitudeEstimation"
-        ]["Time"][0, :]
-
         "#########################################################################"
         "Make sure that the amount of timesteps is less than the available data"
         PossibleTimesteps = []
 
-        timesteps = int((len(x_MATS_OHB) - StartIndexState) / DataIndexStepState)
+        timesteps = int(
+            (
+                Level1A_data["ReconstructedData"]["PreciseOrbitEstimation"][
+                    "acsGnssStateJ2000"
+                ].shape[1]
+                - StartIndexState
+            )
+            / DataIndexStepState
+        )
         PossibleTimesteps.append(timesteps)
 
-        timesteps = int((len(quat1_MATS_OHB) - StartIndexState) / DataIndexStepState)
+        timesteps = int(
+            (
+                Level1A_data["ReconstructedData"]["PreciseAttitudeEstimation"][
+                    "afsAttitudeState"
+                ].shape[1]
+                - StartIndexState
+            )
+            / DataIndexStepState
+        )
         PossibleTimesteps.append(timesteps)
 
-        timesteps = int((len(Time_State_OHB) - StartIndexState) / DataIndexStepState)
+        Length_Time_State_OHB = Level1A_data["ReconstructedData"][
+            "PreciseOrbitEstimation"
+        ]["Time"].shape[1]
+        timesteps = int((Length_Time_State_OHB - StartIndexState) / DataIndexStepState)
         PossibleTimesteps.append(timesteps)
 
         "The shortest data series determines the amount of timesteps"
@@ -984,216 +916,45 @@ def Plotter(
         ###### !!!!!!!!!!!!!!!! ############
 
         "To make sure there is enough data to support the amount of timesteps together with the DataIndexStepState"
-        if len(Time_State_OHB) <= DataIndexStepState * timesteps + StartIndexState:
-            timesteps = int(len(Time_State_OHB) / DataIndexStepState)
+        if Length_Time_State_OHB <= DataIndexStepState * timesteps + StartIndexState:
+            timesteps = int(Length_Time_State_OHB / DataIndexStepState)
 
     "#########################################################################"
 
-    "Allocate Space"
-    Time_MPL_OHB = zeros((timesteps, 1))
-    Time_OHB = []
-    Time_OHB_attitude = []
-    current_time_attitude = []
-
-    lat_MATS_OHB = zeros((timesteps, 1))
-    long_MATS_OHB = zeros((timesteps, 1))
-    alt_MATS_OHB = zeros((timesteps, 1))
-
-    q1_MATS_OHB = zeros((timesteps, 1))
-    q2_MATS_OHB = zeros((timesteps, 1))
-    q3_MATS_OHB = zeros((timesteps, 1))
-    q4_MATS_OHB = zeros((timesteps, 1))
-
-    Vel_MATS_OHB = zeros((timesteps, 3))
-    r_MATS_OHB = zeros((timesteps, 3))
-    r_MATS_OHB_ECEF = zeros((timesteps, 3))
-    r_MATS_OHB_ECEFdata = zeros((timesteps, 3))
-    r_MATS_OHB_ECEF2 = zeros((timesteps, 3))
-    optical_axis_OHB = zeros((timesteps, 3))
-    r_LP_OHB_ECEF = zeros((timesteps, 3))
-    lat_LP_OHB = zeros((timesteps, 1))
-    long_LP_OHB = zeros((timesteps, 1))
-    alt_LP_OHB = zeros((timesteps, 1))
-
-    Dec_OHB = zeros((timesteps, 1))
-    RA_OHB = zeros((timesteps, 1))
-
-    Time_State_OHB_float = zeros((timesteps, 1))
-    Time_Attitude_OHB_float = zeros((timesteps, 1))
-
-    Euler_angles_SLOF_OHB = zeros((timesteps, 3))
-    Euler_angles_ECI_OHB = zeros((timesteps, 3))
-
-    optical_axis_OHB = zeros((timesteps, 3))
-    optical_axis_OHB_ECEF = zeros((timesteps, 3))
-
     "############################################################"
     "############## OHB Data Calculations #######################"
     if OHB_H5_Path != "":
-
         Logger.info("Calculations of OHB Data")
-        for t in range(timesteps):
-
-            # t_OHB = round(t* DataIndexStepState + StartIndexState)
-            t_OHB_state = round(t * DataIndexStepState + StartIndexState)
-            Time_State_OHB_float[t] = float(Time_State_OHB[t_OHB_state])
-
-            t_OHB_attitude = round(t * DataIndexStepAttitude + StartIndexAttitude)
-            Time_Attitude_OHB_float[t] = float(Time_Attitude_OHB[t_OHB_attitude])
-
-            Time_OHB.append(
-                astropy.time.Time(
-                    Time_State_OHB_float[t, 0], format="gps", scale="utc"
-                ).to_datetime()
-            )
-            Time_OHB_attitude.append(
-                astropy.time.Time(
-                    Time_Attitude_OHB_float[t, 0], format="gps", scale="utc"
-                ).to_datetime()
-            )
-
-            if not (
-                int(Time_State_OHB_float[t]) == int(Time_Attitude_OHB_float[t])
-                and abs(Time_Attitude_OHB_float[t] - Time_State_OHB_float[t]) < 1
-            ):
-                Logger.warning("State time not synchronized to attitude time!!")
-
-            # Time_OHB.append(datetime.datetime(1980,1,6)+datetime.timedelta(seconds = Time_State_OHB_float[t,0]-18) )
-
-            # current_time_attitude.append(datetime.datetime(1980,1,6)+datetime.timedelta(seconds = Time_Attitude_OHB_float[t,0]-18) )
-
-            r_MATS_OHB[t, 0] = x_MATS_OHB[t_OHB_state]
-            r_MATS_OHB[t, 1] = y_MATS_OHB[t_OHB_state]
-            r_MATS_OHB[t, 2] = z_MATS_OHB[t_OHB_state]
-
-            Vel_MATS_OHB[t, 0] = vel_x_MATS_OHB[t_OHB_state]
-            Vel_MATS_OHB[t, 1] = vel_y_MATS_OHB[t_OHB_state]
-            Vel_MATS_OHB[t, 2] = vel_z_MATS_OHB[t_OHB_state]
-
-            q1_MATS_OHB[t, 0] = quat1_MATS_OHB[t_OHB_attitude]
-            q2_MATS_OHB[t, 0] = quat2_MATS_OHB[t_OHB_attitude]
-            q3_MATS_OHB[t, 0] = quat3_MATS_OHB[t_OHB_attitude]
-            q4_MATS_OHB[t, 0] = quat4_MATS_OHB[t_OHB_attitude]
-
-            r_MATS_OHB_ECEFdata[t, 0] = x_MATS_OHB_ECEFdata[t_OHB_state]
-            r_MATS_OHB_ECEFdata[t, 1] = y_MATS_OHB_ECEFdata[t_OHB_state]
-            r_MATS_OHB_ECEFdata[t, 2] = z_MATS_OHB_ECEFdata[t_OHB_state]
-
-            "SLOF = Spacecraft Local Orbit Frame"
-            z_SLOF = -r_MATS_OHB[t, 0:3]
-            # z_SLOF = -r_MATS[t,0:3]
-            z_SLOF = z_SLOF / norm(z_SLOF)
-            x_SLOF = Vel_MATS_OHB[t, 0:3]
-            x_SLOF = x_SLOF / norm(x_SLOF)
-            y_SLOF = cross(z_SLOF, x_SLOF)
-            y_SLOF = y_SLOF / norm(y_SLOF)
-
-            "Create change of coordinate matrix from ECI to SLOF"
-            dcm_SLOF_coordinate_system = array(
-                (
-                    [x_SLOF[0], y_SLOF[0], z_SLOF[0]],
-                    [x_SLOF[1], y_SLOF[1], z_SLOF[1]],
-                    [x_SLOF[2], y_SLOF[2], z_SLOF[2]],
-                )
-            )
-            dcm_change_of_basis_ECI_to_SLOF = transpose(dcm_SLOF_coordinate_system)
-            r_change_of_basis_ECI_to_SLOF = R.from_dcm(dcm_change_of_basis_ECI_to_SLOF)
-
-            "Create Rotation from quaternions (ECI to SpaceCraft BodyFrame)"
-            MATS_ECI_OHB = R.from_quat(
-                [
-                    q2_MATS_OHB[t, 0],
-                    q3_MATS_OHB[t, 0],
-                    q4_MATS_OHB[t, 0],
-                    q1_MATS_OHB[t, 0],
-                ]
-            )
-
-            "Apply rotation to -z to get optical axis"
-            optical_axis_OHB[t, :] = MATS_ECI_OHB.apply([0, 0, -1])
-            optical_axis_OHB[t, :] = optical_axis_OHB[t, :] / norm(
-                optical_axis_OHB[t, :]
-            )
-
-            "Caluclate RA and DEC of optical axis"
-            Dec_OHB[t] = (
-                arctan(
-                    optical_axis_OHB[t, 2]
-                    / sqrt(optical_axis_OHB[t, 0] ** 2 + optical_axis_OHB[t, 1] ** 2)
-                )
-                / pi
-                * 180
-            )
-            RA_OHB[t] = (
-                arccos(
-                    dot([1, 0, 0], [optical_axis_OHB[t, 0], optical_axis_OHB[t, 1], 0])
-                    / norm([optical_axis_OHB[t, 0], optical_axis_OHB[t, 1], 0])
-                )
-                / pi
-                * 180
-            )
-            if optical_axis_OHB[t, 1] < 0:
-                RA_OHB[t] = 360 - RA_OHB[t]
-
-            Euler_angles_ECI_OHB[t, :] = MATS_ECI_OHB.as_euler("ZYZ", degrees=True)
-
-            "Rotation multiplication to change the basis to SLOF, giving a rotation from SLOF to SPF"
-            MATS_SLOF_OHB = r_change_of_basis_ECI_to_SLOF * MATS_ECI_OHB
 
-            "Yaw, Pitch, Roll as Euler Angles"
-            Euler_angles_SLOF_OHB[t, :] = MATS_SLOF_OHB.as_euler("ZYZ", degrees=True)
-
-            (
-                optical_axis_OHB_ECEF[t, 0],
-                optical_axis_OHB_ECEF[t, 1],
-                optical_axis_OHB_ECEF[t, 2],
-            ) = _MATS_coordinates.eci2ecef(
-                optical_axis_OHB[t, 0],
-                optical_axis_OHB[t, 1],
-                optical_axis_OHB[t, 2],
-                Time_OHB[t],
-            )
-
-            optical_axis_OHB_ECEF[t, :] = optical_axis_OHB_ECEF[t, :] / norm(
-                optical_axis_OHB_ECEF[t, :]
-            )
-
-            (
-                r_MATS_OHB_ECEF[t, 0],
-                r_MATS_OHB_ECEF[t, 1],
-                r_MATS_OHB_ECEF[t, 2],
-            ) = _MATS_coordinates.eci2ecef(
-                r_MATS_OHB[t, 0], r_MATS_OHB[t, 1], r_MATS_OHB[t, 2], Time_OHB[t]
-            )
-
-            (
-                lat_MATS_OHB[t],
-                long_MATS_OHB[t],
-                alt_MATS_OHB[t],
-            ) = _MATS_coordinates.ECEF2lla(
-                r_MATS_OHB_ECEF[t, 0], r_MATS_OHB_ECEF[t, 1], r_MATS_OHB_ECEF[t, 2]
-            )
-
-            (
-                r_LP_OHB_ECEF[t, 0],
-                r_LP_OHB_ECEF[t, 1],
-                r_LP_OHB_ECEF[t, 2],
-            ) = _MATS_coordinates.ecef2tanpoint(
-                r_MATS_OHB_ECEF[t, 0],
-                r_MATS_OHB_ECEF[t, 1],
-                r_MATS_OHB_ECEF[t, 2],
-                optical_axis_OHB_ECEF[t, 0],
-                optical_axis_OHB_ECEF[t, 1],
-                optical_axis_OHB_ECEF[t, 2],
-            )
-
-            lat_LP_OHB[t], long_LP_OHB[t], alt_LP_OHB[t] = _MATS_coordinates.ECEF2lla(
-                r_LP_OHB_ECEF[t, 0], r_LP_OHB_ECEF[t, 1], r_LP_OHB_ECEF[t, 2]
-            )
+    Data_OHB = OHB.OHB_Calculations(
+        Level1A_data,
+        timesteps,
+        DataIndexStepState,
+        StartIndexState,
+        DataIndexStepAttitude,
+        StartIndexAttitude,
+        Logger,
+        FastTransformations,
+    )
 
-            # R_earth_MATS[t][t] = norm(r_MATS_OHB[t,:]*1000)-alt_MATS_OHB[t]
+    Time_OHB = Data_OHB["Time_OHB"]
+    r_MATS_OHB_ECEF = Data_OHB["r_MATS_OHB_ECEF [m]"]
+    r_MATS_OHB_ECEFdata = Data_OHB["r_MATS_OHB_ECEFdata [m]"]
+    lat_MATS_OHB = Data_OHB["lat_MATS_OHB [degrees]"]
+    long_MATS_OHB = Data_OHB["long_MATS_OHB [degrees]"]
+    alt_MATS_OHB = Data_OHB["alt_MATS_OHB [m]"]
+    r_LP_OHB_ECEF = Data_OHB["r_LP_OHB_ECEF [m]"]
+    lat_LP_OHB = Data_OHB["lat_LP_OHB [degrees]"]
+    long_LP_OHB = Data_OHB["long_LP_OHB [degrees]"]
+    alt_LP_OHB = Data_OHB["alt_LP_OHB [m]"]
+    SZA_LP_OHB = Data_OHB["SZA_LP_OHB [degrees]"]
+    Dec_OHB = Data_OHB["Dec_OHB [degrees]"]
+    RA_OHB = Data_OHB["RA_OHB [degrees]"]
+    Euler_angles_SLOF_OHB = Data_OHB["Euler_angles_SLOF_OHB [degrees]"]
 
-            Time_MPL_OHB[t] = date2num(Time_OHB[-1])
+    Time_MPL_OHB = zeros((timesteps, 1))
+    if OHB_H5_Path != "":
+        Time_MPL_OHB[:, 0] = date2num(Time_OHB)
 
     "######### END OF OHB DATA CALCULATIONS #########################"
     "#####################################################################################"
@@ -1252,20 +1013,13 @@ def Plotter(
         total_r_MATS_error_STK = []
         Time_error_STK_MPL = []
 
+        r_MATS_STK_ECEF[: len(Time_STK)] = _MATS_coordinates.eci2ecef_array(
+            r_MATS_STK_km[: len(Time_STK)] * 1000, Time_STK, FastTransformations
+        )
+
         "Calculate error between STK DATA and Predicted from Science Mode Timeline data when timestamps are the same"
         for t2 in range(len(Time_STK)):
 
-            (
-                r_MATS_STK_ECEF[t2, 0],
-                r_MATS_STK_ECEF[t2, 1],
-                r_MATS_STK_ECEF[t2, 2],
-            ) = _MATS_coordinates.eci2ecef(
-                r_MATS_STK_km[t2, 0] * 1000,
-                r_MATS_STK_km[t2, 1] * 1000,
-                r_MATS_STK_km[t2, 2] * 1000,
-                Time_STK[t2],
-            )
-
             for t in range(len(Time)):
 
                 if Time_MPL_STK[t2] == Time_MPL[t]:
@@ -1650,7 +1404,7 @@ def Plotter(
 
                     "The transpose of a matrix where the columns are basis vectors is a change of basis matrix"
                     dcm_change_of_basis_RCI = transpose(UnitVectorBasis_RCI)
-                    r_change_of_basis_ECI_to_SLOF = R.from_dcm(dcm_change_of_basis_RCI)
+                    r_change_of_basis_ECI_to_SLOF = R.from_matrix(dcm_change_of_basis_RCI)
 
                     r_MATS_error_OHB_RCI = r_change_of_basis_ECI_to_SLOF.apply(
                         (
@@ -1799,6 +1553,21 @@ def Plotter(
     figurePath = os.path.join(figureDirectory, "Alt_LP")
     pickle.dump(fig, open(figurePath + ".fig.pickle", "wb"))
 
+    fig = figure()
+    plot_date(
+        Time_MPL[:],
+        Data_LP["SZA_LP [degrees]"][:],
+        markersize=1,
+        label="Predicted from Science Mode Timeline",
+    )
+    plot_date(Time_MPL_OHB[:], SZA_LP_OHB[:], markersize=1, label="OHB-H5-Data")
+    xlabel("Date")
+    ylabel("Degrees")
+    title("Solar zenith angle at LP")
+    legend()
+    figurePath = os.path.join(figureDirectory, "SZA_LP")
+    pickle.dump(fig, open(figurePath + ".fig.pickle", "wb"))
+
     if OHB_H5_Path != "":
         fig = figure()
         plot_date(Time_error_MPL[:], alt_LP_error[:], markersize=1)
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""Calculations on the position and attitude data of MATS in a .h5 file created by OHB SWEDEN.
+
+Part of *Timeline_Plotter*. Kept apart from the plots so that the calculations can be run without matplotlib.
+"""
+
+import astropy.time
+from numpy import arccos, arctan, column_stack, pi, sqrt, transpose, where, zeros
+
+from OPT import _MATS_coordinates, _MATS_attitude
+
+
+def OHB_Calculations(
+    Level1A_data,
+    timesteps,
+    DataIndexStepState,
+    StartIndexState,
+    DataIndexStepAttitude,
+    StartIndexAttitude,
+    Logger,
+    FastTransformations=False,
+):
+    """Extracts the state and attitude data of MATS and calculates the position of MATS and LP in ECEF and geodetic coordinates.
+
+    Arguments:
+        Level1A_data (:obj:`h5py.Group`): The group *root/Level1A* of the OHB .h5 file. If None, no data is extracted and the arrays are left as zeros.
+        timesteps (int): The number of timesteps of the data to use.
+        DataIndexStepState (int): The data index step size when going through the state data.
+        StartIndexState (int): The starting data index when going through the state data.
+        DataIndexStepAttitude (int): The data index step size when going through the attitude data.
+        StartIndexAttitude (int): The starting data index when going through the attitude data.
+        Logger (:obj:`logging.Logger`): Logger used to warn if the state and attitude data are not synchronized.
+        FastTransformations (bool): If True, use the approximate transformations between ECI and ECEF of *_MATS_coordinates.GCRS2ITRS_matrices_fast*.
+
+    Returns:
+        (dict): Dictionary containing the timestamps (datetime utc) and the calculated data of each timestep.
+
+    """
+
+    "Allocate Space"
+    Time_OHB = []
+    Time_OHB_attitude = []
+
+    lat_MATS_OHB = zeros((timesteps, 1))
+    long_MATS_OHB = zeros((timesteps, 1))
+    alt_MATS_OHB = zeros((timesteps, 1))
+
+    q1_MATS_OHB = zeros((timesteps, 1))
+    q2_MATS_OHB = zeros((timesteps, 1))
+    q3_MATS_OHB = zeros((timesteps, 1))
+    q4_MATS_OHB = zeros((timesteps, 1))
+
+    Vel_MATS_OHB = zeros((timesteps, 3))
+    r_MATS_OHB = zeros((timesteps, 3))
+    r_MATS_OHB_ECEF = zeros((timesteps, 3))
+    r_MATS_OHB_ECEFdata = zeros((timesteps, 3))
+    r_LP_OHB_ECEF = zeros((timesteps, 3))
+    lat_LP_OHB = zeros((timesteps, 1))
+    long_LP_OHB = zeros((timesteps, 1))
+    alt_LP_OHB = zeros((timesteps, 1))
+    SZA_LP_OHB = zeros((timesteps, 1))
+
+    Dec_OHB = zeros((timesteps, 1))
+    RA_OHB = zeros((timesteps, 1))
+
+    Time_State_OHB_float = zeros((timesteps, 1))
+    Time_Attitude_OHB_float = zeros((timesteps, 1))
+
+    Euler_angles_SLOF_OHB = zeros((timesteps, 3))
+    Euler_angles_ECI_OHB = zeros((timesteps, 3))
+
+    optical_axis_OHB = zeros((timesteps, 3))
+    optical_axis_OHB_ECEF = zeros((timesteps, 3))
+
+    if Level1A_data is not None:
+
+        StateJ2000 = Level1A_data["ReconstructedData"]["PreciseOrbitEstimation"][
+            "acsGnssStateJ2000"
+        ]
+        AttitudeState = Level1A_data["ReconstructedData"]["PreciseAttitudeEstimation"][
+            "afsAttitudeState"
+        ]
+
+        x_MATS_OHB = StateJ2000[0, :]
+        y_MATS_OHB = StateJ2000[1, :]
+        z_MATS_OHB = StateJ2000[2, :]
+
+        vel_x_MATS_OHB = StateJ2000[3, :]
+        vel_y_MATS_OHB = StateJ2000[4, :]
+        vel_z_MATS_OHB = StateJ2000[5, :]
+
+        quat1_MATS_OHB = AttitudeState[0, :]
+        quat2_MATS_OHB = AttitudeState[1, :]
+        quat3_MATS_OHB = AttitudeState[2, :]
+        quat4_MATS_OHB = AttitudeState[3, :]
+
+        x_MATS_OHB_ECEFdata = Level1A_data["TM_acGnssOps"]["acoOnGnssStateEcef_x"][:]
+        y_MATS_OHB_ECEFdata = Level1A_data["TM_acGnssOps"]["acoOnGnssStateEcef_y"][:]
+        z_MATS_OHB_ECEFdata = Level1A_data["TM_acGnssOps"]["acoOnGnssStateEcef_z"][:]
+
+        Time_State_OHB = Level1A_data["ReconstructedData"]["PreciseOrbitEstimation"][
+            "Time"
+        ][0, :]
+
+        Time_Attitude_OHB = Level1A_data["ReconstructedData"][
+            "PreciseAttitudeEstimation"
+        ]["Time"][0, :]
+
+        for t in range(timesteps):
+
+            t_OHB_state = round(t * DataIndexStepState + StartIndexState)
+            Time_State_OHB_float[t] = float(Time_State_OHB[t_OHB_state])
+
+            t_OHB_attitude = round(t * DataIndexStepAttitude + StartIndexAttitude)
+            Time_Attitude_OHB_float[t] = float(Time_Attitude_OHB[t_OHB_attitude])
+
+            Time_OHB.append(
+                astropy.time.Time(
+                    Time_State_OHB_float[t, 0], format="gps", scale="utc"
+                ).to_datetime()
+            )
+            Time_OHB_attitude.append(
+                astropy.time.Time(
+                    Time_Attitude_OHB_float[t, 0], format="gps", scale="utc"
+                ).to_datetime()
+            )
+
+            if not (
+                int(Time_State_OHB_float[t, 0]) == int(Time_Attitude_OHB_float[t, 0])
+                and abs(Time_Attitude_OHB_float[t, 0] - Time_State_OHB_float[t, 0]) < 1
+            ):
+                Logger.warning("State time not synchronized to attitude time!!")
+
+            r_MATS_OHB[t, 0] = x_MATS_OHB[t_OHB_state]
+            r_MATS_OHB[t, 1] = y_MATS_OHB[t_OHB_state]
+            r_MATS_OHB[t, 2] = z_MATS_OHB[t_OHB_state]
+
+            Vel_MATS_OHB[t, 0] = vel_x_MATS_OHB[t_OHB_state]
+            Vel_MATS_OHB[t, 1] = vel_y_MATS_OHB[t_OHB_state]
+            Vel_MATS_OHB[t, 2] = vel_z_MATS_OHB[t_OHB_state]
+
+            q1_MATS_OHB[t, 0] = quat1_MATS_OHB[t_OHB_attitude]
+            q2_MATS_OHB[t, 0] = quat2_MATS_OHB[t_OHB_attitude]
+            q3_MATS_OHB[t, 0] = quat3_MATS_OHB[t_OHB_attitude]
+            q4_MATS_OHB[t, 0] = quat4_MATS_OHB[t_OHB_attitude]
+
+            r_MATS_OHB_ECEFdata[t, 0] = x_MATS_OHB_ECEFdata[t_OHB_state]
+            r_MATS_OHB_ECEFdata[t, 1] = y_MATS_OHB_ECEFdata[t_OHB_state]
+            r_MATS_OHB_ECEFdata[t, 2] = z_MATS_OHB_ECEFdata[t_OHB_state]
+
+        "Create Rotation from quaternions (ECI to SpaceCraft BodyFrame) and change of basis from ECI to SLOF (Spacecraft Local Orbit Frame), for all timesteps at once"
+        MATS_ECI_OHB = _MATS_attitude.quaternions_to_rotations(
+            column_stack((q1_MATS_OHB, q2_MATS_OHB, q3_MATS_OHB, q4_MATS_OHB))
+        )
+        r_change_of_basis_ECI_to_SLOF = _MATS_attitude.ECI_to_SLOF(
+            r_MATS_OHB, Vel_MATS_OHB
+        )
+
+        "Apply rotation to -z to get optical axis"
+        optical_axis_OHB = _MATS_attitude.unit_vectors(MATS_ECI_OHB.apply([0, 0, -1]))
+
+        "Caluclate RA and DEC of optical axis"
+        optical_axis_OHB_xy_norm = sqrt(
+            optical_axis_OHB[:, 0] ** 2 + optical_axis_OHB[:, 1] ** 2
+        )
+        Dec_OHB[:, 0] = (
+            arctan(optical_axis_OHB[:, 2] / optical_axis_OHB_xy_norm) / pi * 180
+        )
+        RA_OHB[:, 0] = (
+            arccos(optical_axis_OHB[:, 0] / optical_axis_OHB_xy_norm) / pi * 180
+        )
+        RA_OHB[:, 0] = where(optical_axis_OHB[:, 1] < 0, 360 - RA_OHB[:, 0], RA_OHB[:, 0])
+
+        Euler_angles_ECI_OHB = MATS_ECI_OHB.as_euler("ZYZ", degrees=True)
+
+        "Rotation multiplication to change the basis to SLOF, giving a rotation from SLOF to SPF"
+        MATS_SLOF_OHB = r_change_of_basis_ECI_to_SLOF * MATS_ECI_OHB
+
+        "Yaw, Pitch, Roll as Euler Angles"
+        Euler_angles_SLOF_OHB = MATS_SLOF_OHB.as_euler("ZYZ", degrees=True)
+
+        "Transform the optical axis and position to ECEF, with one rotation matrix for each timestep"
+        optical_axis_OHB_ECEF[:] = _MATS_attitude.unit_vectors(
+            _MATS_coordinates.eci2ecef_array(
+                optical_axis_OHB, Time_OHB, FastTransformations
+            )
+        )
+        r_MATS_OHB_ECEF[:] = _MATS_coordinates.eci2ecef_array(
+            r_MATS_OHB, Time_OHB, FastTransformations
+        )
+
+        "Geodetic coordinates of MATS and tangent points of all timesteps at once"
+        (
+            lat_MATS_OHB[:, 0],
+            long_MATS_OHB[:, 0],
+            alt_MATS_OHB[:, 0],
+        ) = _MATS_coordinates.ECEF2geodetic(*transpose(r_MATS_OHB_ECEF))
+
+        r_LP_OHB_ECEF[:] = _MATS_coordinates.ecef2tanpoint_array(
+            r_MATS_OHB_ECEF, optical_axis_OHB_ECEF
+        )
+
+        (
+            lat_LP_OHB[:, 0],
+            long_LP_OHB[:, 0],
+            alt_LP_OHB[:, 0],
+        ) = _MATS_coordinates.ECEF2geodetic(*transpose(r_LP_OHB_ECEF))
+
+        SZA_LP_OHB[:] = _MATS_coordinates.SZAfromlla_array(
+            lat_LP_OHB, long_LP_OHB, alt_LP_OHB, Time_OHB
+        )
+
+    Data_OHB = {
+        "Time_OHB": Time_OHB,
+        "r_MATS_OHB [m]": r_MATS_OHB,
+        "r_MATS_OHB_ECEF [m]": r_MATS_OHB_ECEF,
+        "r_MATS_OHB_ECEFdata [m]": r_MATS_OHB_ECEFdata,
+        "lat_MATS_OHB [degrees]": lat_MATS_OHB,
+        "long_MATS_OHB [degrees]": long_MATS_OHB,
+        "alt_MATS_OHB [m]": alt_MATS_OHB,
+        "optical_axis_OHB": optical_axis_OHB,
+        "optical_axis_OHB_ECEF": optical_axis_OHB_ECEF,
+        "r_LP_OHB_ECEF [m]": r_LP_OHB_ECEF,
+        "lat_LP_OHB [degrees]": lat_LP_OHB,
+        "long_LP_OHB [degrees]": long_LP_OHB,
+        "alt_LP_OHB [m]": alt_LP_OHB,
+        "SZA_LP_OHB [degrees]": SZA_LP_OHB,
+        "Dec_OHB [degrees]": Dec_OHB,
+        "RA_OHB [degrees]": RA_OHB,
+        "Euler_angles_ECI_OHB [degrees]": Euler_angles_ECI_OHB,
+        "Euler_angles_SLOF_OHB [degrees]": Euler_angles_SLOF_OHB,
+    }
+
+    return Data_OHB
@@ -41,7 +41,10 @@ def MinimalScienceXMLGenerator():
     _Globals.LargestSetTEXPMS = 0
 
     "############# Set up Logger #################################"
-    _Library.SetupLogger(OPT_Config_File.Logger_name())
+    _Library.SetupLogger(
+        OPT_Config_File.Logger_name(),
+        _Library.ConfigFile_Logger_settings(OPT_Config_File),
+    )
 
     "############# Get Settings from the Configuration File #########"
     CCDBIAS_settings = OPT_Config_File.CCDBIAS_settings()
@@ -22,17 +22,23 @@ When creating new Mode functions it is crucial that the function name is
 """
 
 
-import ephem, logging, sys, pylab, importlib, skyfield.api
+import ephem, logging, sys, numpy, importlib
 
 from OPT import _Globals
 
 OPT_Config_File = importlib.import_module(_Globals.Config_File)
 from OPT._Library import (
-    Satellite_Simulator,
+    EarthSatellite_from_TLE,
     dict_comparator,
     utc_to_onboardTime,
     SunAngle,
     CCDSELExtracter,
+    ephemDate_to_skyfield,
+    eclipse_event_finder,
+    LPlatitude_event_finder,
+    merge_events,
+    Satellite_Simulator,
+    Satellite_Simulator_Batch_Logger,
 )
 from .Macros_Commands import Macros, Commands
 
@@ -91,13 +97,15 @@ def Mode1(root, date, duration, relativeTime, Timeline_settings, Mode_settings={
     
     Disable exposure on UV channels for +-lat degrees latitude equatorwards.
     Stop/Start Nadir at dusk/dawn below MATS.
-    Simulates MATS and the LP with or without yaw movement to be able to predict and schedule commands in the XML-file.
+    Finds the times when the LP (simulated with or without yaw movement) crosses +-lat degrees latitude and when a point below MATS enters night or daytime, and schedules commands at these times.
+    
+    Nadir is not stopped at dawn while the LP is polewards of +-lat degrees latitude, but only when the LP next crosses +-lat degrees latitude equatorwards.
     
     """
 
-    zeros = pylab.zeros
-    pi = pylab.pi
-    arccos = pylab.arccos
+    pi = numpy.pi
+    arccos = numpy.arccos
+    ceil = numpy.ceil
 
     CCD_settings = OPT_Config_File.CCD_macro_settings("HighResUV")
     PM_settings = OPT_Config_File.PM_settings()
@@ -115,18 +123,6 @@ def Mode1(root, date, duration, relativeTime, Timeline_settings, Mode_settings={
 
     TLE = OPT_Config_File.getTLE()
 
-    "Pre-allocate space"
-    lat_MATS = zeros((duration, 1))
-    r_MATS = zeros((duration, 3))
-    r_MATS_ECEF = zeros((duration, 3))
-    r_MATS_unit_vector = zeros((duration, 3))
-    optical_axis = zeros((duration, 3))
-    lat_LP = zeros((duration, 1))
-    MATS_P = zeros((duration, 1))
-
-    sun_angle = zeros((duration, 1))
-    lat_LP = zeros((duration, 1))
-
     R_mean = 6371000  # Radius of Earth in m
     pointing_altitude = Timeline_settings["StandardPointingAltitude"]
     lat = Mode_settings["lat"]
@@ -140,330 +136,150 @@ def Mode1(root, date, duration, relativeTime, Timeline_settings, Mode_settings={
 
     Logger.debug("MATS_nadir_eclipse_angle : " + str(MATS_nadir_eclipse_angle))
     Logger.debug("")
-    t = -1
 
-    MATS_skyfield = skyfield.api.EarthSatellite(TLE[0], TLE[1])
+    MATS_skyfield = EarthSatellite_from_TLE(TLE, Timeline_settings, Logger)
 
+    initial_relativeTime = relativeTime
+    StartDate = ephem.Date(date)
+    EndDate = ephem.Date(date + ephem.second * duration)
+
+    Satellite_Simulator_Batch_Logger(
+        MATS_skyfield,
+        StartDate,
+        EndDate,
+        log_timestep,
+        Timeline_settings,
+        pointing_altitude / 1000,
+        Logger,
+    )
+
+    "Find all dusk/dawn transitions below MATS and all crossings of +-lat by the LP. Bracketed with the timestep and refined to 0.1 s"
+    Events = merge_events(
+        {
+            "Night": eclipse_event_finder(
+                MATS_skyfield,
+                StartDate,
+                EndDate,
+                MATS_nadir_eclipse_angle,
+                GridSpacing=timestep,
+            ),
+            "UV_on": LPlatitude_event_finder(
+                MATS_skyfield,
+                StartDate,
+                EndDate,
+                Timeline_settings,
+                pointing_altitude / 1000,
+                lat,
+                GridSpacing=timestep,
+            ),
+        }
+    )
+    Logger.debug(
+        "Number of dusk/dawn and latitude transitions found: " + str(len(Events))
+    )
+
+    "Schedule commands at the first whole second after each transition"
+    EventRelativeTimes = [
+        initial_relativeTime + ceil((EventDate - StartDate) / ephem.second)
+        for EventDate, EventName, EventValue in Events
+    ]
+
+    ############# Initial Mode setup ##########################################
+
+    Satellite_dict = Satellite_Simulator(
+        MATS_skyfield, StartDate, Timeline_settings, pointing_altitude / 1000
+    )
+    lat_LP = Satellite_dict["EstimatedLatitude_LP [degrees]"]
+    sun_angle = SunAngle(Satellite_dict["Position [km]"], StartDate)
+
+    "Check if night or day and the latitude of the LP"
+    State = {
+        "Night": sun_angle > MATS_nadir_eclipse_angle,
+        "UV_on": abs(lat_LP) > lat,
+    }
+    current_state = None
     new_relativeTime = relativeTime
-    current_time = ephem.Date(date)
 
-    # for t in range(int(duration/timestep)):
-    "Simulation begins here"
-    while current_time < ephem.second * duration + ephem.Date(date):
+    ############# End of Initial Mode setup ###################################
+
+    ####################### SCI-mode Operation planner ################
+
+    for x in range(len(Events) + 1):
+
+        if x == 0:
+            current_time = StartDate
+        else:
+            EventDate, EventName, EventValue = Events[x - 1]
+            State[EventName] = EventValue
 
-        t += 1
+            "Postpone the transition if the previous macro is still being scheduled"
+            relativeTime = max(EventRelativeTimes[x - 1], new_relativeTime)
+            if relativeTime >= initial_relativeTime + duration:
+                break
+
+            "Combine the transition with any other transitions occurring before it can be scheduled"
+            if x < len(Events) and EventRelativeTimes[x] <= relativeTime:
+                continue
 
-        if t != 0:
-            "Incremented time from scheduling CMDs"
-            CMD_scheduling_delay = new_relativeTime - relativeTime
-            "Increment with timestep each loop and add any added time from CMD scheduling"
             current_time = ephem.Date(
-                current_time + ephem.second * (timestep + CMD_scheduling_delay)
+                StartDate + ephem.second * (relativeTime - initial_relativeTime)
             )
-            # current_time = ephem.Date( current_time+ephem.second*(new_relativeTime-relativeTime) )
-            relativeTime = new_relativeTime + timestep
 
-        new_relativeTime = relativeTime
+        if State["Night"] == True:
+            new_state = "Mode1_night"
+            CCD_settings[64]["TEXPMS"] = TEXPMS_nadir
+        else:
+            new_state = "Mode1_day"
+            CCD_settings[64]["TEXPMS"] = 0
 
-        if t * timestep % log_timestep == 0:
-            LogFlag = True
+        if State["UV_on"] == True:
+            new_state = new_state + "_UV_on"
+            CCD_settings[16]["TEXPMS"] = TEXPMS_16
+            CCD_settings[32]["TEXPMS"] = TEXPMS_32
         else:
-            LogFlag = False
-
-        Satellite_dict = Satellite_Simulator(
-            MATS_skyfield,
-            current_time,
-            Timeline_settings,
-            pointing_altitude / 1000,
-            LogFlag,
-            Logger,
+            new_state = new_state + "_UV_off"
+            CCD_settings[16]["TEXPMS"] = 0
+            CCD_settings[32]["TEXPMS"] = 0
+
+        if new_state == current_state:
+            continue
+
+        "Nadir is kept on at dawn while UV is on, until the LP moves equatorwards"
+        if current_state == "Mode1_night_UV_on" and new_state == "Mode1_day_UV_on":
+            continue
+
+        Logger.debug("")
+        current_state = new_state
+        comment = (
+            current_state
+            + ": "
+            + str(current_time)
+            + ", parameters: "
+            + str(Mode_settings)
+        )
+        new_relativeTime = Macros.Operational_Limb_Pointing_macro(
+            root,
+            relativeTime,
+            CCD_settings,
+            PM_settings=PM_settings,
+            pointing_altitude=pointing_altitude,
+            Timeline_settings=Timeline_settings,
+            comment=comment,
         )
 
-        r_MATS[t] = Satellite_dict["Position [km]"]
-        MATS_P[t] = Satellite_dict["OrbitalPeriod [s]"]
-        lat_MATS[t] = Satellite_dict["Latitude [degrees]"]
-        optical_axis[t] = Satellite_dict["OpticalAxis"]
-        lat_LP[t] = Satellite_dict["EstimatedLatitude_LP [degrees]"]
-
-        sun_angle[t] = SunAngle(r_MATS[t], current_time)
-
-        if t * timestep % log_timestep == 0:
-            Logger.debug("sun_angle [degrees]: " + str(sun_angle[t]))
-
-        ############# Initial Mode setup ##########################################
-
-        if t == 0:
-
-            "Check if night or day"
-            if sun_angle[t] > MATS_nadir_eclipse_angle:
-
-                if abs(lat_LP[t]) < lat:
-                    current_state = "Mode1_night_UV_off"
-                    comment = (
-                        current_state
-                        + ": "
-                        + str(current_time)
-                        + ", parameters: "
-                        + str(Mode_settings)
-                    )
-                    # new_relativeTime = Macros.Mode1_macro(root,relativeTime, pointing_altitude=pointing_altitude, UV_on = False, nadir_on = True, Timeline_settings = Timeline_settings, comment = comment)
-                    CCD_settings[16]["TEXPMS"] = 0
-                    CCD_settings[32]["TEXPMS"] = 0
-                    CCD_settings[64]["TEXPMS"] = TEXPMS_nadir
-                    new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                        root,
-                        relativeTime,
-                        CCD_settings,
-                        PM_settings=PM_settings,
-                        pointing_altitude=pointing_altitude,
-                        Timeline_settings=Timeline_settings,
-                        comment=comment,
-                    )
-
-                elif abs(lat_LP[t]) > lat:
-                    current_state = "Mode1_night_UV_on"
-                    comment = (
-                        current_state
-                        + ": "
-                        + str(current_time)
-                        + ", parameters: "
-                        + str(Mode_settings)
-                    )
-                    # new_relativeTime = Macros.Mode1_macro(root,relativeTime, pointing_altitude=pointing_altitude, UV_on = True, nadir_on = True, Timeline_settings = Timeline_settings, comment = comment)
-                    CCD_settings[16]["TEXPMS"] = TEXPMS_16
-                    CCD_settings[32]["TEXPMS"] = TEXPMS_32
-                    CCD_settings[64]["TEXPMS"] = TEXPMS_nadir
-                    new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                        root,
-                        relativeTime,
-                        CCD_settings,
-                        PM_settings=PM_settings,
-                        pointing_altitude=pointing_altitude,
-                        Timeline_settings=Timeline_settings,
-                        comment=comment,
-                    )
-
-            elif sun_angle[t] < MATS_nadir_eclipse_angle:
-
-                if abs(lat_LP[t]) < lat:
-                    current_state = "Mode1_day_UV_off"
-                    comment = (
-                        current_state
-                        + ": "
-                        + str(current_time)
-                        + ", parameters: "
-                        + str(Mode_settings)
-                    )
-                    # new_relativeTime = Macros.Mode1_macro(root,relativeTime,pointing_altitude, UV_on = False, nadir_on = False, Timeline_settings = Timeline_settings, comment = comment)
-                    CCD_settings[16]["TEXPMS"] = 0
-                    CCD_settings[32]["TEXPMS"] = 0
-                    CCD_settings[64]["TEXPMS"] = 0
-                    new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                        root,
-                        relativeTime,
-                        CCD_settings,
-                        PM_settings=PM_settings,
-                        pointing_altitude=pointing_altitude,
-                        Timeline_settings=Timeline_settings,
-                        comment=comment,
-                    )
-
-                elif abs(lat_LP[t]) > lat:
-                    current_state = "Mode1_day_UV_on"
-                    comment = (
-                        current_state
-                        + ": "
-                        + str(current_time)
-                        + ", parameters: "
-                        + str(Mode_settings)
-                    )
-                    # new_relativeTime = Macros.Mode1_macro(root,relativeTime,pointing_altitude, UV_on = True, nadir_on = False, Timeline_settings = Timeline_settings, comment = comment)
-                    CCD_settings[16]["TEXPMS"] = TEXPMS_16
-                    CCD_settings[32]["TEXPMS"] = TEXPMS_32
-                    CCD_settings[64]["TEXPMS"] = 0
-                    new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                        root,
-                        relativeTime,
-                        CCD_settings,
-                        PM_settings=PM_settings,
-                        pointing_altitude=pointing_altitude,
-                        Timeline_settings=Timeline_settings,
-                        comment=comment,
-                    )
-
-            Logger.debug(current_state)
-            Logger.debug("")
+        Logger.debug(current_state)
+        Logger.debug("current_time: " + str(current_time))
+        if x != 0:
+            Logger.debug(
+                EventName
+                + " set to "
+                + str(EventValue)
+                + " at: "
+                + str(ephem.Date(EventDate))
+            )
+        Logger.debug("")
 
-        ############# End of Initial Mode setup ###################################
-
-        if t != 0:
-            ####################### SCI-mode Operation planner ################
-
-            # Check if night or day
-            if sun_angle[t] > MATS_nadir_eclipse_angle:
-
-                # Check latitude
-                if abs(lat_LP[t]) < lat and current_state != "Mode1_night_UV_off":
-
-                    # Check dusk/dawn and latitude boundaries
-                    if (
-                        sun_angle[t] > MATS_nadir_eclipse_angle
-                        and sun_angle[t - 1] < MATS_nadir_eclipse_angle
-                    ) or (abs(lat_LP[t]) < lat and abs(lat_LP[t - 1]) > lat):
-
-                        Logger.debug("")
-                        current_state = "Mode1_night_UV_off"
-                        comment = (
-                            current_state
-                            + ": "
-                            + str(current_time)
-                            + ", parameters: "
-                            + str(Mode_settings)
-                        )
-                        # new_relativeTime = Macros.Mode1_macro(root, relativeTime, pointing_altitude, UV_on = False, nadir_on = True, Timeline_settings = Timeline_settings, comment = comment)
-                        CCD_settings[16]["TEXPMS"] = 0
-                        CCD_settings[32]["TEXPMS"] = 0
-                        CCD_settings[64]["TEXPMS"] = TEXPMS_nadir
-                        new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                            root,
-                            relativeTime,
-                            CCD_settings,
-                            PM_settings=PM_settings,
-                            pointing_altitude=pointing_altitude,
-                            Timeline_settings=Timeline_settings,
-                            comment=comment,
-                        )
-
-                        Logger.debug(current_state)
-                        Logger.debug("current_time: " + str(current_time))
-                        Logger.debug("lat_MATS [degrees]: " + str(lat_MATS[t]))
-                        Logger.debug("lat_LP [degrees]: " + str(lat_LP[t]))
-                        Logger.debug("sun_angle [degrees]: " + str(sun_angle[t]))
-                        Logger.debug("")
-
-                # Check latitude
-                if abs(lat_LP[t]) > lat and current_state != "Mode1_night_UV_on":
-
-                    # Check dusk/dawn and latitude boundaries
-                    if (
-                        sun_angle[t] > MATS_nadir_eclipse_angle
-                        and sun_angle[t - 1] < MATS_nadir_eclipse_angle
-                    ) or (abs(lat_LP[t]) > lat and abs(lat_LP[t - 1]) < lat):
-
-                        Logger.debug("")
-                        current_state = "Mode1_night_UV_on"
-                        comment = (
-                            current_state
-                            + ": "
-                            + str(current_time)
-                            + ", parameters: "
-                            + str(Mode_settings)
-                        )
-                        # new_relativeTime = Macros.Mode1_macro(root, relativeTime, pointing_altitude=pointing_altitude, UV_on = True, nadir_on = True, Timeline_settings = Timeline_settings, comment = comment)
-                        CCD_settings[16]["TEXPMS"] = TEXPMS_16
-                        CCD_settings[32]["TEXPMS"] = TEXPMS_32
-                        CCD_settings[64]["TEXPMS"] = TEXPMS_nadir
-                        new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                            root,
-                            relativeTime,
-                            CCD_settings,
-                            PM_settings=PM_settings,
-                            pointing_altitude=pointing_altitude,
-                            Timeline_settings=Timeline_settings,
-                            comment=comment,
-                        )
-
-                        Logger.debug(current_state)
-                        Logger.debug("current_time: " + str(current_time))
-                        Logger.debug("lat_MATS [degrees]: " + str(lat_MATS[t]))
-                        Logger.debug("lat_LP [degrees]: " + str(lat_LP[t]))
-                        Logger.debug("sun_angle [degrees]: " + str(sun_angle[t]))
-                        Logger.debug("")
-                        # Mode1_macro(root,str(t+relativeTime),pointing_altitude, Timeline_settings = Timeline_settings, comment = comment)
-
-            # Check if night or day#
-            if sun_angle[t] < MATS_nadir_eclipse_angle:
-
-                # Check latitude
-                if abs(lat_LP[t]) < lat and current_state != "Mode1_day_UV_off":
-
-                    # Check dusk/dawn and latitude boundaries
-                    if (
-                        sun_angle[t] < MATS_nadir_eclipse_angle
-                        and sun_angle[t - 1] > MATS_nadir_eclipse_angle
-                    ) or (abs(lat_LP[t]) < lat and abs(lat_LP[t - 1]) > lat):
-
-                        Logger.debug("")
-                        current_state = "Mode1_day_UV_off"
-                        comment = (
-                            current_state
-                            + ": "
-                            + str(current_time)
-                            + ", parameters: "
-                            + str(Mode_settings)
-                        )
-                        # new_relativeTime = Macros.Mode1_macro(root, relativeTime, pointing_altitude=pointing_altitude, UV_on = False, nadir_on = False, Timeline_settings = Timeline_settings, comment = comment)
-                        CCD_settings[16]["TEXPMS"] = 0
-                        CCD_settings[32]["TEXPMS"] = 0
-                        CCD_settings[64]["TEXPMS"] = 0
-                        new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                            root,
-                            relativeTime,
-                            CCD_settings,
-                            PM_settings=PM_settings,
-                            pointing_altitude=pointing_altitude,
-                            Timeline_settings=Timeline_settings,
-                            comment=comment,
-                        )
-
-                        Logger.debug(current_state)
-                        Logger.debug("current_time: " + str(current_time))
-                        Logger.debug("lat_MATS [degrees]: " + str(lat_MATS[t]))
-                        Logger.debug("lat_LP [degrees]: " + str(lat_LP[t]))
-                        Logger.debug("sun_angle [degrees]: " + str(sun_angle[t]))
-                        Logger.debug("")
-
-                # Check latitude
-                if abs(lat_LP[t]) > lat and current_state != "Mode1_day_UV_on":
-
-                    # Check dusk/dawn and latitude boundaries
-                    if (
-                        sun_angle[t] > MATS_nadir_eclipse_angle
-                        and sun_angle[t - 1] < MATS_nadir_eclipse_angle
-                    ) or (abs(lat_LP[t]) > lat and abs(lat_LP[t - 1]) < lat):
-
-                        Logger.debug("")
-                        current_state = "Mode1_day_UV_on"
-                        comment = (
-                            current_state
-                            + ": "
-                            + str(current_time)
-                            + ", parameters: "
-                            + str(Mode_settings)
-                        )
-                        # new_relativeTime = Macros.Mode1_macro(root, relativeTime, pointing_altitude=pointing_altitude, UV_on = True, nadir_on = False, Timeline_settings = Timeline_settings, comment = comment)
-                        CCD_settings[16]["TEXPMS"] = TEXPMS_16
-                        CCD_settings[32]["TEXPMS"] = TEXPMS_32
-                        CCD_settings[64]["TEXPMS"] = 0
-                        new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                            root,
-                            relativeTime,
-                            CCD_settings,
-                            PM_settings=PM_settings,
-                            pointing_altitude=pointing_altitude,
-                            Timeline_settings=Timeline_settings,
-                            comment=comment,
-                        )
-
-                        Logger.debug(current_state)
-                        Logger.debug("current_time: " + str(current_time))
-                        Logger.debug("lat_MATS [degrees]: " + str(lat_MATS[t]))
-                        Logger.debug("lat_LP [degrees]: " + str(lat_LP[t]))
-                        Logger.debug("sun_angle [degrees]: " + str(sun_angle[t]))
-                        Logger.debug("")
-                        # Mode1_macro(root,str(t+relativeTime),pointing_altitude, Timeline_settings = Timeline_settings, comment = comment)
-
-            ############### End of SCI-mode operation planner #################
+    ############### End of SCI-mode operation planner #################
 
 
 #######################################################################################
@@ -476,7 +292,7 @@ def Mode2(root, date, duration, relativeTime, Timeline_settings, Mode_settings={
     **CCD_Macro**: HighResIR (High-resolution IR binning). \n
     
     Stop/Start Nadir at dusk/dawn below MATS.
-    Simulates MATS to determine when a point below MATS is at night or daytime.
+    Finds the times when a point below MATS enters night or daytime and schedules commands at these times.
     
     """
 
@@ -485,9 +301,9 @@ def Mode2(root, date, duration, relativeTime, Timeline_settings, Mode_settings={
     Mode_settings_ConfigFile = OPT_Config_File.Operational_Science_Mode_settings()
     # Timeline_settings = OPT_Config_File.Timeline_settings()
 
-    zeros = pylab.zeros
-    pi = pylab.pi
-    arccos = pylab.arccos
+    pi = numpy.pi
+    arccos = numpy.arccos
+    ceil = numpy.ceil
 
     Mode_settings = dict_comparator(Mode_settings, Mode_settings_ConfigFile, Logger)
 
@@ -499,10 +315,6 @@ def Mode2(root, date, duration, relativeTime, Timeline_settings, Mode_settings={
 
     TLE = OPT_Config_File.getTLE()
 
-    "Pre-allocate space"
-    sun_angle = zeros((duration, 1))
-    r_MATS = zeros((duration, 3))
-
     R_mean = 6371000  # Radius of Earth in m
     pointing_altitude = Timeline_settings["StandardPointingAltitude"]
 
@@ -514,155 +326,134 @@ def Mode2(root, date, duration, relativeTime, Timeline_settings, Mode_settings={
     )
     Logger.debug("MATS_nadir_eclipse_angle : " + str(MATS_nadir_eclipse_angle))
 
-    MATS_skyfield = skyfield.api.EarthSatellite(TLE[0], TLE[1])
+    MATS_skyfield = EarthSatellite_from_TLE(TLE, Timeline_settings, Logger)
+
+    initial_relativeTime = relativeTime
+    StartDate = ephem.Date(date)
+    EndDate = ephem.Date(date + ephem.second * duration)
+
+    Satellite_Simulator_Batch_Logger(
+        MATS_skyfield,
+        StartDate,
+        EndDate,
+        log_timestep,
+        Timeline_settings,
+        pointing_altitude / 1000,
+        Logger,
+    )
 
-    t = -1
+    "Find all dusk/dawn transitions below MATS. Bracketed with the timestep and refined to 0.1 s"
+    EventDates, Night = eclipse_event_finder(
+        MATS_skyfield, StartDate, EndDate, MATS_nadir_eclipse_angle, GridSpacing=timestep
+    )
+    Logger.debug("Number of dusk/dawn transitions found: " + str(len(EventDates)))
 
-    new_relativeTime = relativeTime
-    current_time = ephem.Date(date)
+    "Schedule commands at the first whole second after each transition"
+    EventRelativeTimes = initial_relativeTime + ceil(
+        (EventDates - StartDate) / ephem.second
+    )
 
-    # for t in range(int(duration/timestep)):
-    while current_time < ephem.second * duration + ephem.Date(date):
+    ############# Initial Mode setup ##########################################
 
-        t += 1
+    sun_angle = SunAngle(
+        MATS_skyfield.at(ephemDate_to_skyfield(StartDate)).position.km, StartDate
+    )
+    Logger.debug("sun_angle [degrees]: " + str(sun_angle))
+
+    "Check if night or day"
+    if sun_angle > MATS_nadir_eclipse_angle:
+        current_state = "Mode2_night"
+        comment = current_state + ": " + str(Mode_settings)
+        # new_relativeTime = Macros.Mode1_macro(root,relativeTime, pointing_altitude=pointing_altitude, nadir_on = True, Timeline_settings = Timeline_settings, comment = comment)
+        CCD_settings[64]["TEXPMS"] = TEXPMS_nadir
+        new_relativeTime = Macros.Operational_Limb_Pointing_macro(
+            root,
+            relativeTime,
+            CCD_settings,
+            PM_settings=PM_settings,
+            pointing_altitude=pointing_altitude,
+            Timeline_settings=Timeline_settings,
+            comment=comment,
+        )
 
-        if t != 0:
-            CMD_scheduling_delay = new_relativeTime - relativeTime
-            "Increment with timestep each loop and add any added time if new_relativeTime was changed"
-            current_time = ephem.Date(
-                current_time + ephem.second * (timestep + CMD_scheduling_delay)
-            )
-            # current_time = ephem.Date( current_time+ephem.second*(new_relativeTime-relativeTime) )
+    else:
+        current_state = "Mode2_day"
+        comment = current_state + ": " + str(Mode_settings)
+        # new_relativeTime = Macros.Mode1_macro(root,relativeTime, pointing_altitude=pointing_altitude, nadir_on = False, Timeline_settings = Timeline_settings, comment = comment)
+        CCD_settings[64]["TEXPMS"] = 0
+        new_relativeTime = Macros.Operational_Limb_Pointing_macro(
+            root,
+            relativeTime,
+            CCD_settings,
+            PM_settings=PM_settings,
+            pointing_altitude=pointing_altitude,
+            Timeline_settings=Timeline_settings,
+            comment=comment,
+        )
 
-            relativeTime = new_relativeTime + timestep
+    ############# End of Initial Mode setup ###################################
 
-        new_relativeTime = relativeTime
+    ####################### SCI-mode Operation planner ################
 
-        # relativeTime = relativeTime + t * timestep
-        # current_time = ephem.Date(date+ephem.second*timestep*t)
+    for x in range(len(EventDates)):
 
-        if t * timestep % log_timestep == 0:
-            LogFlag = True
-        else:
-            LogFlag = False
-
-        Satellite_dict = Satellite_Simulator(
-            MATS_skyfield,
-            current_time,
-            Timeline_settings,
-            pointing_altitude / 1000,
-            LogFlag,
-            Logger,
+        "Postpone the transition if the previous macro is still being scheduled"
+        relativeTime = max(EventRelativeTimes[x], new_relativeTime)
+        if relativeTime >= initial_relativeTime + duration:
+            break
+
+        "Skip the transition if it is reverted before it can be scheduled"
+        if x + 1 < len(EventDates) and EventRelativeTimes[x + 1] <= relativeTime:
+            continue
+
+        current_time = ephem.Date(
+            StartDate + ephem.second * (relativeTime - initial_relativeTime)
         )
 
-        r_MATS[t] = Satellite_dict["Position [km]"]
-        sun_angle[t] = SunAngle(r_MATS[t], current_time)
+        # Check dusk/dawn boundaries
+        if Night[x] == True and current_state != "Mode2_night":
+
+            Logger.debug("")
+            current_state = "Mode2_night"
+            comment = current_state + ": " + str(Mode_settings)
+            # new_relativeTime = Macros.Mode1_macro(root, relativeTime, pointing_altitude=pointing_altitude, nadir_on = True, Timeline_settings = Timeline_settings, comment = comment)
+            CCD_settings[64]["TEXPMS"] = TEXPMS_nadir
+            new_relativeTime = Macros.Operational_Limb_Pointing_macro(
+                root,
+                relativeTime,
+                CCD_settings,
+                PM_settings=PM_settings,
+                pointing_altitude=pointing_altitude,
+                Timeline_settings=Timeline_settings,
+                comment=comment,
+            )
+
+            Logger.debug("current_time: " + str(current_time))
+            Logger.debug("Dusk below MATS at: " + str(ephem.Date(EventDates[x])))
+            Logger.debug("")
+
+        elif Night[x] == False and current_state != "Mode2_day":
 
-        if t % log_timestep == 0:
             Logger.debug("")
+            current_state = "Mode2_day"
+            comment = current_state + ": " + str(Mode_settings)
+            # new_relativeTime = Macros.Mode1_macro(root, relativeTime, pointing_altitude=pointing_altitude, nadir_on = False, Timeline_settings = Timeline_settings, comment = comment)
+            CCD_settings[64]["TEXPMS"] = 0
+            new_relativeTime = Macros.Operational_Limb_Pointing_macro(
+                root,
+                relativeTime,
+                CCD_settings,
+                PM_settings=PM_settings,
+                pointing_altitude=pointing_altitude,
+                Timeline_settings=Timeline_settings,
+                comment=comment,
+            )
+
             Logger.debug("current_time: " + str(current_time))
-            Logger.debug("sun_angle [degrees]: " + str(sun_angle[t]))
-
-        ############# Initial Mode setup ##########################################
-
-        if t == 0:
-
-            "Check if night or day"
-            if sun_angle[t] > MATS_nadir_eclipse_angle:
-                current_state = "Mode2_night"
-                comment = current_state + ": " + str(Mode_settings)
-                # new_relativeTime = Macros.Mode1_macro(root,relativeTime, pointing_altitude=pointing_altitude, nadir_on = True, Timeline_settings = Timeline_settings, comment = comment)
-                CCD_settings[64]["TEXPMS"] = TEXPMS_nadir
-                new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                    root,
-                    relativeTime,
-                    CCD_settings,
-                    PM_settings=PM_settings,
-                    pointing_altitude=pointing_altitude,
-                    Timeline_settings=Timeline_settings,
-                    comment=comment,
-                )
-
-            elif sun_angle[t] < MATS_nadir_eclipse_angle:
-                current_state = "Mode2_day"
-                comment = current_state + ": " + str(Mode_settings)
-                # new_relativeTime = Macros.Mode1_macro(root,relativeTime, pointing_altitude=pointing_altitude, nadir_on = False, Timeline_settings = Timeline_settings, comment = comment)
-                CCD_settings[64]["TEXPMS"] = 0
-                new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                    root,
-                    relativeTime,
-                    CCD_settings,
-                    PM_settings=PM_settings,
-                    pointing_altitude=pointing_altitude,
-                    Timeline_settings=Timeline_settings,
-                    comment=comment,
-                )
-
-        ############# End of Initial Mode setup ###################################
-
-        if t != 0:
-            ####################### SCI-mode Operation planner ################
-
-            # Check if night or day
-            if (
-                sun_angle[t] > MATS_nadir_eclipse_angle
-                and current_state != "Mode2_night"
-            ):
-
-                # Check dusk/dawn boundaries
-                if (
-                    sun_angle[t] > MATS_nadir_eclipse_angle
-                    and sun_angle[t - 1] < MATS_nadir_eclipse_angle
-                ):
-
-                    Logger.debug("")
-                    current_state = "Mode2_night"
-                    comment = current_state + ": " + str(Mode_settings)
-                    # new_relativeTime = Macros.Mode1_macro(root, relativeTime, pointing_altitude=pointing_altitude, nadir_on = True, Timeline_settings = Timeline_settings, comment = comment)
-                    CCD_settings[64]["TEXPMS"] = TEXPMS_nadir
-                    new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                        root,
-                        relativeTime,
-                        CCD_settings,
-                        PM_settings=PM_settings,
-                        pointing_altitude=pointing_altitude,
-                        Timeline_settings=Timeline_settings,
-                        comment=comment,
-                    )
-
-                    Logger.debug("current_time: " + str(current_time))
-                    Logger.debug("sun_angle [degrees]: " + str(sun_angle[t]))
-                    Logger.debug("")
-
-            # Check if night or day
-            if sun_angle[t] < MATS_nadir_eclipse_angle and current_state != "Mode2_day":
-
-                # Check dusk/dawn boundaries
-                if (
-                    sun_angle[t] < MATS_nadir_eclipse_angle
-                    and sun_angle[t - 1] > MATS_nadir_eclipse_angle
-                ):
-
-                    Logger.debug("")
-                    current_state = "Mode2_day"
-                    comment = current_state + ": " + str(Mode_settings)
-                    # new_relativeTime = Macros.Mode1_macro(root, relativeTime, pointing_altitude=pointing_altitude, nadir_on = False, Timeline_settings = Timeline_settings, comment = comment)
-                    CCD_settings[64]["TEXPMS"] = 0
-                    new_relativeTime = Macros.Operational_Limb_Pointing_macro(
-                        root,
-                        relativeTime,
-                        CCD_settings,
-                        PM_settings=PM_settings,
-                        pointing_altitude=pointing_altitude,
-                        Timeline_settings=Timeline_settings,
-                        comment=comment,
-                    )
-
-                    Logger.debug("current_time: " + str(current_time))
-                    Logger.debug("sun_angle [degrees]: " + str(sun_angle[t]))
-                    Logger.debug("")
-
-        ############### End of SCI-mode operation planner #################
+            Logger.debug("Dawn below MATS at: " + str(ephem.Date(EventDates[x])))
+            Logger.debug("")
+
+    ############### End of SCI-mode operation planner #################
 
 
 ################################################################################################
@@ -20,7 +20,7 @@ Each Command function has these inputs/outputs in common.
 
 import logging, importlib
 from lxml import etree
-from pylab import sign, ceil
+from numpy import sign, ceil
 
 from OPT import _Globals
 from OPT._Library import calculate_time_per_row
@@ -25,7 +25,8 @@ When creating new Test functions it is crucial that the function name is
 """
 
 import ephem, logging, sys, importlib, skyfield.api
-from pylab import dot, arccos, zeros, pi, sin, cos, arctan, cross, norm, sqrt
+from numpy import dot, arccos, zeros, pi, sin, cos, arctan, cross, sqrt
+from numpy.linalg import norm
 
 from OPT import _Globals, _Library, _MATS_coordinates
 
@@ -151,7 +152,6 @@ def Limb_functional_test(root, date, duration, relativeTime, Timeline_settings,
                         
                         mode_relativeTime = relativeTime - initial_relativeTime
                         current_time = ephem.Date(date+ephem.second*mode_relativeTime)
-                        current_time_datetime = current_time.datetime()
                         
                         if(mode_relativeTime > duration and duration_flag == 0):
                             Logger.warning('Warning!! The scheduled time for the Test has ran out.')
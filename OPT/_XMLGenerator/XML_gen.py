@@ -36,7 +36,7 @@ These outcommented rows of code calls for Mode and CCD settings from the *Config
 from lxml import etree
 import ephem, logging, sys, time, os, json, importlib, datetime
 
-from OPT import _Globals, _Library
+from OPT import _Globals, _Library, _OrbitProduct
 OPT_Config_File = importlib.import_module(_Globals.Config_File)
 #from OPT_Config_File import Timeline_settings, initialConditions, Logger_name, Version
 from .Modes_and_Tests import MODES, Tests, SeparateCMDsAndProcedures
@@ -72,7 +72,10 @@ def XML_generator(SCIMOD_Path):
     _Globals.LargestSetTEXPMS = 0
     
     ############# Set up Logger #################################
-    _Library.SetupLogger(OPT_Config_File.Logger_name())
+    _Library.SetupLogger(
+        OPT_Config_File.Logger_name(),
+        _Library.ConfigFile_Logger_settings(OPT_Config_File),
+    )
     
     
     Logger.info('Start of Program')
@@ -115,6 +118,9 @@ def XML_generator(SCIMOD_Path):
     timeline_start = ephem.Date(Timeline_settings['start_date'])
     Logger.info('timeline_start: '+str(timeline_start))
     
+    "Reuse the orbit product written by Timeline_gen, if it exists"
+    _OrbitProduct.load_OrbitProduct(OPT_Config_File.getTLE(), Timeline_settings, Logger)
+    
     
     ########    Call function to create XML-tree basis ##########################
     Logger.info('Call function XML_Initial_Basis_Creator')
@@ -168,6 +174,9 @@ def XML_generator(SCIMOD_Path):
     SCIMOD_Path = SCIMOD_Path.replace('/','_')
     SCIMOD_Path = SCIMOD_Path.replace('.json','')
     
+    _Library.Satellite_cache.log_statistics(Logger)
+    _Library.SyncArg_cache.log_statistics(Logger)
+    
     ### Write finished XML-tree with all commands to a file #######
     XML_TIMELINE = os.path.join('Output','XML_TIMELINE__'+'FROM__'+SCIMOD_Path+'.xml')
     Logger.info('Write XML-tree to: '+XML_TIMELINE)
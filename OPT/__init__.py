@@ -10,6 +10,9 @@
     - Timeline_analyzer
     - Timeline_Plotter
     - Plot_Timeline_Plotter_Plots
+    - MultiTLE_Simulator
+    - CCDSync_Optimizer
+    - Update_IERS
 
 **Abbreviations:**
     CMD = Command \n
@@ -234,7 +237,81 @@ def Timeline_analyzer(science_mode_timeline_path, date):
     return Mode, Parameters
 
 
-def Timeline_Plotter(Science_Mode_Path, OHB_H5_Path="", STK_CSV_PATH="", Timestep=16):
+def MultiTLE_Simulator(TLEs, Timestep=16):
+    """Invokes the *MultiTLE_Simulator* program part of *Operational_Planning_Tool*.
+    
+    Simulates MATS during the timeline defined in the chosen *Configuration File* for several TLEs at once, for example to compare a fresh TLE with the one of the previous day. \n
+    All TLEs are propagated together, which is much faster than running *Timeline_gen* once for each TLE. 
+    For each TLE the LP track is simulated and the transitions which determine the scheduling of *Operational Science Modes* (dusk/dawn below MATS and crossings of the latitude *lat* by the LP) are found.
+    
+    Arguments:
+        TLEs (list): List of TLEs, each being a list containing the two lines of a TLE.
+        Timestep (int): Timestep [s] of the simulated LP track.
+        
+    Returns:
+        (list): One dictionary for each TLE containing the keys *TLE*, *Date*, *LP_track* and *Events*. See *_MultiTLE_Simulator.Core.MultiTLE_Simulator*.
+    """
+    from ._MultiTLE_Simulator.Core import MultiTLE_Simulator
+
+    Results = MultiTLE_Simulator(TLEs, Timestep)
+
+    return Results
+
+
+def CCDSync_Optimizer(
+    CCDMacroSelect="CustomBinning",
+    SearchSpace=None,
+    Objective="TEXPIMS",
+    Groups=((16, 32), (1, 8), (2, 4)),
+):
+    """Invokes the *CCDSync_Optimizer* program part of *Operational_Planning_Tool*.
+    
+    Searches binning settings (NCBIN, NCBINFPGA, NRBIN, NROW, NCOL) and Exposure Times (TEXPMS) of the six limb CCDs, starting from the settings of a CCD macro in the chosen *Configuration File*,
+    for synchronized settings with a short Exposure Interval Time (TEXPIMS), without having to run *XML_gen* for each attempt. \n
+    TEXPIMS is calculated in the same way as when the CCD Synchronize CMD is scheduled (see *_Library.SyncArgCalculator*), including the estimated Transfer Time through the CRB,
+    using *Timeline_settings['CCDSYNC_ExtraOffset']* and *Timeline_settings['CCDSYNC_ExtraIntervalTime']*. \n
+    The returned configurations are Pareto-optimal, meaning that no other searched settings have a better *Objective* without having fewer pixels or a shorter sum of Exposure Times.
+    
+    Arguments:
+        CCDMacroSelect (str): *Optional*. The CCD macro which settings are used for settings not searched, see *CCD_macro_settings* of the *Configuration File*.
+        SearchSpace (dict): *Optional*. Lists of candidate values for the settings "TEXPMS", "NCBIN", "NCBINFPGA", "NRBIN", "NROW" and "NCOL". A CCDSEL may also be used as a key to a dictionary of candidate values only used for the CCDs in the same group. 
+            If NCOL or NROW is not given, they are chosen to read out the same part of the CCD as the CCD macro. If None, a default set of binning settings is searched with the Exposure Times of the CCD macro.
+        Objective (str): *Optional*. 'TEXPIMS' to minimize the Exposure Interval Time, or 'ImageRate' to maximize the number of images per second.
+        Groups (tuple of tuple of int): *Optional*. Groups of CCDs (given by CCDSEL) which are given the same settings.
+        
+    Returns:
+        (list): Pareto-optimal configurations sorted by the *Objective*, each being a dictionary with the keys *CCD_settings*, *CCDSEL*, *NCCD*, *TEXPIOFS*, *TEXPIMS*, *ImageRate*, *Pixels* and *ExposureTime*. See *_CCDSyncOptimizer.Core.CCDSync_Optimizer*.
+    """
+    from ._CCDSyncOptimizer.Core import CCDSync_Optimizer
+
+    Configurations = CCDSync_Optimizer(CCDMacroSelect, SearchSpace, Objective, Groups)
+
+    return Configurations
+
+
+def Update_IERS():
+    """Downloads the latest IERS-A table of the Earth orientation, which is used by the transformations between ECI and ECEF. Requires network access.
+    
+    OPT never downloads IERS data by itself, and otherwise uses the last table downloaded with *Update_IERS*, or the table bundled with Astropy (see *_IERS*). 
+    The age of the data is logged by the programs which use it, with a warning if it is more than 30 days old.
+    
+    Returns:
+        (dict): Dictionary with the keys *Path*, *LastMeasured* (the date of the last measured values) and *Age [days]*.
+    """
+    from ._IERS import update_IERS
+
+    Status = update_IERS()
+
+    return Status
+
+
+def Timeline_Plotter(
+    Science_Mode_Path,
+    OHB_H5_Path="",
+    STK_CSV_PATH="",
+    Timestep=16,
+    FastTransformations=False,
+):
     """Invokes the *Timeline_Plotter* program part of *Operational_Planning_Tool*.
     
     Simulates the position and attitude of MATS from a given Science Mode Timeline and also optionally compares it to
@@ -253,6 +330,7 @@ def Timeline_Plotter(Science_Mode_Path, OHB_H5_Path="", STK_CSV_PATH="", Timeste
         OHB_H5_Path (str): *Optional*. Path to the .h5 file containing position, time, and attitude data. The .h5 file is defined in the "Ground Segment ICD" document. The timestamps for the attitude and state data is assumed to be synchronized.
         STK_CSV_PATH (str): *Optional*. Path to the .csv file containing position (column 1-3), velocity (column 4-6), and time (column 7), generated in STK. Position and velocity data is assumed to be in km and in ICRF. 
         Timestep (int): *Optional*. The chosen timestep of the Science Mode Timeline simulation [s]. Drastically changes runtime of the program. 
+        FastTransformations (bool): *Optional*. If True, transformations between ECI and ECEF (for example of the LP) use a faster approximation, which is accurate to within 10 m. Intended for fast preview runs.
         
     Returns:
         (tuple): tuple containing:
@@ -271,6 +349,7 @@ def Timeline_Plotter(Science_Mode_Path, OHB_H5_Path="", STK_CSV_PATH="", Timeste
         OHB_H5_Path=OHB_H5_Path,
         STK_CSV_FILE=STK_CSV_PATH,
         Timestep=Timestep,
+        FastTransformations=FastTransformations,
     )
 
     return Data_MATS, Data_LP, Time, Time_OHB
@@ -0,0 +1,1038 @@
+import pytest
+import copy
+import ephem
+import gzip
+import importlib
+import itertools
+import logging
+import os
+import subprocess
+import sys
+import numpy as np
+from scipy.spatial.transform import Rotation
+from skyfield import api
+from astropy.coordinates import EarthLocation
+
+from OPT import (
+    _Globals,
+    _Library,
+    _OrbitInterpolation,
+    _Ephemeris,
+    _OrbitProduct,
+    _SatrecArray,
+    _MATS_attitude,
+    _MATS_coordinates,
+)
+from OPT._Timeline_Plotter import OHB
+
+TLE = [
+    "1 54321U 19100G   20172.75043981 0.00000000  00000-0  75180-4 0  0014",
+    "2 54321  97.7044   6.9210 0014595 313.2372  91.8750 14.93194142000010",
+]
+
+Timeline_settings = {
+    "yaw_correction": True,
+    "yaw_amplitude": -3.8,
+    "yaw_phase": -20,
+}
+
+start_date = ephem.Date("2020/6/20 18:00:00")
+
+
+@pytest.fixture
+def satellite():
+    return api.EarthSatellite(TLE[0], TLE[1])
+
+
+@pytest.fixture(scope="session", autouse=True)
+def ephemeris_database():
+    "Load de421.bsp with the Skyfield loader from its data directory (downloaded if missing), so that the tests do not depend on the working directory"
+    directory = os.environ.get(
+        "SKYFIELD_DATA", os.path.join(os.path.expanduser("~"), ".skyfield-data")
+    )
+    _Ephemeris._database = api.Loader(directory, verbose=False)("de421.bsp")
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    _Library.Satellite_cache.clear()
+
+
+"Data of Satellite_Simulator_Batch which depends on the latitude of the LP estimated from the simulated track"
+LP_track_keys = [
+    "Yaw [degrees]",
+    "Pitch [degrees]",
+    "OpticalAxis",
+    "Dec_OpticalAxis [degrees]",
+    "RA_OpticalAxis [degrees]",
+    "Normal2H_offset",
+    "Normal2V_offset",
+]
+
+
+def test_Satellite_Simulator_Batch(satellite):
+    dates = start_date + ephem.second * 5 * np.arange(300)
+
+    Satellite_dicts = _Library.Satellite_Simulator_Batch(
+        satellite, dates, Timeline_settings, 92.5, Cache=False
+    )
+
+    for t, date in enumerate(dates):
+        Satellite_dict = _Library.Satellite_Simulator(
+            satellite, ephem.Date(date), Timeline_settings, 92.5
+        )
+        for key, value in Satellite_dict.items():
+            # The latitude of the LP is interpolated from the simulated track, which changes the pitch and the pointing slightly
+            if key == "EstimatedLatitude_LP [degrees]":
+                assert abs(Satellite_dicts[key][t] - value) < 1e-2
+            elif key in LP_track_keys:
+                assert np.allclose(Satellite_dicts[key][t], value, rtol=0, atol=1e-4)
+            else:
+                assert np.allclose(Satellite_dicts[key][t], value, rtol=0, atol=1e-9)
+
+
+def test_Satellite_Simulator_Buffer(satellite):
+    Satellite_Simulator = _Library.Satellite_Simulator_Buffer(
+        satellite, Timeline_settings, 92.5, 5
+    )
+
+    current_time = start_date
+    for t in range(40):
+        Satellite_dict = Satellite_Simulator(current_time)
+        _Library.Satellite_cache.clear()
+        reference = _Library.Satellite_Simulator(
+            satellite, current_time, Timeline_settings, 92.5
+        )
+        assert np.allclose(
+            Satellite_dict["OpticalAxis"], reference["OpticalAxis"], rtol=0, atol=1e-12
+        )
+
+        # Jump ahead every 15 timesteps
+        if t % 15 == 14:
+            current_time = ephem.Date(current_time + ephem.second * 600)
+        else:
+            current_time = ephem.Date(current_time + ephem.second * 5)
+
+
+def test_InterpolatedSatellite(satellite):
+    Interpolated_satellite = _OrbitInterpolation.InterpolatedSatellite(
+        satellite, KnotSpacing=60, MaxError=1
+    )
+    t = _Ephemeris.timescale().utc(2020, 6, 20, 18, 0, np.arange(0, 6000, 7.3))
+
+    assert Interpolated_satellite.ErrorBound(t) < 1
+    assert Interpolated_satellite.ErrorEstimate < 1
+
+
+def test_ephemDate_to_skyfield():
+    dates = start_date + ephem.second * 0.37 * np.arange(1000)
+
+    t = _Library.ephemDate_to_skyfield(dates)
+
+    for date, tt in zip(dates[::97], t.tt[::97]):
+        date_datetime = ephem.Date(date).datetime()
+        reference = _Ephemeris.timescale().utc(
+            date_datetime.year,
+            date_datetime.month,
+            date_datetime.day,
+            date_datetime.hour,
+            date_datetime.minute,
+            date_datetime.second + date_datetime.microsecond / 1000000,
+        )
+        assert abs(tt - reference.tt) * 86400 < 1e-5
+
+
+def test_utc_to_onboardTime():
+    "GPS time is 18 s ahead of UTC since 2017"
+    assert _Library.utc_to_onboardTime(ephem.Date("2020/1/1 00:00:00")) == 1261872018.0
+    assert np.all(
+        _Library.utc_to_onboardTime(start_date + ephem.second * np.arange(3))
+        == _Library.utc_to_onboardTime(start_date) + np.arange(3)
+    )
+
+
+def test_SunAngle():
+    dates = start_date + np.arange(0, 3, 0.0137)
+    PositionVectors = np.tile([7000.0, 100.0, 30.0], (len(dates), 1))
+
+    SunAngles = _Library.SunAngle(PositionVectors, dates)
+
+    t = _Library.ephemDate_to_skyfield(dates)
+    r_SunFromEarth_km = (
+        _Ephemeris.database()["Earth"]
+        .at(t)
+        .observe(_Ephemeris.database()["Sun"])
+        .position.km.T
+    )
+    reference = np.degrees(
+        np.arccos(
+            (PositionVectors * r_SunFromEarth_km).sum(axis=1)
+            / np.linalg.norm(r_SunFromEarth_km, axis=1)
+            / np.linalg.norm(PositionVectors, axis=1)
+        )
+    )
+
+    assert np.allclose(SunAngles, reference, rtol=0, atol=1e-6)
+    assert np.isclose(_Library.SunAngle(PositionVectors[5], dates[5]), reference[5])
+
+
+def test_Moon_ephemeris():
+    dates = start_date + np.arange(0, 3, 0.00371)
+    t = _Library.ephemDate_to_skyfield(dates)
+
+    r_Moon = _Ephemeris.Moon_ephemeris().position(t)
+    reference = (
+        _Ephemeris.database()["Earth"]
+        .at(t)
+        .observe(_Ephemeris.database()["Moon"])
+        .apparent()
+        .position.km
+    )
+
+    assert np.abs(r_Moon - reference).max() < 0.05
+    assert np.allclose(_Ephemeris.Moon_ephemeris().position(t[7]), reference[:, 7], atol=0.05)
+
+
+def test_event_finder():
+    "A sine with a period of 100 minutes crosses 0.5 at 100/12 and 500/12 minutes after each period starts"
+    def function(dates):
+        return np.sin(2 * np.pi * (dates - start_date) / (ephem.minute * 100))
+
+    EventDates, Rising = _Library.event_finder(
+        function, start_date, start_date + ephem.minute * 250, 0.5, GridSpacing=60
+    )
+
+    expected = start_date + ephem.minute * np.array([100, 500, 1300, 1700, 2500, 2900]) / 12
+    assert np.all(Rising == [True, False] * 3)
+    assert np.all(EventDates >= expected)
+    assert np.all(EventDates - expected <= ephem.second * 0.1)
+
+
+def test_LPlatitude_event_finder(satellite):
+    EndDate = start_date + ephem.second * 6000
+    EventDates, Poleward = _Library.LPlatitude_event_finder(
+        satellite, start_date, EndDate, Timeline_settings, 92.5, 45, GridSpacing=30
+    )
+    assert len(EventDates) == 4
+
+    lat_LP = _Library.Satellite_Simulator_Batch(
+        satellite, EventDates, Timeline_settings, 92.5
+    )["EstimatedLatitude_LP [degrees]"]
+    assert np.all(np.abs(np.abs(lat_LP) - 45) < 0.01)
+
+    Events = _Library.merge_events(
+        {"UV_on": (EventDates, Poleward), "Test": ([start_date + ephem.second], [0])}
+    )
+    assert [Event[0] for Event in Events] == sorted(Event[0] for Event in Events)
+    assert Events[0] == (start_date + ephem.second, "Test", False)
+
+
+def test_Satellite_Simulator_Batch_Logger(satellite):
+    "Nothing is simulated unless DEBUG records are handled"
+    Logger = logging.getLogger("test_Satellite_Simulator_Batch_Logger")
+    EndDate = start_date + ephem.second * 95
+    for level, misses in [(logging.INFO, 0), (logging.DEBUG, 10)]:
+        Logger.setLevel(level)
+        _Library.Satellite_Simulator_Batch_Logger(
+            satellite, start_date, EndDate, 10, Timeline_settings, 92.5, Logger
+        )
+        assert _Library.Satellite_cache.misses == misses
+
+
+def test_Satellite_Simulator_Cache(satellite, monkeypatch):
+    Satellite_cache = _Library.Satellite_cache
+    monkeypatch.setattr(Satellite_cache, "MaxSize", 50)
+    dates = start_date + ephem.second * 5 * np.arange(40)
+
+    Satellite_dicts = _Library.Satellite_Simulator_Batch(
+        satellite, dates, Timeline_settings, 92.5
+    )
+    assert Satellite_cache.statistics()["misses"] == 40
+    assert Satellite_cache.statistics()["size"] == 40
+
+    "The same grid is returned from the cache, as a copy"
+    Satellite_dicts_cached = _Library.Satellite_Simulator_Batch(
+        satellite, dates, Timeline_settings, 92.5
+    )
+    assert Satellite_cache.hits == 40
+    for key, value in Satellite_dicts.items():
+        assert np.array_equal(Satellite_dicts_cached[key], value)
+    Satellite_dicts_cached["OpticalAxis"][:] = 0
+    assert _Library.Satellite_Simulator_Batch(
+        satellite, dates, Timeline_settings, 92.5
+    )["OpticalAxis"].any()
+
+    "Another grid, track or interpolation of the orbit is another key"
+    _Library.Satellite_Simulator_Batch(
+        satellite, dates, Timeline_settings, 92.5, Track=(dates[:1] - 0.1, np.zeros(1))
+    )
+    assert Satellite_cache.misses == 80
+    for KnotSpacing in [60, 30]:
+        _Library.Satellite_Simulator_Batch(
+            _OrbitInterpolation.InterpolatedSatellite(satellite, KnotSpacing),
+            dates,
+            Timeline_settings,
+            92.5,
+        )
+    assert Satellite_cache.misses == 160
+
+    "The least recently used grids are evicted"
+    assert Satellite_cache.statistics()["size"] == 40
+    _Library.Satellite_Simulator_Batch(
+        satellite, dates + ephem.second * 150, Timeline_settings, 92.5
+    )
+    assert Satellite_cache.misses == 200
+    _Library.Satellite_Simulator_Batch(satellite, dates, Timeline_settings, 92.5)
+    assert Satellite_cache.misses == 240
+
+    "Single points in time are cached separately from the batches"
+    Satellite_dict = _Library.Satellite_Simulator(
+        satellite, ephem.Date(dates[0]), Timeline_settings, 92.5
+    )
+    assert Satellite_cache.misses == 241
+    assert np.allclose(
+        Satellite_dict["OpticalAxis"], Satellite_dicts["OpticalAxis"][0], atol=1e-9
+    )
+    _Library.Satellite_Simulator(satellite, ephem.Date(dates[0]), Timeline_settings, 92.5)
+    assert Satellite_cache.misses == 241
+
+    "A different pointing altitude is a different key"
+    _Library.Satellite_Simulator(satellite, ephem.Date(dates[0]), Timeline_settings, 90)
+    assert Satellite_cache.misses == 242
+
+
+def test_OrbitProduct(satellite, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("Output")
+    Logger = logging.getLogger("test_OrbitProduct")
+    OrbitProduct_settings = dict(
+        Timeline_settings,
+        start_date="2020/6/20 18:00:00",
+        duration=600,
+        StandardPointingAltitude=92500,
+        OrbitProduct_Timestep=10,
+    )
+
+    path = _OrbitProduct.create_OrbitProduct(TLE, OrbitProduct_settings, Logger)
+    assert _OrbitProduct.load_OrbitProduct(TLE, OrbitProduct_settings, Logger) != None
+
+    "Other settings give another orbit product, which does not exist"
+    OrbitProduct_settings_yaw = dict(OrbitProduct_settings, yaw_phase=0)
+    assert _OrbitProduct.OrbitProduct_path(TLE, OrbitProduct_settings_yaw) != path
+    assert _OrbitProduct.load_OrbitProduct(TLE, OrbitProduct_settings_yaw, Logger) == None
+
+    "Only points in time on the grid of the orbit product are read from it"
+    dates = start_date + ephem.second * 5 * np.arange(100)
+    Satellite_dicts = _Library.Satellite_Simulator_Batch(
+        satellite, dates, Timeline_settings, 92.5
+    )
+    assert _Library.Satellite_cache.OrbitProduct_hits == 50
+
+    reference = _Library.Satellite_Simulator_Batch(
+        satellite, dates, Timeline_settings, 92.5, Cache=False
+    )
+    for key, value in reference.items():
+        if key == "EstimatedLatitude_LP [degrees]":
+            assert np.allclose(Satellite_dicts[key], value, rtol=0, atol=1e-2)
+        else:
+            assert np.allclose(Satellite_dicts[key], value, rtol=0, atol=1e-6)
+
+    Data, covered = _OrbitProduct.OrbitProduct_lookup(
+        satellite, dates, Timeline_settings, 92.5
+    )
+    assert np.all(covered == (np.arange(100) % 2 == 0))
+    assert np.all(np.abs(Data["Latitude_LP [degrees]"][covered]) <= 90)
+    assert np.all(np.isnan(Data["Latitude_LP [degrees]"][~covered]))
+
+    "The event finders bracket their events on the grid of the orbit product"
+    EndDate = start_date + ephem.second * 595
+    GridDates = _Library.Satellite_cache.OrbitProduct_grid(
+        _Library.Satellite_cache.SatelliteKey(satellite), start_date, EndDate, 30
+    )
+    assert np.allclose((GridDates - start_date) / ephem.second, 30 * np.arange(20), atol=1e-3)
+
+    hits = _Library.Satellite_cache.OrbitProduct_hits
+    Events = [
+        _Library.eclipse_event_finder(satellite, start_date, EndDate, 73, GridSpacing=30),
+        _Library.LPlatitude_event_finder(
+            satellite, start_date, EndDate, Timeline_settings, 92.5, 45, GridSpacing=30
+        ),
+    ]
+    assert _Library.Satellite_cache.OrbitProduct_hits == hits + 20
+
+    monkeypatch.setattr(_Library.Satellite_cache, "OrbitProducts", [])
+    references = [
+        _Library.eclipse_event_finder(satellite, start_date, EndDate, 73, GridSpacing=30),
+        _Library.LPlatitude_event_finder(
+            satellite, start_date, EndDate, Timeline_settings, 92.5, 45, GridSpacing=30
+        ),
+    ]
+    for (EventDates, Values), (reference_dates, reference_values) in zip(Events, references):
+        assert len(EventDates) == len(reference_dates) != 0
+        assert np.all(Values == reference_values)
+        assert np.all(np.abs(EventDates - reference_dates) <= ephem.second * 0.1)
+
+
+def test_SatrecArrayPropagator(satellite):
+    TLE_previous_day = [
+        "1 54321U 19100G   20171.75043981 0.00000000  00000-0  75180-4 0  0013",
+        "2 54321  97.7044   5.9210 0014595 313.2372  91.8750 14.93194142000019",
+    ]
+    Propagator = _SatrecArray.SatrecArrayPropagator([TLE, TLE_previous_day])
+    dates = start_date + ephem.second * 5 * np.arange(300)
+    t = _Library.ephemDate_to_skyfield(dates)
+
+    Propagator.propagate(t)
+    for Satellite, TLE_ in zip(Propagator.satellites, [TLE, TLE_previous_day]):
+        reference = api.EarthSatellite(TLE_[0], TLE_[1]).at(t)
+        assert np.allclose(Satellite.at(t).position.km, reference.position.km, atol=1e-9)
+        assert np.allclose(
+            Satellite.at(t[7]).velocity.km_per_s, reference.velocity.km_per_s[:, 7], atol=1e-12
+        )
+        assert np.allclose(
+            Satellite.at(t[:7]).position.km, reference.position.km[:, :7], atol=1e-9
+        )
+
+    "Both TLEs are propagated together at the shared times, and separately at the others"
+    assert Propagator.propagations == 1
+    assert Propagator.single_propagations == 4
+
+    Satellite_dicts = _Library.Satellite_Simulator_Batch(
+        Propagator.satellites[0], dates, Timeline_settings, 92.5, Cache=False
+    )
+    reference = _Library.Satellite_Simulator_Batch(
+        satellite, dates, Timeline_settings, 92.5, Cache=False
+    )
+    for key, value in reference.items():
+        assert np.allclose(Satellite_dicts[key], value, rtol=0, atol=1e-9)
+
+
+def test_MATS_attitude(satellite):
+    dates = start_date + ephem.second * 60 * np.arange(100)
+    Satellite_dicts = _Library.Satellite_Simulator_Batch(
+        satellite, dates, Timeline_settings, 92.5, Cache=False
+    )
+    r = Satellite_dicts["Position [km]"]
+    v = Satellite_dicts["Velocity [km/s]"]
+    normal_orbit = Satellite_dicts["OrbitNormal"]
+    optical_axis = Satellite_dicts["OpticalAxis"]
+    V_offset_normal = Satellite_dicts["Normal2V_offset"]
+    H_offset_normal = Satellite_dicts["Normal2H_offset"]
+
+    Euler_angles = _MATS_attitude.Euler_angles_SLOF(
+        r, v, normal_orbit, optical_axis, V_offset_normal, H_offset_normal
+    )
+
+    "Reference with one rotation aligning the basis vectors of SBF for each point in time"
+    for t in range(len(dates)):
+        ECI_to_SLOF = Rotation.from_matrix(
+            np.array(
+                (
+                    v[t] / np.linalg.norm(v[t]),
+                    -normal_orbit[t],
+                    -r[t] / np.linalg.norm(r[t]),
+                )
+            )
+        )
+        basis_SBF = ECI_to_SLOF.apply(
+            (optical_axis[t], V_offset_normal[t], H_offset_normal[t])
+        )
+        rotation, _ = Rotation.align_vectors(
+            basis_SBF, ((0, 0, -1), (0, 1, 0), (1, 0, 0))
+        )
+        assert np.allclose(
+            Euler_angles[t], rotation.as_euler("ZYZ", degrees=True), atol=1e-6
+        )
+
+    "Attitude quaternions (scalar part first) of the simulated pointing, as given by OHB"
+    MATS_ECI = Rotation.from_matrix(
+        np.stack((H_offset_normal, V_offset_normal, -optical_axis), axis=2)
+    )
+    quaternions = np.roll(MATS_ECI.as_quat(), 1, axis=1)
+    MATS_ECI_OHB = _MATS_attitude.quaternions_to_rotations(quaternions)
+    assert np.allclose(MATS_ECI_OHB.apply([0, 0, -1]), optical_axis, atol=1e-9)
+
+    "Without the orbit normal, SLOF is defined from the position and velocity only"
+    Euler_angles_OHB = (_MATS_attitude.ECI_to_SLOF(r, v) * MATS_ECI_OHB).as_euler(
+        "ZYZ", degrees=True
+    )
+    assert np.allclose(Euler_angles_OHB, Euler_angles, atol=0.1)
+
+
+def test_eci2ecef_array():
+    dates = [
+        ephem.Date(start_date + ephem.second * 600 * t).datetime() for t in range(4)
+    ]
+    vectors = np.array(
+        [[7000e3, 0, 0], [0, 7000e3, 10], [1e3, -2e3, 7000e3], [-5e6, 5e6, 1e6]]
+    )
+
+    r_ECEF = _MATS_coordinates.eci2ecef_array(vectors, dates)
+    for t in range(len(dates)):
+        assert r_ECEF[t] == pytest.approx(
+            _MATS_coordinates.eci2ecef(*vectors[t], dates[t]), abs=1e-3
+        )
+    assert _MATS_coordinates.ecef2eci_array(r_ECEF, dates) == pytest.approx(
+        vectors, abs=1e-3
+    )
+
+    "The matrices are calculated once for the same times"
+    assert _MATS_coordinates.GCRS2ITRS_matrices(
+        dates
+    ) is _MATS_coordinates.GCRS2ITRS_matrices(list(dates))
+    assert _MATS_coordinates.eci2ecef_array(np.zeros((0, 3)), []).shape == (0, 3)
+
+
+def test_GCRS2ITRS_matrices_fast():
+    dates = [
+        ephem.Date(start_date + ephem.second * 1000 * t).datetime() for t in range(200)
+    ]
+
+    assert _MATS_coordinates.GCRS2ITRS_validation(dates).max() < 10
+    assert _MATS_coordinates.GCRS2ITRS_matrices(
+        dates, Fast=True
+    ) is not _MATS_coordinates.GCRS2ITRS_matrices(dates)
+
+
+def tanpoint_geometry(N):
+    """Returns N positions in ECEF at an altitude of 600 km and look vectors towards the limb."""
+    rng = np.random.default_rng(1)
+    r = rng.normal(size=(N, 3))
+    r = r / np.linalg.norm(r, axis=1)[:, None] * 6978e3
+    along = np.cross(r, rng.normal(size=(N, 3)))
+    along = along / np.linalg.norm(along, axis=1)[:, None]
+    look = along - 0.35 * r / 6978e3
+    look = look / np.linalg.norm(look, axis=1)[:, None]
+    return r, look
+
+
+def test_ecef2tanpoint_array():
+    r, look = tanpoint_geometry(500)
+
+    r_LP = _MATS_coordinates.ecef2tanpoint_array(r, look)
+    for t in range(len(r)):
+        assert r_LP[t] == pytest.approx(
+            _MATS_coordinates.ecef2tanpoint(*r[t], *look[t]), abs=1e-6
+        )
+
+
+def test_ECEF2geodetic():
+    rng = np.random.default_rng(2)
+    lat = rng.uniform(-90, 90, 1000)
+    lon = rng.uniform(-180, 180, 1000)
+    alt = rng.uniform(-1e4, 2e6, 1000)
+
+    location = EarthLocation.from_geodetic(lon, lat, alt)
+    x = location.x.to_value("m")
+    y = location.y.to_value("m")
+    z = location.z.to_value("m")
+    geodetic = location.to_geodetic()
+
+    lat_array, lon_array, alt_array = _MATS_coordinates.ECEF2geodetic(x, y, z)
+    assert lat_array == pytest.approx(geodetic.lat.degree, abs=1e-9)
+    assert lon_array == pytest.approx(geodetic.lon.degree, abs=1e-9)
+    assert alt_array == pytest.approx(geodetic.height.to_value("m"), abs=1e-6)
+
+    assert np.array(_MATS_coordinates.geodetic2ECEF(lat, lon, alt)) == pytest.approx(
+        np.array([x, y, z]), abs=1e-6
+    )
+
+    "ECEF2lla and lla2ECEF return the same types as before"
+    lat_LP, lon_LP, alt_LP = _MATS_coordinates.ECEF2lla(x[0], y[0], z[0])
+    assert lat_LP.degree == pytest.approx(lat[0])
+    assert alt_LP.to_value("m") == pytest.approx(alt[0])
+    assert _MATS_coordinates.lla2ECEF(lat[0], lon[0], alt[0]) == pytest.approx(
+        (x[0], y[0], z[0])
+    )
+
+
+def test_SZAfromlla_array():
+    dates = [
+        ephem.Date(start_date + ephem.second * 5000 * t).datetime() for t in range(5)
+    ]
+    lat = np.array([-60.0, -20.0, 0.0, 30.0, 80.0])
+    lon = np.array([-170.0, -45.0, 0.0, 90.0, 150.0])
+    alt = np.array([0.0, 1e3, 50e3, 92.5e3, 600e3])
+
+    SZA = _MATS_coordinates.SZAfromlla_array(lat, lon, alt, dates)
+    for t in range(len(dates)):
+        assert SZA[t] == pytest.approx(
+            _MATS_coordinates.SZAfromlla(lat[t], lon[t], alt[t], dates[t]), abs=0.01
+        )
+
+    "Several positions for each time"
+    SZA_2D = _MATS_coordinates.SZAfromlla_array(
+        np.stack((lat, -lat), axis=1), np.stack((lon, lon), axis=1), 0, dates
+    )
+    assert SZA_2D.shape == (5, 2)
+    assert SZA_2D[:, 0] == pytest.approx(
+        _MATS_coordinates.SZAfromlla_array(lat, lon, 0, dates)
+    )
+
+
+def test_OHB_Calculations(satellite, tmp_path):
+    "Write a small OHB .h5 file with MATS looking along the velocity and run the OHB calculations of Timeline_Plotter on it"
+    import astropy.time
+    import h5py
+
+    dates = start_date + ephem.second * 60 * np.arange(20)
+    Time_GPS = astropy.time.Time([ephem.Date(date).datetime() for date in dates]).gps
+    Geocentric = satellite.at(_Library.ephemDate_to_skyfield(dates))
+    r_ECI = Geocentric.position.m.T
+    v_ECI = Geocentric.velocity.m_per_s.T
+
+    "Optical axis (body -z) in the orbital plane, 22 degrees below the horizontal, which is close to limb pointing at 92 km"
+    r_unit = _MATS_attitude.unit_vectors(r_ECI)
+    horizontal = _MATS_attitude.unit_vectors(
+        v_ECI - np.einsum("ij,ij->i", v_ECI, r_unit)[:, None] * r_unit
+    )
+    optical_axis = np.cos(np.radians(22)) * horizontal - np.sin(np.radians(22)) * r_unit
+    z_body = -optical_axis
+    x_body = np.cos(np.radians(22)) * r_unit + np.sin(np.radians(22)) * horizontal
+    y_body = np.cross(z_body, x_body)
+    quaternions = Rotation.from_matrix(np.stack((x_body, y_body, z_body), axis=2)).as_quat()
+
+    path = str(tmp_path / "OHB.h5")
+    with h5py.File(path, "w") as File:
+        Level1A = File.create_group("root/Level1A")
+        Level1A["ReconstructedData/PreciseOrbitEstimation/acsGnssStateJ2000"] = np.vstack(
+            (r_ECI.T, v_ECI.T)
+        )
+        Level1A["ReconstructedData/PreciseOrbitEstimation/Time"] = Time_GPS[None, :]
+        Level1A["ReconstructedData/PreciseAttitudeEstimation/afsAttitudeState"] = quaternions[
+            :, [3, 0, 1, 2]
+        ].T
+        Level1A["ReconstructedData/PreciseAttitudeEstimation/Time"] = Time_GPS[None, :]
+        for axis in range(3):
+            Level1A["TM_acGnssOps/acoOnGnssStateEcef_" + "xyz"[axis]] = r_ECI[:, axis]
+
+    Logger = logging.getLogger("test_OHB_Calculations")
+    Data_OHB = {}
+    with h5py.File(path, "r") as File:
+        for Fast in [False, True]:
+            Data_OHB[Fast] = OHB.OHB_Calculations(
+                File["root"]["Level1A"], 10, 2, 0, 2, 0, Logger, FastTransformations=Fast
+            )
+
+    Data = Data_OHB[False]
+    assert abs((Data["Time_OHB"][3] - ephem.Date(dates[6]).datetime()).total_seconds()) < 1e-3
+    assert np.allclose(
+        Data["optical_axis_OHB"], optical_axis[::2][:10], rtol=0, atol=1e-9
+    )
+    assert np.allclose(
+        Data["r_MATS_OHB_ECEF [m]"],
+        _MATS_coordinates.eci2ecef_array(r_ECI[::2][:10], Data["Time_OHB"]),
+        rtol=0,
+        atol=1e-6,
+    )
+
+    "The LP is in the mesosphere, ahead of MATS along the orbit"
+    assert np.all((50e3 < Data["alt_LP_OHB [m]"]) & (Data["alt_LP_OHB [m]"] < 150e3))
+    assert np.all(np.abs(Data["lat_LP_OHB [degrees]"] - Data["lat_MATS_OHB [degrees]"]) < 30)
+    assert np.all((0 <= Data["SZA_LP_OHB [degrees]"]) & (Data["SZA_LP_OHB [degrees]"] <= 180))
+
+    "The fast transformations are accurate to within 10 m"
+    assert np.allclose(
+        Data_OHB[True]["r_MATS_OHB_ECEF [m]"], Data["r_MATS_OHB_ECEF [m]"], rtol=0, atol=10
+    )
+
+
+def test_IERS_offline():
+    "Import OPT and transform coordinates in a process without network access"
+    code = """
+import datetime, os, socket
+
+def no_network(*args, **kwargs):
+    raise OSError("No network access")
+
+socket.socket.connect = no_network
+socket.create_connection = no_network
+socket.getaddrinfo = no_network
+
+import OPT
+from OPT import _MATS_coordinates, _IERS
+
+_MATS_coordinates.eci2ecef(7e6, 0, 0, datetime.datetime(2020, 6, 20))
+Status = _IERS.IERS_status()
+assert Status["Age [days]"] >= 0 and os.path.isfile(Status["Path"])
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+"Packages which take a large part of a second to import and must only be imported by the code which uses them"
+HeavyPackages = ["matplotlib", "pylab", "astropy", "astroquery", "erfa", "scipy", "h5py"]
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "OPT",
+        "OPT._Library",
+        "OPT._MATS_coordinates",
+        "OPT._MATS_attitude",
+        "OPT._OrbitProduct",
+        "OPT._TimelineAnalyzer.Core",
+        "OPT._PLUTOGenerator.PLUTOGenerator",
+    ],
+)
+def test_import_time(module):
+    "Import the module in a new process with -X importtime, which reports each imported module on stderr"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+
+    Imported = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            self_time, cumulative, name = line[len("import time:") :].split("|")
+            if cumulative.strip().isdigit():
+                Imported.append(name.strip())
+
+    assert module in Imported
+    Heavy = sorted(name for name in Imported if name.split(".")[0] in HeavyPackages)
+    assert not Heavy, module + " imports " + str(Heavy)
+
+
+def test_OccupiedTimeline():
+    Occupied_Timeline = _Library.OccupiedTimeline(
+        {"Mode130": [], "Mode100": [(start_date + ephem.second * 100, start_date + ephem.second * 200)]}
+    )
+    Occupied_Timeline["Mode130"].append(
+        (start_date + ephem.second * 50, start_date + ephem.second * 150)
+    )
+    Occupied_Timeline["Mode130"].append(
+        (start_date + ephem.second * 200, start_date + ephem.second * 300)
+    )
+
+    "Postponed to the end of the first colliding Mode in the order of the dictionary, which skips Mode100"
+    date, endDate, iterations = _Library.scheduler(
+        Occupied_Timeline, start_date + ephem.second * 120, start_date + ephem.second * 180
+    )
+    assert iterations == 2
+    assert abs(date - (start_date + ephem.second * 300)) < ephem.second * 1e-3
+    assert abs(endDate - date - ephem.second * 60) < ephem.second * 1e-3
+
+    "Touching a scheduled time is only a collision if inclusive"
+    assert Occupied_Timeline.colliding_keys(
+        start_date + ephem.second * 300, start_date + ephem.second * 400
+    ) == []
+    assert Occupied_Timeline.colliding_keys(
+        start_date + ephem.second * 140, start_date + ephem.second * 200, Inclusive=True
+    ) == ["Mode130", "Mode100"]
+
+    "A replaced list is indexed again, plain dictionaries are still accepted"
+    Occupied_Timeline["Mode100"] = []
+    plain_Timeline = {key: list(value) for key, value in Occupied_Timeline.items()}
+    assert _Library.scheduler(
+        plain_Timeline, start_date + ephem.second * 130, start_date + ephem.second * 160
+    )[2] == 1
+
+
+def test_SyncArgCalculator():
+    CCD_settings = {
+        CCDSEL: {
+            "TEXPMS": TEXPMS,
+            "NCOL": 43,
+            "NCBIN": 40,
+            "NCBINFPGA": 0,
+            "NRSKIP": 100,
+            "NROW": 400 // NRBIN,
+            "NRBIN": NRBIN,
+            "NFLUSH": 1023,
+        }
+        for CCDSEL, TEXPMS, NRBIN in [
+            (1, 3000, 2),
+            (2, 3000, 2),
+            (4, 5000, 6),
+            (8, 5000, 6),
+            (16, 0, 2),
+            (32, 3000, 2),
+            (64, 0, 2),
+        ]
+    }
+
+    "Readout times of several CCD settings at once are the same as one at a time"
+    arguments = [
+        np.array([CCD_settings[CCDSEL][name] for CCDSEL in _Library.SyncArg_CCDSELs])
+        for name in ("NCOL", "NCBIN", "NCBINFPGA", "NRSKIP", "NROW", "NRBIN", "NFLUSH")
+    ]
+    ReadoutTimes = _Library.calculate_time_per_row(*arguments)
+    for x in range(len(_Library.SyncArg_CCDSELs)):
+        assert _Library.calculate_time_per_row(*[argument[x] for argument in arguments]) == tuple(
+            ReadoutTimes[y][x] for y in range(3)
+        )
+
+    _Library.SyncArg_cache.clear()
+    CCDSEL, NCCD, TEXPIOFS, TEXPIMS = _Library.SyncArgCalculator(CCD_settings, 50, 100)
+    assert (CCDSEL, NCCD) == (47, 5)
+    assert TEXPIMS == _Library._SyncArgCalculator(CCD_settings, 50, 100)[3]
+
+    "Changing the returned list does not change the cached result"
+    TEXPIOFS.append(0)
+    assert _Library.SyncArgCalculator(CCD_settings, 50, 100) == (CCDSEL, NCCD, TEXPIOFS[:-1], TEXPIMS)
+
+    "Settings which the synchronization does not depend on are not part of the key"
+    CCD_settings[1]["TEXPIMS"] = 6000
+    _Library.SyncArgCalculator(CCD_settings, 50, 100)
+    assert _Library.SyncArg_cache.statistics()["hits"] == 2
+    assert _Library.SyncArg_cache.statistics()["misses"] == 1
+
+
+def test_SyncArgCalculator_Vectorized():
+    rng = np.random.default_rng(1)
+    names = ("NCOL", "NCBIN", "NCBINFPGA", "NRSKIP", "NROW", "NRBIN", "NFLUSH")
+    TransfertimePerPixel = 0.01
+
+    for TEXPMS in ([3000, 3000, 5000, 5000, 5000, 5000], [0, 2000, 1000, 0, 2000, 500]):
+        Settings = {
+            "NCOL": rng.integers(1, 200, 50),
+            "NCBIN": rng.integers(1, 50, 50),
+            "NCBINFPGA": rng.integers(0, 3, 50),
+            "NRSKIP": np.zeros(50, dtype=int),
+            "NROW": rng.integers(1, 256, 50),
+            "NRBIN": rng.integers(1, 3, 50),
+            "NFLUSH": np.full(50, 1023),
+        }
+        ReadOutTimes = sum(_Library.calculate_time_per_row(*[Settings[name] for name in names]))
+        "Give each CCD different settings"
+        ReadOutTimes = np.array([np.roll(ReadOutTimes, x) for x in range(6)])
+        TransferTimes = np.array(
+            [np.roll(Settings["NCOL"] * Settings["NROW"] * TransfertimePerPixel, x) for x in range(6)]
+        )
+
+        TEXPIOFS, TEXPIMS = _Library.SyncArgCalculator_Vectorized(
+            TEXPMS, ReadOutTimes, TransferTimes, 200, 500
+        )
+
+        for n in range(50):
+            CCD_settings = {64: {}}
+            for x, CCDSEL in enumerate(_Library.SyncArg_CCDSELs):
+                CCD_settings[CCDSEL] = {
+                    name: int(np.roll(Settings[name], x)[n]) for name in names
+                }
+                CCD_settings[CCDSEL]["TEXPMS"] = TEXPMS[x]
+
+            reference = _Library._SyncArgCalculator(CCD_settings, 200, 500)
+            assert TEXPIMS[n] == reference[3]
+            assert sorted(TEXPIOFS[:, n][TEXPIOFS[:, n] != -1].tolist()) == sorted(reference[2])
+
+
+
+@pytest.fixture
+def CCDSyncOptimizer(tmp_path, monkeypatch):
+    "Use the Configuration File template, and write the logs in a temporary folder"
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(_Globals, "Config_File", "OPT._ConfigFile")
+    from OPT._CCDSyncOptimizer import Core
+
+    monkeypatch.setattr(Core, "OPT_Config_File", importlib.import_module("OPT._ConfigFile"))
+    yield Core
+
+    Logger = logging.getLogger(Core.OPT_Config_File.Logger_name())
+    _Library.StopLogListener(Core.OPT_Config_File.Logger_name())
+    for handler in Logger.handlers[:]:
+        Logger.removeHandler(handler)
+
+
+def test_CCDSync_Optimizer(CCDSyncOptimizer):
+    Config_File = CCDSyncOptimizer.OPT_Config_File
+    Timeline_settings = Config_File.Timeline_settings()
+    ExtraOffset = Timeline_settings["CCDSYNC_ExtraOffset"]
+    ExtraIntervalTime = Timeline_settings["CCDSYNC_ExtraIntervalTime"]
+    CCD_macro = Config_File.CCD_macro_settings("CustomBinning")
+    Groups = ((16, 32), (1, 8), (2, 4))
+    SearchSpace = {
+        "TEXPMS": [0, 1000, 3000],
+        "NCBIN": [2, 8],
+        "NRBIN": [1, 2],
+        "NROW": [50, 200],
+        "NCOL": [99],
+        2: {"TEXPMS": [0, 2000]},
+    }
+    names = ("NCOL", "NCBIN", "NCBINFPGA", "NRSKIP", "NROW", "NRBIN", "NFLUSH")
+
+    "Brute force every combination of the search space with _SyncArgCalculator"
+    Group_settings = []
+    for CCDSELs in Groups:
+        Space = dict(SearchSpace)
+        for CCDSEL in CCDSELs:
+            Space.update(SearchSpace.get(CCDSEL, {}))
+        Group_settings.append(
+            [
+                dict(zip(("TEXPMS", "NCBIN", "NRBIN", "NROW", "NCOL"), values))
+                for values in itertools.product(
+                    *[Space[name] for name in ("TEXPMS", "NCBIN", "NRBIN", "NROW", "NCOL")]
+                )
+            ]
+        )
+    Points = set()
+    for Combination in itertools.product(*Group_settings):
+        CCD_settings = copy.deepcopy(CCD_macro)
+        for CCDSELs, Settings in zip(Groups, Combination):
+            for CCDSEL in CCDSELs:
+                CCD_settings[CCDSEL].update(Settings)
+        Active = [
+            CCD_settings[CCD] for CCD in _Library.SyncArg_CCDSELs if CCD_settings[CCD]["TEXPMS"] != 0
+        ]
+        if len(Active) < 2:
+            continue
+        CCDSEL, NCCD, TEXPIOFS, TEXPIMS = _Library._SyncArgCalculator(
+            CCD_settings, ExtraOffset, ExtraIntervalTime
+        )
+        if max(TEXPIOFS) > 12000:
+            continue
+        if any(
+            Settings["TEXPMS"] + sum(_Library.calculate_time_per_row(*[Settings[name] for name in names]))
+            >= TEXPIMS
+            for Settings in Active
+        ):
+            continue
+        Points.add(
+            (
+                TEXPIMS,
+                NCCD,
+                sum((Settings["NCOL"] + 1) * Settings["NROW"] for Settings in Active),
+                sum(Settings["TEXPMS"] for Settings in Active),
+            )
+        )
+
+    for Objective in ("TEXPIMS", "ImageRate"):
+        Costs = {
+            (
+                TEXPIMS if Objective == "TEXPIMS" else -NCCD * 1000 / TEXPIMS,
+                -Pixels,
+                -ExposureTime,
+            )
+            for TEXPIMS, NCCD, Pixels, ExposureTime in Points
+        }
+        Pareto = {
+            Cost
+            for Cost in Costs
+            if not any(
+                Other != Cost and all(a <= b for a, b in zip(Other, Cost)) for Other in Costs
+            )
+        }
+
+        Configurations = CCDSyncOptimizer.CCDSync_Optimizer(
+            "CustomBinning", SearchSpace, Objective, Groups
+        )
+        Found = [
+            (
+                Configuration[Objective] * (1 if Objective == "TEXPIMS" else -1),
+                -Configuration["Pixels"],
+                -Configuration["ExposureTime"],
+            )
+            for Configuration in Configurations
+        ]
+        assert sorted(Found) == sorted(Pareto)
+        assert Found == sorted(Found)
+
+        "Each configuration gives the reported arguments of the CCD Synchronize CMD"
+        for Configuration in Configurations:
+            assert _Library._SyncArgCalculator(
+                Configuration["CCD_settings"], ExtraOffset, ExtraIntervalTime
+            ) == (
+                Configuration["CCDSEL"],
+                Configuration["NCCD"],
+                Configuration["TEXPIOFS"],
+                Configuration["TEXPIMS"],
+            )
+
+
+def test_CCDSync_Optimizer_errors(CCDSyncOptimizer):
+    Groups = ((16, 32), (1, 8), (2, 4))
+    with pytest.raises(ValueError):
+        CCDSyncOptimizer.CCDSync_Optimizer("CustomBinning", None, "Pixels", Groups)
+    with pytest.raises(ValueError):
+        CCDSyncOptimizer.CCDSync_Optimizer(
+            "CustomBinning", None, "TEXPIMS", ((16, 32), (1, 8), (2,))
+        )
+    with pytest.raises(ValueError):
+        CCDSyncOptimizer.CCDSync_Optimizer(
+            "CustomBinning", None, "TEXPIMS", ((16, 32), (1, 8), (2, 4), (4,))
+        )
+    with pytest.raises(ValueError):
+        CCDSyncOptimizer.CCDSync_Optimizer("CustomBinning", {"NCBIN": []}, "TEXPIMS", Groups)
+
+def test_log_debug(tmp_path):
+    Logger = logging.getLogger("test_log_debug")
+    Logger.setLevel(logging.INFO)
+    formatted = []
+
+    def message(text):
+        formatted.append(text)
+        return text
+
+    "Messages of filtered records are never formatted"
+    Logger.debug(_Library.LazyMessage(message, "lazy"))
+    assert not _Library.log_debug(Logger, "test site", "%s", _Library.LazyMessage(message, "lazy"))
+    assert formatted == []
+
+    Logger.setLevel(logging.DEBUG)
+    _Library.Log_rate_limiter.set_limit("test site", 2, 3)
+    logged = [_Library.log_debug(Logger, "test site", "%s", x) for x in range(10)]
+    assert logged == [True, True, False, False, True, False, False, True, False, False]
+    assert _Library.Log_rate_limiter.suppressed()["test site"] == 6
+
+    "Numeric traces are written as JSON lines"
+    _Library.SetupTraceSink(str(tmp_path / "trace.jsonl"))
+    _Library.trace("test", time=1.5, position=np.array([1.0, 2.0, 3.0]))
+    _Library.CloseTraceSink()
+    _Library.trace("test", time=2.5)
+    with open(tmp_path / "trace.jsonl") as file:
+        lines = file.readlines()
+    assert len(lines) == 1
+    assert '"position": [1.0, 2.0, 3.0]' in lines[0]
+
+
+def test_ConfigFile_Logger_settings():
+    "Configuration Files made before Logger_settings was added use the default handlers"
+    import types
+
+    Old_Config_File = types.ModuleType("Old_Config_File")
+    assert _Library.ConfigFile_Logger_settings(Old_Config_File) is None
+
+    New_Config_File = types.ModuleType("New_Config_File")
+    New_Config_File.Logger_settings = lambda: {"Asynchronous": True}
+    assert _Library.ConfigFile_Logger_settings(New_Config_File) == {"Asynchronous": True}
+
+
+def test_SetupLogger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Logger_settings = {
+        "Asynchronous": True,
+        "MaxBytes": 2000,
+        "BackupCount": 3,
+        "Compress": True,
+    }
+    _Library.SetupLogger("test_SetupLogger", Logger_settings)
+    Logger = logging.getLogger("test_SetupLogger")
+    assert "test_SetupLogger" in _Library.Log_listeners
+
+    for x in range(100):
+        Logger.debug("Record number %s", x)
+
+    "Stopping the writer thread writes the remaining records"
+    _Library.StopLogListener("test_SetupLogger")
+    assert "test_SetupLogger" not in _Library.Log_listeners
+
+    files = sorted(os.listdir("Logs_test_SetupLogger"))
+    assert len(files) == 4
+    assert sum(file.endswith(".log.1.gz") for file in files) == 1
+    with open(os.path.join("Logs_test_SetupLogger", files[0])) as file:
+        assert "Record number 99" in file.read()
+    with gzip.open(os.path.join("Logs_test_SetupLogger", files[1]), "rt") as file:
+        assert "Record number" in file.read()
+
+    for handler in Logger.handlers[:]:
+        Logger.removeHandler(handler)